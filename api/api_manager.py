@@ -1,16 +1,22 @@
+from functools import partial
+
 from api.auth_api import AuthAPI
 from api.user_api import UserAPI
 from api.movies_api import MoviesAPI
 from api.genres_api import GenresAPI
 from api.reviews_api import ReviewsAPI
 from api.payment_api import PaymentAPI
+from custom_requester.batch import as_request_spec, failing_call, run_batch
+from custom_requester.circuit_breaker import circuit_breakers
+from resources.http_settings import HttpPoolSettings
 
 
 class ApiManager:
     """ Класс для управления API-классами с единой HTTP-сессией """
 
-    def __init__(self, session):
-        """ Инициализация ApiManager :param session: HTTP-сессия, используемая всеми API-классами """
+    def __init__(self, session, breakers=None):
+        """ Инициализация ApiManager :param session: HTTP-сессия, используемая всеми API-классами
+        :param breakers: реестр выключателей сервисов, по умолчанию общий для процесса """
 
         self.session = session
         self.auth_api = AuthAPI(session)
@@ -20,6 +26,45 @@ class ApiManager:
         self.reviews_api = ReviewsAPI(session)
         self.payment_api = PaymentAPI(session)
 
+        # API-классы одного сервиса делят выключатель: сбои payment_api не мешают запросам к movies_api
+        self.breakers = breakers or circuit_breakers
+        for api in self.apis():
+            api.breaker = self.breakers.for_url(api.base_url)
+
+    def apis(self):
+        """ API-классы менеджера """
+
+        return (self.auth_api, self.user_api, self.movies_api, self.genres_api, self.reviews_api, self.payment_api)
+
+    def send_many(self, requests, max_concurrency=None, api="movies_api"):
+        """ Параллельная отправка пачки запросов через API-классы менеджера.
+        Элемент пачки - вызываемый объект без аргументов (например, functools.partial(self.movies_api.create_movie, data)),
+        RequestSpec или кортеж/словарь (method, endpoint, data, params, expected_status[, api]).
+        api - имя API-класса для элементов без поля api. Возвращает список BatchResult в порядке входа;
+        некорректный элемент (неизвестный API-класс, неверный кортеж) попадает в exception своего BatchResult """
+
+        calls = []
+        for item in requests:
+            if callable(item):
+                calls.append((item, item))
+                continue
+
+            try:
+                spec = as_request_spec(item)
+                name = spec.api or api
+                target = getattr(self, name, None)
+                if target not in self.apis():
+                    raise ValueError(f"Для запроса {spec.method} {spec.endpoint} указан неизвестный API-класс {name}")
+            except (TypeError, ValueError) as error:
+                calls.append((item, failing_call(error)))
+                continue
+            calls.append((spec, partial(
+                target.send_request, spec.method, spec.endpoint, data=spec.data, params=spec.params,
+                expected_status=spec.expected_status
+            )))
+
+        return run_batch(calls, max_concurrency or HttpPoolSettings.BATCH_MAX_CONCURRENCY)
+
     def close_session(self):
         """ Закрывает HTTP-сессию для освобождения ресурсов """
         
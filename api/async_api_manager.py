@@ -0,0 +1,44 @@
+from api.async_auth_api import AsyncAuthAPI
+from api.async_user_api import AsyncUserAPI
+from api.async_movies_api import AsyncMoviesAPI
+from api.async_genres_api import AsyncGenresAPI
+from api.async_reviews_api import AsyncReviewsAPI
+from api.async_payment_api import AsyncPaymentAPI
+from custom_requester.async_custom_requester import create_async_client
+from custom_requester.circuit_breaker import circuit_breakers
+
+
+class AsyncApiManager:
+    """ Асинхронный аналог ApiManager: все API-классы используют общий httpx.AsyncClient """
+
+    def __init__(self, client=None, breakers=None):
+        """ Инициализация AsyncApiManager :param client: httpx.AsyncClient, по умолчанию создается новый
+        :param breakers: реестр выключателей сервисов, по умолчанию общий для процесса """
+
+        self.client = client or create_async_client()
+        self.auth_api = AsyncAuthAPI(self.client)
+        self.user_api = AsyncUserAPI(self.client)
+        self.movies_api = AsyncMoviesAPI(self.client)
+        self.genres_api = AsyncGenresAPI(self.client)
+        self.reviews_api = AsyncReviewsAPI(self.client)
+        self.payment_api = AsyncPaymentAPI(self.client)
+
+        self.breakers = breakers or circuit_breakers
+        for api in self.apis():
+            api.breaker = self.breakers.for_url(api.base_url)
+
+    def apis(self):
+        """ API-классы менеджера """
+
+        return (self.auth_api, self.user_api, self.movies_api, self.genres_api, self.reviews_api, self.payment_api)
+
+    async def close_session(self):
+        """ Закрывает HTTP-клиент для освобождения ресурсов """
+
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close_session()
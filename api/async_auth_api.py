@@ -0,0 +1,45 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import REGISTER_ENDPOINT, LOGIN_ENDPOINT, BASE_URL
+
+
+class AsyncAuthAPI(AsyncCustomRequester):
+    """ Асинхронный класс для работы с аутентификацией """
+
+    def __init__(self, client):
+        """ Инициализация AsyncAuthAPI """
+
+        super().__init__(client=client, base_url=BASE_URL)
+
+    async def register_user(self, user_data, expected_status=201):
+        """ Регистрация нового пользователя """
+
+        return await self.send_request(
+            method="POST",
+            endpoint=REGISTER_ENDPOINT,
+            data=user_data,
+            expected_status=expected_status
+        )
+
+    async def login_user(self, login_data, expected_status=201):
+        """ Авторизация пользователя """
+
+        return await self.send_request(
+            method="POST",
+            endpoint=LOGIN_ENDPOINT,
+            data=login_data,
+            expected_status=expected_status
+        )
+
+    async def authenticate(self, user_creds):
+        """ Аутентификация пользователя и установка токена в заголовки клиента """
+        login_data = {
+            "email": user_creds[0],
+            "password": user_creds[1]
+        }
+
+        response = (await self.login_user(login_data, expected_status=[200, 201])).json()
+        if "accessToken" not in response:
+            raise KeyError("token is missing")
+
+        token = response["accessToken"]
+        self._update_session_headers(**{"authorization": "Bearer " + token})
@@ -0,0 +1,50 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import MOVIES_API_BASE_URL
+
+
+class AsyncGenresAPI(AsyncCustomRequester):
+    """ Асинхронный класс для работы с API жанров фильмов """
+
+    def __init__(self, client):
+        """ Инициализация AsyncGenresAPI """
+
+        super().__init__(client=client, base_url=MOVIES_API_BASE_URL)
+
+    async def get_genres(self, expected_status=200):
+        """ Получение списка жанров фильмов """
+
+        return await self.send_request(
+            method="GET",
+            endpoint="/genres",
+            expected_status=expected_status,
+            cacheable=True,
+        )
+
+    async def get_genres_by_id(self, genre_id, expected_status=200):
+        """ Получение жанра по ID """
+
+        return await self.send_request(
+            method="GET",
+            endpoint=f"/genres/{genre_id}",
+            expected_status=expected_status,
+            cacheable=True,
+        )
+
+    async def create_genre(self, genre_data, expected_status=201):
+        """ Создание нового жанра. Требуется токен авторизации с ролью SUPER_ADMIN """
+
+        return await self.send_request(
+            method="POST",
+            endpoint="/genres",
+            data=genre_data,
+            expected_status=expected_status,
+        )
+
+    async def delete_genre_by_id(self, genre_id, expected_status=200):
+        """ Удаление жанра по ID. Требуется токен авторизации с ролью SUPER_ADMIN """
+
+        return await self.send_request(
+            method="DELETE",
+            endpoint=f"/genres/{genre_id}",
+            expected_status=expected_status,
+        )
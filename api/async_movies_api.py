@@ -0,0 +1,60 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import MOVIES_API_BASE_URL
+
+
+class AsyncMoviesAPI(AsyncCustomRequester):
+    """ Асинхронный класс для работы с API фильмов """
+
+    def __init__(self, client):
+        """ Инициализация AsyncMoviesAPI """
+
+        super().__init__(client=client, base_url=MOVIES_API_BASE_URL)
+
+    async def get_movies(self, params=None, expected_status=200):
+        """ Получение списка фильмов. :return: Объект ответа httpx.Response """
+
+        return await self.send_request(
+            method="GET",
+            endpoint="/movies",
+            params=params,
+            expected_status=expected_status
+        )
+
+    async def get_movie(self, movie_id, expected_status=200):
+        """ Получение конкретного фильма по его ID """
+
+        return await self.send_request(
+            method="GET",
+            endpoint=f"/movies/{movie_id}",
+            expected_status=expected_status,
+            cacheable=True
+        )
+
+    async def create_movie(self, movie_data, expected_status=201):
+        """ Создание нового фильма. Требуется токен авторизации """
+
+        return await self.send_request(
+            method="POST",
+            endpoint="/movies",
+            data=movie_data,
+            expected_status=expected_status
+        )
+
+    async def delete_movie(self, movie_id, expected_status):
+        """ Удаление фильма по его ID. Требуется токен авторизации """
+
+        return await self.send_request(
+            method="DELETE",
+            endpoint=f"/movies/{movie_id}",
+            expected_status=expected_status
+        )
+
+    async def patch_movie(self, movie_id, movie_data, expected_status=200):
+        """ Частичное обновление фильма по его ID. Требуется токен авторизации """
+
+        return await self.send_request(
+            method="PATCH",
+            endpoint=f"/movies/{movie_id}",
+            data=movie_data,
+            expected_status=expected_status
+        )
@@ -0,0 +1,60 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import PAYMENT_API_BASE_URL
+
+
+class AsyncPaymentAPI(AsyncCustomRequester):
+    """ Асинхронный класс для работы с API платежей """
+
+    def __init__(self, client):
+        """ Инициализация AsyncPaymentAPI """
+
+        super().__init__(client=client, base_url=PAYMENT_API_BASE_URL)
+
+    async def create_payment(self, payment_request_data, expected_status=201):
+        """ Создание платежа """
+
+        return await self.send_request(
+            method="POST",
+            endpoint="/create",
+            data=payment_request_data,
+            expected_status=expected_status
+        )
+
+    async def get_user_payments(self, expected_status=200):
+        """ Получение платежей текущего пользователя """
+
+        return await self.send_request(
+            method="GET",
+            endpoint="/user",
+            expected_status=expected_status
+        )
+
+    async def get_user_payments_by_id(self, user_id, expected_status=200):
+        """ Получение платежей пользователя по ID """
+
+        return await self.send_request(
+            method="GET",
+            endpoint=f"/user/{user_id}",
+            expected_status=expected_status
+        )
+
+    async def get_find_all_user_payments(self, page=None, page_size=None, status=None, created_at=None,
+                                         expected_status=200):
+        """ Получение всех платежей пользователей с возможностью фильтрации """
+
+        params = {}
+        if page is not None:
+            params['page'] = page
+        if page_size is not None:
+            params['page_size'] = page_size
+        if status is not None:
+            params['status'] = status
+        if created_at is not None:
+            params['created_at'] = created_at
+
+        return await self.send_request(
+            method="GET",
+            endpoint="/find-all",
+            params=params,
+            expected_status=expected_status
+        )
@@ -0,0 +1,65 @@
+from custom_requester.async_custom_requester import AsyncCustomRequester
+from constants import MOVIES_API_BASE_URL
+
+
+class AsyncReviewsAPI(AsyncCustomRequester):
+    def __init__(self, client):
+        super().__init__(client=client, base_url=MOVIES_API_BASE_URL)
+
+    async def get_movie_reviews(self, movie_id, expected_status=200):
+        """
+        Получение отзывов о фильме. Доступ PUBLIC
+        """
+
+        return await self.send_request(
+            method="GET",
+            endpoint=f"/movies/{movie_id}/reviews",
+            expected_status=expected_status,
+            cacheable=True
+        )
+
+    async def create_review(self, movie_id, review_data, expected_status=200):
+        """
+        Создание отзыва к фильму. Role: USER, ADMIN, SUPER_ADMIN
+        """
+
+        return await self.send_request(
+            method="POST",
+            endpoint=f"/movies/{movie_id}/reviews",
+            data=review_data,
+            expected_status=expected_status
+        )
+
+    async def update_review(self, movie_id, review_data, expected_status=200):
+        """
+        Редактирование отзыва к фильму. Role: USER, ADMIN, SUPER_ADMIN
+        """
+
+        return await self.send_request(
+            method="PUT",
+            endpoint=f"/movies/{movie_id}/reviews",
+            data=review_data,
+            expected_status=expected_status
+        )
+
+    async def hide_review(self, movie_id, user_id, expected_status=200):
+        """
+        Скрытие отзыва к фильму. Требуется токен авторизации. Role: USER, ADMIN, SUPER_ADMIN
+        """
+
+        return await self.send_request(
+            method="PATCH",
+            endpoint=f"/movies/{movie_id}/reviews/hide/{user_id}",
+            expected_status=expected_status
+        )
+
+    async def show_review(self, movie_id, user_id, expected_status):
+        """
+        Показ отзыва к фильму. Требуется токен авторизации. Role: USER, ADMIN, SUPER_ADMIN
+        """
+
+        return await self.send_request(
+            method="PATCH",
+            endpoint=f"/movies/{movie_id}/reviews/show/{user_id}",
+            expected_status=expected_status
+        )
@@ -17,6 +17,7 @@ class GenresAPI(CustomRequester):
             method="GET",
             endpoint="/genres",
             expected_status=expected_status,
+            cacheable=True,
         )
 
     def get_genres_by_id(self, genre_id, expected_status=200):
@@ -26,6 +27,7 @@ class GenresAPI(CustomRequester):
             method="GET",
             endpoint=f"/genres/{genre_id}",
             expected_status=expected_status,
+            cacheable=True,
         )
 
     def create_genre(self, genre_data, expected_status=201):
@@ -1,5 +1,6 @@
 from custom_requester.custom_requester import CustomRequester
 from constants import MOVIES_API_BASE_URL
+from models.movie_model import GetMovieResponse, MovieFilterParams
 
 
 class MoviesAPI(CustomRequester):
@@ -20,13 +21,40 @@ class MoviesAPI(CustomRequester):
             expected_status=expected_status
         )
 
+    def stream_movies(self, params=None, expected_status=200):
+        """ Потоковое получение фильмов страницы: GetMovieResponse по одному, без загрузки всего ответа """
+
+        return self.stream_items(
+            endpoint="/movies",
+            key="movies",
+            model=GetMovieResponse,
+            params=params,
+            expected_status=expected_status
+        )
+
+    def iter_movies(self, filters=None, page_size=None, prefetch=None, expected_status=200):
+        """ Все фильмы, подходящие под filters (словарь или MovieFilterParams), постранично с упреждающей загрузкой """
+
+        if isinstance(filters, MovieFilterParams):
+            filters = filters.model_dump(exclude_unset=True, exclude_none=True)
+        return self.iter_items(
+            endpoint="/movies",
+            key="movies",
+            model=GetMovieResponse,
+            params=filters,
+            page_size=page_size,
+            prefetch=prefetch,
+            expected_status=expected_status
+        )
+
     def get_movie(self, movie_id, expected_status=200):
         """ Получение конкретного фильма по его ID """
 
         return self.send_request(
             method="GET",
             endpoint=f"/movies/{movie_id}",
-            expected_status=expected_status
+            expected_status=expected_status,
+            cacheable=True
         )
 
     def create_movie(self, movie_data, expected_status=201):
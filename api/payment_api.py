@@ -1,5 +1,6 @@
 from custom_requester.custom_requester import CustomRequester
 from constants import PAYMENT_API_BASE_URL
+from models.payment_model import PaymentInfo
 
 
 class PaymentAPI(CustomRequester):
@@ -41,6 +42,43 @@ class PaymentAPI(CustomRequester):
     def get_find_all_user_payments(self, page=None, page_size=None, status=None, created_at=None, expected_status=200):
         """ Получение всех платежей пользователей с возможностью фильтрации """
 
+        return self.send_request(
+            method="GET",
+            endpoint="/find-all",
+            params=self._find_all_params(page, page_size, status, created_at),
+            expected_status=expected_status
+        )
+
+    def stream_find_all_user_payments(self, page=None, page_size=None, status=None, created_at=None,
+                                      expected_status=200):
+        """ Потоковое получение платежей страницы: PaymentInfo по одному, без загрузки всего ответа """
+
+        return self.stream_items(
+            endpoint="/find-all",
+            key="payments",
+            model=PaymentInfo,
+            params=self._find_all_params(page, page_size, status, created_at),
+            expected_status=expected_status
+        )
+
+    def iter_payments(self, status=None, created_at=None, page_size=None, prefetch=None, expected_status=200):
+        """ Все платежи с фильтрами status / created_at, постранично с упреждающей загрузкой """
+
+        return self.iter_items(
+            endpoint="/find-all",
+            key="payments",
+            model=PaymentInfo,
+            params=self._find_all_params(None, None, status, created_at),
+            page_size=page_size,
+            size_param="page_size",
+            prefetch=prefetch,
+            expected_status=expected_status
+        )
+
+    @staticmethod
+    def _find_all_params(page, page_size, status, created_at):
+        """ Query-параметры поиска платежей """
+
         params = {}
         if page is not None:
             params['page'] = page
@@ -50,10 +88,4 @@ class PaymentAPI(CustomRequester):
             params['status'] = status
         if created_at is not None:
             params['created_at'] = created_at
-
-        return self.send_request(
-            method="GET",
-            endpoint="/find-all",
-            params=params,
-            expected_status=expected_status
-        )
+        return params
@@ -14,7 +14,8 @@ class ReviewsAPI(CustomRequester):
         return self.send_request(
             method="GET",
             endpoint=f"/movies/{movie_id}/reviews",
-            expected_status=expected_status
+            expected_status=expected_status,
+            cacheable=True
         )
 
     def create_review(self, movie_id, review_data, expected_status=200):
@@ -1,5 +1,6 @@
 from custom_requester.custom_requester import CustomRequester
 from constants import BASE_URL
+from models.user_model import GetUserResponse
 
 
 class UserAPI(CustomRequester):
@@ -20,7 +21,42 @@ class UserAPI(CustomRequester):
 
     def get_users(self, page_size=None, page=None, roles=None, created_at=None, expected_status=200):
         """ Получение списка пользователей """
-        
+
+        return self.send_request(
+            method="GET",
+            endpoint="/user",
+            params=self._users_params(page_size, page, roles, created_at),
+            expected_status=expected_status
+        )
+
+    def stream_users(self, page_size=None, page=None, roles=None, created_at=None, expected_status=200):
+        """ Потоковое получение пользователей страницы: GetUserResponse по одному, без загрузки всего ответа """
+
+        return self.stream_items(
+            endpoint="/user",
+            key="users",
+            model=GetUserResponse,
+            params=self._users_params(page_size, page, roles, created_at),
+            expected_status=expected_status
+        )
+
+    def iter_users(self, roles=None, created_at=None, page_size=None, prefetch=None, expected_status=200):
+        """ Все пользователи с фильтрами roles / created_at, постранично с упреждающей загрузкой """
+
+        return self.iter_items(
+            endpoint="/user",
+            key="users",
+            model=GetUserResponse,
+            params=self._users_params(None, None, roles, created_at),
+            page_size=page_size,
+            prefetch=prefetch,
+            expected_status=expected_status
+        )
+
+    @staticmethod
+    def _users_params(page_size, page, roles, created_at):
+        """ Query-параметры списка пользователей """
+
         params = {}
         if page_size is not None:
             params['pageSize'] = page_size
@@ -30,13 +66,7 @@ class UserAPI(CustomRequester):
             params['roles'] = roles
         if created_at is not None:
             params['createdAt'] = created_at
-
-        return self.send_request(
-            method="GET",
-            endpoint="/user",
-            params=params,
-            expected_status=expected_status
-        )
+        return params
 
     def create_user(self, user_data, expected_status=201):
         """ Создание пользователя """
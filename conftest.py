@@ -4,6 +4,12 @@
 # Базовые фикстуры (сессии, API менеджер)
 from fixtures.base_fixtures import *
 
+# Хуки и опции HTTP-транспорта (пулы соединений, статистика сессии)
+from fixtures.http_fixtures import *
+
+# Офлайн stand-in сервер для тестов HTTP-клиента
+from fixtures.stand_in_fixtures import *
+
 # Фикстуры для аутентификации и пользователей
 from fixtures.auth_fixtures import *
 
@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 import enum
 
@@ -18,10 +19,10 @@ class Roles(str, Enum):
     SUPER_ADMIN = "SUPER_ADMIN"
 
 
-# URL-адреса API для различных сервисов
-BASE_URL = "https://auth.dev-cinescope.coconutqa.ru"  # Базовый URL для аутентификации
-MOVIES_API_BASE_URL = "https://api.dev-cinescope.coconutqa.ru"  # API для работы с фильмами
-PAYMENT_API_BASE_URL = "https://payment.dev-cinescope.coconutqa.ru"  # API для платежей
+# URL-адреса API для различных сервисов. Переопределяются переменными окружения (например, для stand-in сервера)
+BASE_URL = os.getenv("CINESCOPE_AUTH_URL", "https://auth.dev-cinescope.coconutqa.ru")  # Базовый URL для аутентификации
+MOVIES_API_BASE_URL = os.getenv("CINESCOPE_MOVIES_URL", "https://api.dev-cinescope.coconutqa.ru")  # API для работы с фильмами
+PAYMENT_API_BASE_URL = os.getenv("CINESCOPE_PAYMENT_URL", "https://payment.dev-cinescope.coconutqa.ru")  # API для платежей
 
 # Стандартные HTTP заголовки для API запросов
 HEADERS = {
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import ChainMap
+from types import MappingProxyType
+
+import httpx
+
+from constants import BASE_URL, HEADERS
+from custom_requester.circuit_breaker import circuit_breakers
+from custom_requester.compression import request_compression
+from custom_requester.conditional_get import validator_store
+from custom_requester.connection_timing import ExchangeTiming, host_key
+from custom_requester.custom_requester import BaseRequester
+from custom_requester.header_sets import prepare_client_headers
+from custom_requester.http2_transport import async_http2_mounts
+from custom_requester.json_codec import memoize_json
+from custom_requester.rate_limiter import rate_limiters
+from custom_requester.response_cache import response_cache
+from custom_requester.retry import RetryPolicy
+from custom_requester.single_flight import single_flight
+from resources.http_settings import HttpPoolSettings
+
+
+def create_async_client(default_headers=None, **client_kwargs):
+    """ Создание httpx.AsyncClient с лимитами пула из HttpPoolSettings и HTTP/2 для хостов из HTTP2_HOSTS """
+
+    headers = HEADERS.copy()
+    if default_headers:
+        headers.update(default_headers)
+
+    limits = httpx.Limits(
+        max_connections=HttpPoolSettings.ASYNC_MAX_CONNECTIONS,
+        max_keepalive_connections=HttpPoolSettings.POOL_MAXSIZE,
+        keepalive_expiry=HttpPoolSettings.KEEPALIVE_IDLE
+    )
+    # Хосты из HTTP2_HOSTS получают отдельный транспорт HTTP/2, остальные - HTTP/1.1 с лимитами выше
+    client_kwargs.setdefault("mounts", async_http2_mounts(limits))
+    client = httpx.AsyncClient(headers=headers, limits=limits, **client_kwargs)
+    client.cinescope_headers = True
+    return client
+
+
+class AsyncCustomRequester(BaseRequester):
+    """ Асинхронный реквестер на httpx. Контракт send_request совпадает с CustomRequester,
+    но метод является корутиной. Проверка статуса, метрики, журнал и логирование общие (BaseRequester).
+    Синхронные send_many, stream_items и iter_items не наследуются: параллельные запросы - asyncio.gather """
+
+    def __init__(self, client, base_url=BASE_URL, default_headers=None):
+        self.client = client
+        # API-классы работают с заголовками и cookie через self.session - оставляем тот же атрибут
+        self.session = client
+        self.base_url = base_url
+        self.breaker = circuit_breakers.for_url(self.base_url)
+        self.rate_limiter = rate_limiters.for_url(self.base_url)
+
+        # Как и в синхронном реквестере: HEADERS ставятся в клиент один раз, default_headers реквестера
+        # передаются с каждым запросом и не затирают заголовки, выставленные другими API-классами
+        prepare_client_headers(self.client)
+        self.default_headers = MappingProxyType(dict(default_headers or {}))
+
+        # Логгер общий с синхронным реквестером, чтобы настройки логирования действовали одинаково
+        self.logger = logging.getLogger(BaseRequester.__module__)
+        self.logger.setLevel(logging.INFO)
+
+    async def send_request(self, method, endpoint, data=None, params=None, headers=None, expected_status=200,
+                           need_logging=True, retry=None, cacheable=False, coalesce=None):
+        """ Универсальный асинхронный метод для отправки запросов """
+
+        url = f"{self.base_url}{endpoint}"
+
+        if self.default_headers:
+            headers = {**self.default_headers, **(headers or {})}
+        # httpx объединит заголовки клиента с заголовками запроса сам, для ключей кэша достаточно ChainMap без копии
+        merged_headers = ChainMap(headers or {}, self.client.headers)
+        cache_key = self._cache_key(method, url, params, merged_headers, cacheable)
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                self._check_status(cached, expected_status)
+                return cached
+
+        flight_key = self._flight_key(method, url, params, merged_headers, coalesce, cacheable)
+
+        async def perform():
+            validator_key = self._validator_key(method, url, params, merged_headers)
+            stored, conditional_headers = validator_store.lookup(validator_key) if validator_key else (None, {})
+            sent_headers = {**(headers or {}), **conditional_headers} if conditional_headers else headers
+
+            body = self._prepare_body(data)
+            if body is not None and "Content-Type" not in self.client.headers \
+                    and "content-type" not in {name.lower() for name in sent_headers or {}}:
+                sent_headers = {**(sent_headers or {}), "Content-Type": "application/json"}
+            plain_headers, sent_body = sent_headers, body
+            compressed = self._compress_body(method, endpoint, body)
+            if compressed is not None:
+                sent_body, sent_headers = compressed, {**(sent_headers or {}), "Content-Encoding": "gzip"}
+
+            policy = RetryPolicy.resolve(retry)
+            if policy is not None:
+                policy.budget.deposit()
+
+            attempt = 1
+            while True:
+                throttle = self._budget_wait(await self._async_rate_limit_delay(), "ожидание лимита частоты",
+                                             method, endpoint)
+                if throttle:
+                    await asyncio.sleep(throttle)
+                connect, read = self._request_timeout(method, endpoint)
+                self._breaker_before_call()
+                # Заголовки клиента httpx объединяет с заголовками запроса самостоятельно
+                timing = ExchangeTiming(host_key(url))
+                started = time.perf_counter()
+                try:
+                    response = await self.client.request(method, url, content=sent_body, params=params,
+                                                         headers=sent_headers,
+                                                         timeout=httpx.Timeout(read, connect=connect),
+                                                         extensions={"trace": timing.async_httpx_trace})
+                except Exception as error:
+                    self._record_exchange(method, endpoint, None, time.perf_counter() - started, error=error,
+                                          attempt=attempt)
+                    self._raise_if_deadline_expired(method, endpoint, error)
+                    delay = self._retry_delay(policy, method, endpoint, attempt, expected_status, error=error)
+                    if delay is None:
+                        raise
+                except BaseException:
+                    # Отмененная задача (CancelledError) ничего не говорит о сервисе
+                    self._breaker_release()
+                    raise
+                else:
+                    response.cinescope_timing = timing
+                    memoize_json(response)
+                    self._record_exchange(method, endpoint, response, time.perf_counter() - started, attempt=attempt,
+                                          expected_status=expected_status)
+                    if response.status_code == 415 and sent_body is not body:
+                        request_compression.reject(self.base_url)
+                        sent_body, sent_headers = body, plain_headers
+                        continue
+                    delay = self._retry_delay(policy, method, endpoint, attempt, expected_status, response=response)
+                    if delay is None:
+                        break
+                await asyncio.sleep(self._budget_wait(delay, "паузы перед повторами", method, endpoint))
+                attempt += 1
+
+            response = self._resolve_conditional(validator_key, response, stored, expected_status)
+            self._update_cache(method, url, cache_key, response)
+            return response
+
+        if flight_key is None:
+            response = await perform()
+        else:
+            response = await single_flight.do_async(flight_key, perform)
+
+        try:
+            self._check_status(response, expected_status)
+        except ValueError:
+            if need_logging:
+                self.log_request_and_response(response, failed=True)
+            raise
+
+        if need_logging:
+            self.log_request_and_response(response)
+
+        return response
+
+    async def _async_rate_limit_delay(self):
+        """ Токен из корзины хоста без блокировки цикла событий: reserve ждет flock файла корзины,
+        который держат другие потоки и воркеры, поэтому выполняется в потоке пула """
+
+        if self.rate_limiter is None:
+            return 0.0
+        return await asyncio.to_thread(self._rate_limit_delay)
@@ -0,0 +1,73 @@
+""" Параллельная отправка пачки запросов на ограниченном пуле потоков """
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple, Optional
+
+
+class RequestSpec(NamedTuple):
+    """ Описание одного запроса пачки. api - имя API-класса в ApiManager (например, "movies_api") """
+
+    method: str
+    endpoint: str
+    data: Any = None
+    params: Any = None
+    expected_status: Any = 200
+    api: Optional[str] = None
+
+
+class BatchResult(NamedTuple):
+    """ Результат одного запроса пачки: либо response, либо exception """
+
+    request: Any
+    response: Any = None
+    exception: Optional[BaseException] = None
+
+    @property
+    def ok(self):
+        return self.exception is None
+
+    def result(self):
+        """ Ответ запроса или повторный выброс его исключения """
+
+        if self.exception is not None:
+            raise self.exception
+        return self.response
+
+
+def as_request_spec(item):
+    """ Приведение кортежа или словаря к RequestSpec """
+
+    if isinstance(item, RequestSpec):
+        return item
+    if isinstance(item, dict):
+        return RequestSpec(**item)
+    return RequestSpec(*item)
+
+
+def failing_call(error):
+    """ Вызов, который бросает error: некорректный элемент пачки становится его BatchResult, а не ошибкой всей пачки """
+
+    def call():
+        raise error
+
+    return call
+
+
+def run_batch(calls, max_concurrency):
+    """ Выполнение пар (request, callable) на пуле из max_concurrency потоков.
+    Результаты возвращаются в порядке входного списка, ошибка одного запроса не прерывает остальные """
+
+    calls = list(calls)
+    if not calls:
+        return []
+
+    def _run(request, call):
+        try:
+            return BatchResult(request=request, response=call())
+        except Exception as error:
+            return BatchResult(request=request, exception=error)
+
+    workers = max(1, min(max_concurrency, len(calls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="send_many") as executor:
+        futures = [executor.submit(_run, request, call) for request, call in calls]
+        return [future.result() for future in futures]
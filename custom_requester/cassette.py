@@ -0,0 +1,295 @@
+""" Запись и воспроизведение HTTP-обменов (кассеты) для всего API-слоя.
+В режиме record реальные ответы сохраняются в files/cassettes, в режиме replay отдаются без обращения к сети.
+Запросы фикстур шире функции пишутся в отдельные кассеты files/cassettes/_fixtures """
+
+import base64
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from custom_requester.endpoint_template import template_endpoint
+from resources.http_settings import HttpCassetteSettings
+from utils.tools import Tools
+
+VOLATILE_PLACEHOLDER = "<volatile>"
+CASSETTE_VERSION = 3
+FIXTURE_CASSETTES = "_fixtures"  # Каталог кассет фикстур session/module/class внутри каталога кассет
+# Валидаторы условного GET зависят от ответов предыдущих тестов - при записи их не отправляем
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class CassetteError(Exception):
+    """ Для запроса нет записанного ответа в режиме воспроизведения """
+
+
+def _volatile_fields():
+    return {field.strip() for field in HttpCassetteSettings.VOLATILE_FIELDS.split(",") if field.strip()}
+
+
+def _mask_volatile(value, volatile):
+    if isinstance(value, dict):
+        return {key: VOLATILE_PLACEHOLDER if key in volatile else _mask_volatile(item, volatile)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [_mask_volatile(item, volatile) for item in value]
+    return value
+
+
+def normalize_body(body):
+    """ Тело запроса для сопоставления: JSON с отсортированными ключами и замаскированными изменчивыми полями """
+
+    if not body:
+        return ""
+    text = body.decode("utf-8", errors="replace") if isinstance(body, bytes) else str(body)
+    try:
+        return json.dumps(_mask_volatile(json.loads(text), _volatile_fields()), sort_keys=True, ensure_ascii=False)
+    except (ValueError, json.JSONDecodeError):
+        return text
+
+
+def normalize_url(url):
+    """ URL для сопоставления: шаблон пути (id, uuid, email -> {id}) и отсортированные query-параметры """
+
+    parts = urlsplit(url)
+    volatile = _volatile_fields()
+    query = sorted(
+        (key, VOLATILE_PLACEHOLDER if key in volatile else value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    )
+    normalized = f"{parts.scheme}://{parts.netloc}{template_endpoint(parts.path)}"
+    return f"{normalized}?{urlencode(query)}" if query else normalized
+
+
+def auth_role(headers):
+    """ Роль из JWT в заголовке authorization (без проверки подписи). Токен сам по себе в ключ не входит """
+
+    authorization = headers.get("authorization") or headers.get("Authorization")
+    if not authorization:
+        return "anonymous"
+    try:
+        payload = authorization.split(" ", 1)[-1].split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        roles = claims.get("roles") or claims.get("role")
+        if isinstance(roles, list):
+            return ",".join(sorted(str(role) for role in roles))
+        if roles:
+            return str(roles)
+    except (IndexError, ValueError, AttributeError):
+        pass
+    return "authorized"
+
+
+def match_key(request):
+    """ Ключ сопоставления запроса: метод, нормализованный URL (шаблон пути и query), нормализованное тело
+    и роль из токена. Данные тестов в режиме кассет засеяны от id теста, поэтому тела воспроизводимы.
+    Одинаковые ключи сопоставляются по порядку в кассете """
+
+    body = request.body
+    if body and request.headers.get("Content-Encoding") == "gzip":
+        # Сжатое тело сравнивается по содержимому: gzip пишет в заголовок время сжатия
+        body = gzip.decompress(body)
+    return [request.method, normalize_url(request.url), normalize_body(body), auth_role(request.headers)]
+
+
+class Cassette:
+    """ Записанные обмены одного теста или фикстуры. При воспроизведении каждый обмен используется один раз:
+    n-й запрос с данным ключом получает n-й записанный ответ с тем же ключом """
+
+    def __init__(self, path, interactions=None, replay=False):
+        self.path = path
+        self.interactions = interactions or []
+        self.replay = replay
+        self.dirty = False
+        self._used = [False] * len(self.interactions)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as cassette_file:
+            recorded = json.load(cassette_file)
+        if recorded.get("version") != CASSETTE_VERSION:
+            raise CassetteError(f"Кассета {path} записана в старом формате. "
+                                f"Перезапишите кассету с --http-cassette-mode=record")
+        return cls(path, recorded["interactions"], replay=True)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as cassette_file:
+            json.dump({"version": CASSETTE_VERSION, "interactions": self.interactions}, cassette_file,
+                      ensure_ascii=False, separators=(",", ":"))
+        self.dirty = False
+
+    def append(self, key, response):
+        """ Запись обмена под ключом match_key запроса """
+
+        content = response.content or b""
+        try:
+            body, encoding = content.decode("utf-8"), "utf8"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+
+        interaction = {
+            "key": key,
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                # Тело хранится уже распакованным, поэтому заголовки кодирования передачи не сохраняем
+                "headers": {name: value for name, value in response.headers.items()
+                            if name.lower() not in ("content-encoding", "transfer-encoding")},
+                "body": body,
+                "encoding": encoding,
+            },
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+            self._used.append(True)
+            self.dirty = True
+
+    def take(self, key):
+        with self._lock:
+            for index, interaction in enumerate(self.interactions):
+                if not self._used[index] and interaction["key"] == key:
+                    self._used[index] = True
+                    return interaction["response"]
+            recorded = sum(1 for interaction in self.interactions if interaction["key"] == key)
+            # Записи того же эндпоинта с другим телом или ролью - признак рассинхронизации теста и кассеты
+            others = [interaction["key"] for interaction in self.interactions
+                      if interaction["key"][:2] == key[:2] and interaction["key"] != key]
+        lines = [f"В кассете {self.path} нет записанного ответа для {key[0]} {key[1]} (роль {key[3]}, тело {key[2]!r}): "
+                 f"записано {recorded}, это запрос №{recorded + 1}."]
+        for other in others[:3]:
+            lines.append(f"  записан тот же запрос с ролью {other[3]}, тело {other[2]!r}")
+        lines.append("Перезапишите кассету с --http-cassette-mode=record")
+        raise CassetteError("\n".join(lines))
+
+
+def cassette_path(test_id):
+    """ Путь к файлу кассеты теста: files/cassettes/<модуль>/<класс>/<тест>.json.gz """
+
+    relative = re.sub(r"[^\w.\-/]", "_", test_id.replace("::", "/"))
+    directory = HttpCassetteSettings.DIRECTORY or str(Tools.files_dir("cassettes"))
+    return os.path.join(directory, f"{relative}.json.gz")
+
+
+def open_cassette(path):
+    """ Кассета для записи или воспроизведения по режиму HttpCassetteSettings.MODE """
+
+    exists = os.path.exists(path)
+    if HttpCassetteSettings.MODE == "replay" or (HttpCassetteSettings.MODE == "once" and exists):
+        return Cassette.load(path) if exists else Cassette(path, replay=True)
+    return Cassette(path)
+
+
+class CassetteLibrary:
+    """ Кассеты процесса: активная кассета - кассета фикстуры, которая сейчас создается или разрушается,
+    иначе кассета текущего теста (PYTEST_CURRENT_TEST) """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._current = None
+        self._current_test = None
+        self._fixtures = {}
+        self._fixture_stack = []
+
+    @staticmethod
+    def current_test_id():
+        test = os.environ.get("PYTEST_CURRENT_TEST", "")
+        return test.rsplit(" (", 1)[0] if test else None
+
+    def cassette_for_current_test(self):
+        """ Кассета активной фикстуры или текущего теста, None вне теста """
+
+        with self._lock:
+            if self._fixture_stack:
+                return self._fixture_stack[-1]
+            test_id = self.current_test_id()
+            if test_id is None:
+                return None
+            if test_id != self._current_test:
+                self.finish()
+                self._current = open_cassette(cassette_path(test_id))
+                self._current_test = test_id
+            return self._current
+
+    def enter_fixture(self, fixture_id):
+        """ Запросы до leave_fixture пишутся в кассету фикстуры: она не зависит от того,
+        какой тест первым запросил фикстуру. Создание и разрушение фикстуры пишутся в одну кассету """
+
+        with self._lock:
+            cassette = self._fixtures.get(fixture_id)
+            if cassette is None:
+                cassette = self._fixtures[fixture_id] = open_cassette(
+                    cassette_path(f"{FIXTURE_CASSETTES}/{fixture_id}"))
+            self._fixture_stack.append(cassette)
+
+    def leave_fixture(self):
+        with self._lock:
+            cassette = self._fixture_stack.pop()
+            if cassette.dirty:
+                cassette.save()
+
+    def finish(self):
+        """ Сохранение записанной кассеты текущего теста """
+
+        with self._lock:
+            if self._current is not None and self._current.dirty:
+                self._current.save()
+            self._current = None
+            self._current_test = None
+
+
+cassettes = CassetteLibrary()
+
+
+def build_response(request, recorded):
+    """ Объект requests.Response из записанного ответа """
+
+    response = Response()
+    response.status_code = recorded["status"]
+    response.reason = recorded.get("reason")
+    response.headers = CaseInsensitiveDict(recorded["headers"])
+    body = recorded["body"]
+    response._content = base64.b64decode(body) if recorded.get("encoding") == "base64" else body.encode("utf-8")
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.elapsed = timedelta(0)
+    return response
+
+
+class CassetteAdapter(BaseAdapter):
+    """ Адаптер поверх реального транспорта: записывает обмены в кассету или отдает их из нее """
+
+    cinescope_transport = True
+
+    def __init__(self, inner):
+        super().__init__()
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        cassette = cassettes.cassette_for_current_test()
+        if cassette is None:
+            return self.inner.send(request, **kwargs)
+
+        key = match_key(request)
+        if cassette.replay:
+            return build_response(request, cassette.take(key))
+
+        # В кассету пишется полный ответ, а не 304: при воспроизведении части тестов сохраненного ответа может не быть
+        for name in CONDITIONAL_HEADERS:
+            request.headers.pop(name, None)
+        response = self.inner.send(request, **kwargs)
+        cassette.append(key, response)
+        return response
+
+    def close(self):
+        self.inner.close()
@@ -0,0 +1,110 @@
+""" Автоматический выключатель (circuit breaker) для base_url: при высокой доле сбоев запросы к сервису
+завершаются сразу, без ожидания таймаутов, пока сервис не ответит на пробный запрос """
+
+import threading
+import time
+from collections import deque
+
+from resources.http_settings import HttpBreakerSettings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """ Запрос не отправлен: выключатель сервиса разомкнут """
+
+
+class CircuitBreaker:
+    """ Выключатель одного сервиса. closed - запросы идут, считается доля сбоев в окне последних window вызовов;
+    open - запросы отклоняются open_seconds секунд; half-open - пропускается один пробный запрос """
+
+    def __init__(self, base_url, failure_rate=None, window=None, min_calls=None, open_seconds=None):
+        self.base_url = base_url
+        self.failure_rate = HttpBreakerSettings.FAILURE_RATE if failure_rate is None else failure_rate
+        self.min_calls = min_calls or HttpBreakerSettings.MIN_CALLS
+        self.open_seconds = HttpBreakerSettings.OPEN_SECONDS if open_seconds is None else open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window or HttpBreakerSettings.WINDOW)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._last_error = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """ Разрешение на запрос. Бросает CircuitOpenError, если выключатель разомкнут """
+
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+
+            failures = sum(1 for ok in self._outcomes if not ok)
+            raise CircuitOpenError(
+                f"Сервис {self.base_url} недоступен: выключатель разомкнут после {failures} сбоев "
+                f"из {len(self._outcomes)} запросов (последний: {self._last_error}). "
+                f"Повторная проверка через {max(remaining, 0):.1f} с"
+            )
+
+    def record(self, success, error=None):
+        """ Результат запроса: сбой - сетевая ошибка или статус 5xx """
+
+        with self._lock:
+            if not success:
+                self._last_error = error
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for ok in self._outcomes if not ok)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def release(self):
+        """ Запрос не дал результата о сервисе (не отправлен, прерван, ответ не из сети или таймаут урезан дедлайном
+        теста): место пробного запроса освобождается, окно сбоев не меняется """
+
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """ Выключатели по base_url. API-классы одного сервиса (например, movies, genres и reviews) делят выключатель """
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, base_url):
+        """ Выключатель сервиса base_url или None, если выключатели отключены (HTTP_BREAKER) """
+
+        if not HttpBreakerSettings.ENABLED:
+            return None
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            breaker = self._breakers.get(base_url)
+            if breaker is None:
+                breaker = self._breakers[base_url] = CircuitBreaker(base_url)
+            return breaker
+
+
+# Общий реестр процесса: состояние сервиса сохраняется между тестами и сессиями
+circuit_breakers = CircuitBreakerRegistry()
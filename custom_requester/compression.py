@@ -0,0 +1,133 @@
+""" Сжатие трафика: согласование Accept-Encoding для ответов, gzip больших тел запросов
+и учет байтов по эндпоинтам - сколько пришло по сети и сколько занимает тело после распаковки """
+
+import gzip
+import threading
+from urllib.parse import urlsplit
+
+from custom_requester.session_stats import register_collector
+from resources.http_settings import HttpCompressionSettings
+
+# Декодеры br и zstd необязательны: и urllib3, и httpx распаковывают их, только если пакеты установлены
+_ENCODINGS = ["gzip", "deflate"]
+try:
+    import brotli  # noqa: F401
+    _ENCODINGS.append("br")
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ENCODINGS.append("br")
+    except ImportError:
+        pass
+try:
+    import zstandard  # noqa: F401
+    _ENCODINGS.append("zstd")
+except ImportError:
+    pass
+
+
+def accept_encoding():
+    """ Значение Accept-Encoding: все кодировки, которые клиент умеет распаковать, или identity, если сжатие выключено """
+
+    if not HttpCompressionSettings.ENABLED:
+        return "identity"
+    return ", ".join(_ENCODINGS)
+
+
+class RequestCompression:
+    """ gzip тел запросов. Хост, ответивший 415 на сжатое тело, больше не получает сжатых тел (RFC 7694) """
+
+    def __init__(self):
+        self._rejected = set()
+        self._lock = threading.Lock()
+
+    def compress(self, base_url, body):
+        """ Сжатое тело или None, если сжимать не нужно (выключено, тело маленькое или хост не принимает gzip) """
+
+        if not HttpCompressionSettings.COMPRESS_REQUESTS or not isinstance(body, (bytes, bytearray)) \
+                or len(body) < HttpCompressionSettings.COMPRESS_MIN_BYTES:
+            return None
+        if urlsplit(base_url).netloc in self._rejected:
+            return None
+        compressed = gzip.compress(body, compresslevel=HttpCompressionSettings.COMPRESS_LEVEL)
+        # Несжимаемое тело (например, уже сжатые данные) отправляем как есть
+        return compressed if len(compressed) < len(body) else None
+
+    def reject(self, base_url):
+        with self._lock:
+            self._rejected.add(urlsplit(base_url).netloc)
+
+
+request_compression = RequestCompression()
+
+
+def wire_size(response):
+    """ Байты тела ответа, полученные по сети (до распаковки). None - размер неизвестен (кэш, кассета) """
+
+    # httpx считает скачанные байты сам
+    downloaded = getattr(response, "num_bytes_downloaded", None)
+    if downloaded is not None:
+        return downloaded
+    raw = getattr(response, "raw", None)
+    tell = getattr(raw, "tell", None)
+    # urllib3 HTTPResponse.tell() - число байтов, прочитанных из сокета, то есть сжатый размер
+    return tell() if callable(tell) and hasattr(raw, "decode_content") else None
+
+
+class CompressionStats:
+    """ Байты по эндпоинтам: ответы (по сети / после распаковки) и тела запросов (отправлено / исходный размер) """
+
+    _FIELDS = ("responses", "response_wire", "response_body", "request_wire", "request_body")
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _counters(self, key):
+        return self._endpoints.setdefault(key, dict.fromkeys(self._FIELDS, 0))
+
+    def record_response(self, key, wire, body):
+        with self._lock:
+            counters = self._counters(key)
+            counters["responses"] += 1
+            counters["response_wire"] += wire
+            counters["response_body"] += body
+
+    def record_request(self, key, wire, body):
+        with self._lock:
+            counters = self._counters(key)
+            counters["request_wire"] += wire
+            counters["request_body"] += body
+
+    # ==================== СТАТИСТИКА СЕССИИ ====================
+
+    def snapshot(self):
+        with self._lock:
+            return {key: dict(counters) for key, counters in self._endpoints.items()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for key, counters in snapshot.items():
+                own = self._counters(key)
+                for name in self._FIELDS:
+                    own[name] += counters.get(name, 0)
+
+    def report_lines(self, limit=10):
+        endpoints = self.snapshot()
+        wire = sum(c["response_wire"] + c["request_wire"] for c in endpoints.values())
+        body = sum(c["response_body"] + c["request_body"] for c in endpoints.values())
+        if not body:
+            return []
+        lines = [f"total: wire={wire} body={body} saved={body - wire} ({1 - wire / body:.0%})"]
+        # Эндпоинты с наибольшей экономией - там сжатие дает больше всего
+        ranked = sorted(endpoints.items(), reverse=True,
+                        key=lambda item: item[1]["response_body"] - item[1]["response_wire"]
+                        + item[1]["request_body"] - item[1]["request_wire"])
+        for key, c in ranked[:limit]:
+            lines.append(f"{key}: responses={c['responses']} response_wire={c['response_wire']} "
+                         f"response_body={c['response_body']} request_wire={c['request_wire']} "
+                         f"request_body={c['request_body']}")
+        return lines
+
+
+compression_stats = register_collector("compression", CompressionStats())
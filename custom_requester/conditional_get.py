@@ -0,0 +1,88 @@
+""" Условные GET-запросы: хранилище валидаторов (ETag, Last-Modified) и тел последних ответов.
+Повторный GET отправляется с If-None-Match / If-Modified-Since, ответ 304 заменяется сохраненным ответом """
+
+import copy
+import threading
+from collections import OrderedDict
+
+from custom_requester.connection_timing import response_timing
+from custom_requester.json_codec import memoize_json
+from custom_requester.session_stats import register_collector
+from resources.http_settings import HttpConditionalSettings
+
+
+class ValidatorStore:
+    """ Сохраненные ответы с валидаторами. Ключ тот же, что у кэша ответов: метод, URL, параметры, пользователь """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or HttpConditionalSettings.MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"revalidated": 0, "changed": 0}
+
+    def lookup(self, key):
+        """ Сохраненный ответ для ключа и заголовки условного запроса по нему: (None, {}), если ответа с валидаторами нет.
+        Ответ закрепляется за запросом: если к приходу 304 запись уже вытеснена, подставляется он же """
+
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is None:
+                return None, {}
+            self._entries.move_to_end(key)
+        headers = {}
+        if stored.headers.get("ETag"):
+            headers["If-None-Match"] = stored.headers["ETag"]
+        if stored.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = stored.headers["Last-Modified"]
+        return stored, headers
+
+    def resolve(self, key, response, stored=None):
+        """ Ответ для вызывающего кода: 304 превращается в копию сохраненного ответа stored (из lookup) с новым request,
+        новый ответ с валидаторами сохраняется. stored=None - запрос был безусловным """
+
+        if response.status_code == 304:
+            if stored is None:
+                return response
+            with self._lock:
+                self._stats["revalidated"] += 1
+            revalidated = copy.copy(stored)
+            revalidated.request = response.request
+            # Фазы - того обмена, что действительно прошел по сети (304), а не сохраненного
+            revalidated.cinescope_timing = response_timing(response)
+            # Своя разобранная копия тела: изменения payload одним вызывающим не видны следующим
+            return memoize_json(revalidated)
+
+        with self._lock:
+            if stored is not None:
+                self._stats["changed"] += 1
+            if 200 <= response.status_code < 300 and (response.headers.get("ETag")
+                                                       or response.headers.get("Last-Modified")):
+                self._entries[key] = response
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.pop(key, None)
+        return response
+
+    # ==================== СТАТИСТИКА СЕССИИ ====================
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, value in snapshot.items():
+                self._stats[name] = self._stats.get(name, 0) + value
+
+    def report_lines(self):
+        stats = self.snapshot()
+        total = stats["revalidated"] + stats["changed"]
+        if not total:
+            return []
+        return [f"304 hits={stats['revalidated']} misses={stats['changed']} "
+                f"hit_rate={stats['revalidated'] / total:.0%}"]
+
+
+validator_store = register_collector("conditional_get", ValidatorStore())
@@ -0,0 +1,186 @@
+""" Фазы запроса по хостам: DNS, TCP connect, TLS, время до первого байта (TTFB) и загрузка тела,
+плюс признак переиспользованного соединения. Долгий запрос раскладывается на части: видно, что чинить -
+пул соединений, кэш DNS или сам сервер.
+Синхронный реквестер замеряет фазы в пулах PooledHTTPAdapter; запросы через прокси (proxies сессии или
+HTTP(S)_PROXY) requests отправляет пулами ProxyManager, и такие обмены не замеряются """
+
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from custom_requester.latency_metrics import LatencyHistogram
+from custom_requester.session_stats import register_collector
+from utils.tools import Tools
+
+PHASES = ("dns", "connect", "tls", "ttfb", "download")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def host_key(url):
+    """ Ключ хоста в статистике: scheme://host:port (как у статистики пулов соединений) """
+
+    parts = urlsplit(str(url))
+    return f"{parts.scheme}://{parts.hostname}:{parts.port or _DEFAULT_PORTS.get(parts.scheme)}"
+
+
+class ExchangeTiming:
+    """ Фазы одного обмена в секундах. None - фазы не было (соединение из пула, http без TLS)
+    или транспорт ее не различает (httpx не отделяет DNS от connect) """
+
+    def __init__(self, host, reused=True):
+        self.host = host
+        self.reused = reused
+        self.dns = None
+        self.connect = None
+        self.tls = None
+        self.ttfb = None
+        self.download = None
+        self._sent_at = None
+        self._headers_at = None
+        self._phase_started = None
+
+    def request_sent(self):
+        self._sent_at = time.perf_counter()
+
+    def headers_received(self):
+        if self._sent_at is not None:
+            self._headers_at = time.perf_counter()
+            self.ttfb = self._headers_at - self._sent_at
+
+    def body_received(self):
+        """ Тело дочитано: фиксируем загрузку и отправляем обмен в статистику хоста. False - обмен не дошел до ответа """
+
+        if self._headers_at is None or self.download is not None:
+            return False
+        self.download = time.perf_counter() - self._headers_at
+        connection_timing.record(self)
+        return True
+
+    def as_dict(self):
+        """ Фазы в миллисекундах для журнала запросов """
+
+        result = {phase: None if getattr(self, phase) is None else round(getattr(self, phase) * 1000, 3)
+                  for phase in PHASES}
+        result["reused"] = self.reused
+        return result
+
+    # ==================== TRACE HTTPX ====================
+
+    def httpx_trace(self, event, info):
+        """ Обработчик extensions={"trace": ...} httpx: события httpcore вида connection.connect_tcp.started,
+        http11.send_request_headers.started, http2.receive_response_body.complete """
+
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            self.reused = False
+            self._phase_started = now
+        elif event == "connection.connect_tcp.complete":
+            # httpcore разрешает имя внутри connect_tcp - DNS входит в connect
+            self.connect = now - self._phase_started
+            self._phase_started = None
+        elif event == "connection.start_tls.started":
+            self._phase_started = now
+        elif event == "connection.start_tls.complete":
+            self.tls = now - self._phase_started
+        elif event.endswith(".send_request_headers.started"):
+            self.request_sent()
+        elif event.endswith(".receive_response_headers.complete"):
+            self.headers_received()
+        elif event.endswith(".receive_response_body.complete"):
+            self.body_received()
+
+    async def async_httpx_trace(self, event, info):
+        """ То же для httpx.AsyncClient: обработчик trace должен быть корутиной """
+
+        self.httpx_trace(event, info)
+
+
+def response_timing(response):
+    """ Фазы обмена, к которому относится ответ requests или httpx, или None (кэш, кассета, запрос через прокси).
+    Для ответа, подставленного вместо 304, - фазы условного запроса """
+
+    timing = getattr(response, "cinescope_timing", None)
+    if timing is None:
+        timing = getattr(getattr(response, "raw", None), "cinescope_timing", None)
+    return timing
+
+
+class ConnectionTimingStats:
+    """ Гистограммы фаз по хостам. DNS / connect / TLS учитываются только для новых соединений """
+
+    PERCENTILES = (50, 95)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host):
+        return self._hosts.setdefault(host, {"requests": 0, "reused": 0,
+                                             "phases": {phase: LatencyHistogram() for phase in PHASES}})
+
+    def record(self, timing):
+        with self._lock:
+            counters = self._host(timing.host)
+            counters["requests"] += 1
+            counters["reused"] += timing.reused
+            for phase in PHASES:
+                value = getattr(timing, phase)
+                if value is not None:
+                    counters["phases"][phase].record(value)
+
+    # ==================== СТАТИСТИКА СЕССИИ ====================
+
+    def snapshot(self):
+        with self._lock:
+            return {host: {"requests": counters["requests"], "reused": counters["reused"],
+                           "phases": {phase: histogram.to_dict() for phase, histogram in counters["phases"].items()}}
+                    for host, counters in self._hosts.items()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for host, data in snapshot.items():
+                counters = self._host(host)
+                counters["requests"] += data.get("requests", 0)
+                counters["reused"] += data.get("reused", 0)
+                for phase, histogram in data.get("phases", {}).items():
+                    counters["phases"][phase].merge(histogram)
+
+    def summary(self):
+        """ По хостам: число запросов, доля переиспользованных соединений, p50/p95/max каждой фазы в миллисекундах """
+
+        with self._lock:
+            result = {}
+            for host, counters in self._hosts.items():
+                row = {"requests": counters["requests"], "reused": counters["reused"], "phases": {}}
+                for phase, histogram in counters["phases"].items():
+                    if histogram.total:
+                        row["phases"][phase] = {"count": histogram.total, "max_ms": histogram.max_us / 1000,
+                                                **{f"p{percent}_ms": histogram.percentile(percent)
+                                                   for percent in self.PERCENTILES}}
+                result[host] = row
+            return result
+
+    def report_lines(self):
+        lines = []
+        for host, row in sorted(self.summary().items()):
+            reuse = row["reused"] / row["requests"] * 100 if row["requests"] else 0.0
+            phases = " ".join(f"{phase}={values['p50_ms']:.1f}/{values['p95_ms']:.1f}ms(n={values['count']})"
+                              for phase, values in row["phases"].items())
+            lines.append(f"{host}: requests={row['requests']} reused={reuse:.1f}% p50/p95 {phases}")
+        return lines
+
+    def write_artifact(self):
+        """ Сохранение сводки и гистограмм в files/metrics/http_phases.json """
+
+        summary = self.summary()
+        if not summary:
+            return None
+        path = Tools.files_dir("metrics", "http_phases.json")
+        with open(path, "w", encoding="utf-8") as artifact:
+            json.dump({"summary": summary, "histograms": self.snapshot()}, artifact, ensure_ascii=False, indent=2)
+        return path
+
+
+connection_timing = register_collector("connection_phases", ConnectionTimingStats())
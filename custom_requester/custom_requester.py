@@ -1,128 +1,445 @@
-import json
 import logging
 import os
-from constants import BASE_URL, HEADERS, RED, GREEN, PURPLE, RESET
-from pydantic import BaseModel
+import time
+from functools import partial
+from constants import BASE_URL
+from custom_requester.cassette import CassetteError
+from custom_requester.circuit_breaker import circuit_breakers
+from custom_requester.compression import compression_stats, request_compression, wire_size
+from custom_requester.conditional_get import validator_store
+from custom_requester.connection_timing import response_timing
+from custom_requester.deadline import DeadlineExceeded, current_deadline
+from custom_requester.batch import as_request_spec, failing_call, run_batch
+from custom_requester.endpoint_template import template_endpoint
+from custom_requester.header_sets import HeaderSet, prepare_session_headers
+from custom_requester.latency_metrics import latency_metrics
+from custom_requester.http_transport import mount_transport
+from custom_requester.json_codec import encode_body, memoize_json
+from custom_requester.json_stream import iter_json_array
+from custom_requester.pagination import Page, iter_pages, page_count_of
+from custom_requester.rate_limiter import rate_limiters
+from custom_requester.request_journal import get_journal
+from custom_requester.request_logging import (LazyMessage, format_request, format_response, format_stream_response,
+                                              should_log)
+from custom_requester.response_cache import WRITE_METHODS, response_cache
+from custom_requester.retry import RetryPolicy
+from custom_requester.single_flight import single_flight
+from resources.http_settings import (HttpCacheSettings, HttpConditionalSettings, HttpPoolSettings,
+                                     HttpSingleFlightSettings, HttpTimeoutSettings)
 
 
-class CustomRequester:
+class BaseRequester:
+    """ Общая часть синхронного и асинхронного реквестеров: ключи кэша и условных запросов, выключатель,
+    лимит частоты, дедлайн, метрики и журнал обменов, проверка статуса и логирование.
+    send_request и методы поверх него реализуют наследники """
+
+    def _cache_key(self, method, url, params, headers, cacheable):
+        """ Ключ кэша ответов или None, если запрос не кэшируется """
+
+        if not cacheable or not HttpCacheSettings.ENABLED or method.upper() != "GET":
+            return None
+        return response_cache.key(method, url, params, headers, self.session.cookies)
+
+    def _flight_key(self, method, url, params, headers, coalesce, cacheable):
+        """ Ключ объединения одновременных запросов или None, если запрос выполняется отдельно """
+
+        if coalesce is None:
+            coalesce = cacheable and HttpSingleFlightSettings.ENABLED
+        if not coalesce or method.upper() != "GET":
+            return None
+        return response_cache.key(method, url, params, headers, self.session.cookies)
+
+    def _validator_key(self, method, url, params, headers):
+        """ Ключ хранилища валидаторов или None, если условный запрос не нужен """
+
+        if not HttpConditionalSettings.ENABLED or method.upper() != "GET":
+            return None
+        return response_cache.key(method, url, params, headers, self.session.cookies)
+
+    def _resolve_conditional(self, validator_key, response, stored, expected_status):
+        """ 304 на условный запрос превращается в сохраненный ответ stored, чтобы expected_status=200 выполнялся.
+        Если тест сам ожидает 304, ответ возвращается как есть """
+
+        if validator_key is None or (response.status_code == 304 and self._status_matches(response, expected_status)):
+            return response
+        return validator_store.resolve(validator_key, response, stored)
+
+    @staticmethod
+    def _update_cache(method, url, cache_key, response):
+        """ Успешный GET попадает в кэш, успешная запись сбрасывает связанные с путем записи """
+
+        if not HttpCacheSettings.ENABLED or not 200 <= response.status_code < 300:
+            return
+        if cache_key is not None:
+            response_cache.put(cache_key, response)
+        elif method.upper() in WRITE_METHODS:
+            response_cache.invalidate(url)
+
+    def _breaker_before_call(self):
+        """ Проверка выключателя сервиса: при разомкнутом выключателе запрос не отправляется (CircuitOpenError) """
+
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def _breaker_release(self):
+        """ Освобождение места пробного запроса, если запрос не дал результата о сервисе """
+
+        if self.breaker is not None:
+            self.breaker.release()
+
+    def _record_breaker(self, failed, error, status, expected=False):
+        """ Результат запроса для выключателя. Ошибка кассеты, таймаут, урезанный дедлайном теста, и 5xx, который
+        тест ожидает (expected, негативные проверки), - не сбои сервиса: они не попадают в окно,
+        а место пробного запроса освобождается """
+
+        if self.breaker is None:
+            return
+        deadline = current_deadline()
+        if isinstance(error, CassetteError) or (failed and expected) or (
+                error is not None and deadline is not None and deadline.remaining() <= 0):
+            self.breaker.release()
+        else:
+            self.breaker.record(not failed, error=type(error).__name__ if error is not None else status)
+
+    def _rate_limit_delay(self):
+        """ Токен из корзины хоста. Возвращает, сколько секунд подождать перед отправкой запроса """
+
+        if self.rate_limiter is None:
+            return 0.0
+        delay = self.rate_limiter.reserve()
+        rate_limiters.record_wait(self.rate_limiter.host, delay)
+        return delay
+
+    def _request_timeout(self, method, endpoint):
+        """ Таймауты попытки (connect, read) из HttpTimeoutSettings, урезанные остатком дедлайна теста.
+        Если бюджет теста уже исчерпан, запрос не отправляется (DeadlineExceeded) """
+
+        connect, read = HttpTimeoutSettings.CONNECT, HttpTimeoutSettings.READ
+        deadline = current_deadline()
+        if deadline is None:
+            return connect, read
+        remaining = deadline.ensure(self._metrics_key(method, endpoint))
+        return min(connect, remaining), min(read, remaining)
+
+    def _budget_wait(self, seconds, reason, method, endpoint):
+        """ Пауза seconds с учетом дедлайна теста: пауза длиннее остатка сразу завершается DeadlineExceeded """
+
+        deadline = current_deadline()
+        if seconds and deadline is not None:
+            deadline.ensure(self._metrics_key(method, endpoint), needed=seconds)
+            deadline.charge(reason, seconds)
+        return seconds
+
+    def _raise_if_deadline_expired(self, method, endpoint, error):
+        """ Таймаут, урезанный дедлайном, превращается в DeadlineExceeded с разбивкой времени теста """
+
+        deadline = current_deadline()
+        if deadline is not None and deadline.remaining() <= 0:
+            raise DeadlineExceeded(deadline.breakdown(self._metrics_key(method, endpoint), 0.0)) from error
+
+    def _retry_delay(self, policy, method, endpoint, attempt, expected_status, response=None, error=None):
+        """ Пауза перед повтором или None, если результат попытки окончательный.
+        Ожидаемый тестом статус не повторяется, даже если он входит в повторяемые """
+
+        if policy is None or (response is not None and self._status_matches(response, expected_status)):
+            return None
+        if not policy.should_retry(method, attempt, response=response, error=error):
+            return None
+        latency_metrics.record_retry(self._metrics_key(method, endpoint))
+        return policy.delay(attempt, response)
+
+    def _metrics_key(self, method, endpoint):
+        """ Ключ эндпоинта в метриках: "METHOD host/шаблон/эндпоинта" """
+
+        return f"{method} {self.base_url.split('://', 1)[-1]}{template_endpoint(endpoint)}"
+
+    def _record_exchange(self, method, endpoint, response, elapsed, error=None, attempt=1, streamed=False,
+                         expected_status=None):
+        """ Учет выполненного обмена запрос/ответ: гистограмма задержек эндпоинта и журнал запросов.
+        Для потокового ответа задержка - время до заголовков, размер берется из Content-Length.
+        expected_status - статус, который ожидает тест: такой 5xx не считается сбоем сервиса для выключателя """
+
+        status = response.status_code if response is not None else None
+        failed = error is not None or status >= 500
+        latency_metrics.record(self._metrics_key(method, endpoint), elapsed, error=failed)
+        deadline = current_deadline()
+        if deadline is not None:
+            outcome = type(error).__name__ if error is not None else status
+            deadline.charge(f"{self._metrics_key(method, endpoint)} {outcome}", elapsed)
+        self._record_breaker(failed, error, status, expected=response is not None and expected_status is not None
+                             and self._status_matches(response, expected_status))
+
+        wire = None if response is None or streamed else wire_size(response)
+        if wire is not None:
+            compression_stats.record_response(self._metrics_key(method, endpoint), wire, len(response.content))
+
+        journal = get_journal()
+        if journal is None:
+            return
+
+        request_body = None
+        if response is not None:
+            # У requests тело запроса хранится в body, у httpx - в content
+            request_body = getattr(response.request, "body", None) or getattr(response.request, "content", None)
+        journal.record({
+            "ts": time.time(),
+            "test": os.environ.get('PYTEST_CURRENT_TEST', '').replace(' (call)', ''),
+            "method": method,
+            "url": f"{self.base_url}{template_endpoint(endpoint)}",
+            "status": status,
+            "attempt": attempt,
+            "latency_ms": round(elapsed * 1000, 3),
+            "request_bytes": len(request_body) if request_body else 0,
+            "response_bytes": self._response_size(response, streamed),
+            "response_wire_bytes": wire,
+            "phases": self._phases(response),
+            "error": type(error).__name__ if error is not None else None,
+        })
+
+    def _compress_body(self, method, endpoint, body):
+        """ gzip тела запроса, если сжатие тел включено и тело больше порога. None - отправлять как есть """
+
+        compressed = request_compression.compress(self.base_url, body)
+        if compressed is not None:
+            compression_stats.record_request(self._metrics_key(method, endpoint), len(compressed), len(body))
+        return compressed
+
+    @staticmethod
+    def _phases(response):
+        """ DNS / connect / TLS / TTFB / загрузка тела обмена в миллисекундах (download - None, пока тело не дочитано) """
+
+        timing = response_timing(response) if response is not None else None
+        return timing.as_dict() if timing is not None else None
+
+    @staticmethod
+    def _response_size(response, streamed):
+        if response is None:
+            return 0
+        if streamed:
+            return int(response.headers.get("Content-Length") or 0)
+        return len(response.content)
+
+    @staticmethod
+    def _prepare_body(data):
+        """ Подготовка тела запроса: словарь, список или Pydantic модель сериализуются в JSON-bytes один раз.
+        Этот же буфер уходит в сеть (request.body) и выводится в лог """
+
+        return encode_body(data)
+
+    @staticmethod
+    def _status_matches(response, expected_status):
+        """ Соответствует ли статус-код ответа ожидаемому (int или список/кортеж допустимых кодов) """
+
+        if isinstance(expected_status, (list, tuple)):
+            return response.status_code in expected_status
+        if isinstance(expected_status, int):
+            return response.status_code == expected_status
+        return True
+
+    @classmethod
+    def _check_status(cls, response, expected_status):
+        """ Проверка статус-кода ответа. expected_status - int или список/кортеж допустимых кодов """
+
+        if not cls._status_matches(response, expected_status):
+            raise ValueError(f"Unexpected status code: {response.status_code}. Expected: {expected_status}")
+
+    def _update_session_headers(self, **kwargs):
+        """ Обновление заголовков сессии """
+        
+        self.session.headers.update(kwargs)  # Обновляем базовые заголовки
+
+    def log_request_and_response(self, response, failed=None, streamed=False):
+        """ Логгирование запросов и ответов. Настройки логгирования описаны в pytest.ini, какие обмены выводить -
+        HTTP_LOG_POLICY (все, только ошибки или выборка успешных). Секреты в заголовках и телах скрываются.
+        Текст собирается лениво - только если запись действительно будет выведена.
+        streamed - тело ответа читается вызывающим кодом, в лог попадает только статус """
+
+        if failed is None:
+            failed = response.status_code >= 400
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        # Имя теста берем сразу: к моменту вывода записи PYTEST_CURRENT_TEST может измениться
+        test_info = os.environ.get('PYTEST_CURRENT_TEST', '').replace(' (call)', '')
+        if not should_log(test_info, response.request.method, response.request.url, failed):
+            return
+
+        self.logger.info("%s", LazyMessage(format_request, response.request, test_info, failed))
+        self.logger.info("%s", LazyMessage(format_stream_response if streamed else format_response, response))
+
+
+class CustomRequester(BaseRequester):
     """ Инициализация кастомного реквестера """
 
     def __init__(self, session, base_url=BASE_URL, default_headers=None):
         self.session = session
         self.base_url = base_url
-        self.base_headers = HEADERS.copy()
-        if default_headers:
-            self.base_headers.update(default_headers)
-        
-        # Обновляем заголовки сессии
-        self.session.headers = self.base_headers.copy()
+
+        # Для каждого хоста монтируем свой транспорт (повторно для того же хоста не монтируется)
+        mount_transport(self.session, self.base_url)
+        # Выключатель общий для всех API-классов процесса с тем же base_url (ApiManager может передать свой реестр)
+        self.breaker = circuit_breakers.for_url(self.base_url)
+        # Лимит частоты запросов общий для хоста: потоки и воркеры xdist берут токены из одной корзины
+        self.rate_limiter = rate_limiters.for_url(self.base_url)
+
+        # Стандартные заголовки ставятся в сессию один раз, default_headers реквестера в сессию не пишутся:
+        # API-классы на общей сессии не затирают заголовки друг друга
+        prepare_session_headers(self.session)
+        self.header_set = HeaderSet(self.session, default_headers)
 
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
 
     def send_request(self, method, endpoint, data=None, params=None, headers=None, expected_status=200,
-                     need_logging=True):
-        """ Универсальный метод для отправки запросов """
+                     need_logging=True, retry=None, cacheable=False, stream=False, coalesce=None):
+        """ Универсальный метод для отправки запросов.
+        retry - политика повторов: None - по настройкам HttpRetrySettings, True/False или RetryPolicy.
+        cacheable - GET-ответ можно брать из кэша ответов (если кэш включен в HttpCacheSettings).
+        stream - тело успешного ответа не читается заранее (см. stream_items), кэш и условные запросы не используются.
+        coalesce - одинаковые одновременные GET выполняются одним запросом: None - для cacheable запросов,
+        если включен HttpSingleFlightSettings, True/False - явно """
 
         url = f"{self.base_url}{endpoint}"
 
-        request_headers = self.session.headers.copy()
-        if headers:
-            request_headers.update(headers)
-            
-        # Проверяем, является ли data моделью Pydantic
-        if isinstance(data, BaseModel):
-            data = data.model_dump(exclude_unset=True)  
-            
-        response = self.session.request(method, url, json=data, params=params, headers=request_headers)
+        # Неизменяемый набор, собранный заранее; копия создается только при заголовках конкретного запроса
+        request_headers = self.header_set.with_overrides(headers)
 
-        if need_logging:
-            self.log_request_and_response(response)
+        cache_key = self._cache_key(method, url, params, request_headers, cacheable and not stream)
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                self._check_status(cached, expected_status)
+                return cached
 
-        if isinstance(expected_status, (list, tuple)):
-            if response.status_code not in expected_status:
-                raise ValueError(
-                    f"Unexpected status code: {response.status_code}. Expected: {expected_status}"
-                )
-        elif isinstance(expected_status, int):
-            if response.status_code != expected_status:
-                raise ValueError(f"Unexpected status code: {response.status_code}. Expected: {expected_status}")
+        # Потоковый ответ читается один раз и не может быть общим
+        flight_key = None if stream else self._flight_key(method, url, params, request_headers, coalesce, cacheable)
 
-        return response
+        def perform():
+            validator_key = None if stream else self._validator_key(method, url, params, request_headers)
+            stored, conditional_headers = validator_store.lookup(validator_key) if validator_key else (None, {})
 
-    def _update_session_headers(self, **kwargs):
-        """ Обновление заголовков сессии """
-        
-        self.session.headers.update(kwargs)  # Обновляем базовые заголовки
+            body = self._prepare_body(data)
+            plain_headers = request_headers
+            extra_headers = dict(conditional_headers)
+            if body is not None and "Content-Type" not in request_headers:
+                extra_headers["Content-Type"] = "application/json"
+            if extra_headers:
+                plain_headers = self.header_set.with_overrides({**(headers or {}), **extra_headers})
+            sent_body, sent_headers = body, plain_headers
+            compressed = self._compress_body(method, endpoint, body)
+            if compressed is not None:
+                sent_body = compressed
+                sent_headers = self.header_set.with_overrides(
+                    {**(headers or {}), **extra_headers, "Content-Encoding": "gzip"})
 
-    def log_request_and_response(self, response):
-        """ Логгирование запросов и ответов. Настройки логгирования описаны в pytest.ini """
-        
-        try:
-            request = response.request
-            headers = " \\ ".join([f"-H '{header}: {value}'" for header, value in request.headers.items()])
-            
-            # Получаем информацию о тесте
-            test_info = os.environ.get('PYTEST_CURRENT_TEST', '').replace(' (call)', '')
-            full_test_name = f"pytest {test_info}"
-            
-            # Определяем цвет теста на основе статуса ответа
-            # Если статус код указывает на ошибку (4xx, 5xx), используем красный цвет
-            if response.status_code >= 400:
-                test_color = RED
-            else:
-                test_color = GREEN
-
-            body = ""
-            if hasattr(request, 'body') and request.body is not None:
-                if isinstance(request.body, bytes):
-                    body_text = request.body.decode('utf-8')
-                elif isinstance(request.body, str):
-                    body_text = request.body
-                else:
-                    body_text = str(request.body)
-                
-                # Пытаемся распарсить JSON для корректного отображения кириллицы
+            policy = RetryPolicy.resolve(retry)
+            if policy is not None:
+                policy.budget.deposit()
+
+            attempt = 1
+            while True:
+                throttle = self._budget_wait(self._rate_limit_delay(), "ожидание лимита частоты", method, endpoint)
+                if throttle:
+                    time.sleep(throttle)
+                timeout = self._request_timeout(method, endpoint)
+                # Разрешение выключателя - последним перед отправкой: пробный запрос half-open не должен
+                # потеряться на исчерпанном дедлайне или паузе лимита
+                self._breaker_before_call()
+                started = time.perf_counter()
                 try:
-                    body_json = json.loads(body_text)
-                    body_text = json.dumps(body_json, ensure_ascii=False)
-                except (ValueError, json.JSONDecodeError):
-                    # Если не JSON, оставляем как есть
-                    pass
-                
-                body = f"-d '{body_text}' \n" if body_text != '{}' else ''
-
-            # Логируем request
-            self.logger.info(f"\n{'=' * 35} {PURPLE}REQUEST{RESET} {'=' * 35}")    
-            self.logger.info(
-                f"{test_color}{full_test_name}{RESET}\n"
-                f"curl -X {PURPLE}{request.method} {request.url}{RESET}  \\\n"
-                f"{headers} \\\n"
-                f"{body}"
+                    response = self.session.request(method, url, data=sent_body, params=params,
+                                                    headers=sent_headers, stream=stream, timeout=timeout)
+                except Exception as error:
+                    self._record_exchange(method, endpoint, None, time.perf_counter() - started, error=error,
+                                          attempt=attempt)
+                    self._raise_if_deadline_expired(method, endpoint, error)
+                    delay = self._retry_delay(policy, method, endpoint, attempt, expected_status, error=error)
+                    if delay is None:
+                        raise
+                except BaseException:
+                    # Прерванный запрос (Ctrl+C) ничего не говорит о сервисе
+                    self._breaker_release()
+                    raise
+                else:
+                    memoize_json(response)
+                    self._record_exchange(method, endpoint, response, time.perf_counter() - started, attempt=attempt,
+                                          streamed=stream, expected_status=expected_status)
+                    if response.status_code == 415 and sent_body is not body:
+                        # Сервис не принимает сжатые тела - повторяем без сжатия, попытка не расходуется
+                        request_compression.reject(self.base_url)
+                        sent_body, sent_headers = body, plain_headers
+                        response.close()
+                        continue
+                    delay = self._retry_delay(policy, method, endpoint, attempt, expected_status, response=response)
+                    if delay is None:
+                        break
+                    response.close()
+                time.sleep(self._budget_wait(delay, "паузы перед повторами", method, endpoint))
+                attempt += 1
+
+            response = self._resolve_conditional(validator_key, response, stored, expected_status)
+            self._update_cache(method, url, cache_key, response)
+            return response
+
+        # Одинаковые одновременные GET уходят в сеть один раз, остальные вызывающие получают тот же ответ
+        response = perform() if flight_key is None else single_flight.do(flight_key, perform)
+
+        try:
+            self._check_status(response, expected_status)
+        except ValueError:
+            # Тело ошибки небольшое - дочитываем его для лога даже в потоковом режиме
+            if need_logging:
+                self.log_request_and_response(response, failed=True)
+            raise
+
+        if need_logging:
+            self.log_request_and_response(response, streamed=stream)
+
+        return response
+
+    def stream_items(self, endpoint, key, model, params=None, expected_status=200, chunk_size=64 * 1024):
+        """ Потоковое получение списка: элементы массива key из ответа GET endpoint разбираются по мере
+        чтения тела и возвращаются по одному как модели model. Память не растет с размером страницы """
+
+        response = self.send_request("GET", endpoint, params=params, expected_status=expected_status, stream=True)
+        with response:
+            for item in iter_json_array(response.iter_content(chunk_size=chunk_size), key):
+                yield model.model_validate(item)
+
+    def iter_items(self, endpoint, key, model, params=None, page_size=None, size_param="pageSize", prefetch=None,
+                   expected_status=200):
+        """ Элементы массива key со всех страниц списка GET endpoint как модели model.
+        Следующие prefetch страниц загружаются в фоне, пока обрабатывается текущая (HTTP_PAGE_PREFETCH) """
+
+        page_size = page_size or (params or {}).get(size_param) or HttpPoolSettings.PAGE_SIZE
+        base_params = {name: value for name, value in (params or {}).items() if name not in ("page", size_param)}
+        first_page = int((params or {}).get("page") or 1)
+
+        def fetch_page(page):
+            response = self.send_request(
+                "GET", endpoint, params={**base_params, "page": page, size_param: page_size},
+                expected_status=expected_status
             )
+            payload = response.json()
+            return Page([model.model_validate(item) for item in payload[key]], page_count_of(payload, page_size))
+
+        return iter_pages(fetch_page, page_size, first_page=first_page, prefetch=prefetch)
+
+    def send_many(self, requests, max_concurrency=None, need_logging=True):
+        """ Параллельная отправка пачки запросов. requests - список RequestSpec или кортежей
+        (method, endpoint, data, params, expected_status). Возвращает список BatchResult в порядке входа,
+        ошибка элемента (в том числе неверный кортеж) - в exception его BatchResult """
 
-            response_status = response.status_code
-            is_success = response.ok
-            
-            # Форматируем данные для лучшей читаемости
+        calls = []
+        for item in requests:
             try:
-                if response.content:
-                    response_json = response.json()
-                    # Используем ensure_ascii=False для корректного отображения Unicode символов
-                    response_data = json.dumps(response_json, indent=4, ensure_ascii=False)
-                else:
-                    response_data = response.text
-            except (ValueError, json.JSONDecodeError):
-                response_data = response.text
-            
-            # Логируем response для всех запросов
-            self.logger.info(f"\n{'=' * 34} {PURPLE}RESPONSE{RESET} {'=' * 35}")
-            if is_success:
-                self.logger.info(f"\tSTATUS_CODE: {GREEN}{response_status}{RESET}"
-                               f"\nDATA: {response_data}{RESET}")
-            else:
-                self.logger.info(f"\tSTATUS_CODE: {RED}{response_status}{RESET}"
-                               f"\nDATA: {RED}{response_data}{RESET}")
-        except Exception as e:
-            self.logger.info(f"\nLogging went wrong: {type(e)} - {e}")
+                spec = as_request_spec(item)
+            except TypeError as error:
+                calls.append((item, failing_call(error)))
+                continue
+            calls.append((spec, partial(
+                self.send_request, spec.method, spec.endpoint, data=spec.data, params=spec.params,
+                expected_status=spec.expected_status, need_logging=need_logging
+            )))
+
+        return run_batch(calls, max_concurrency or HttpPoolSettings.BATCH_MAX_CONCURRENCY)
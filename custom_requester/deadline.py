@@ -0,0 +1,79 @@
+""" Дедлайн теста: бюджет времени, из которого тратят все HTTP-запросы теста (включая паузы повторов
+и ожидание лимита частоты). Запрос, которому не хватает остатка, сразу завершается DeadlineExceeded
+с разбивкой, куда ушло время """
+
+import threading
+import time
+
+OTHER = "остальное (код теста, фикстуры, БД)"
+
+
+class DeadlineExceeded(TimeoutError):
+    """ Бюджет времени теста исчерпан. Сообщение содержит разбивку потраченного времени """
+
+
+class Deadline:
+    """ Бюджет budget секунд, отсчитываемый с момента создания. Общий для всех потоков и задач теста """
+
+    def __init__(self, budget, name=""):
+        self.budget = budget
+        self.name = name
+        self.started = time.monotonic()
+        self._spent = {}
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return self.budget - (time.monotonic() - self.started)
+
+    def charge(self, label, seconds):
+        """ Учет потраченного времени под меткой label (эндпоинт со статусом, пауза повтора и т.п.) """
+
+        with self._lock:
+            total, count = self._spent.get(label, (0.0, 0))
+            self._spent[label] = (total + seconds, count + 1)
+
+    def ensure(self, action, needed=0.0):
+        """ Остаток бюджета в секундах. DeadlineExceeded, если остатка нет или меньше needed """
+
+        remaining = self.remaining()
+        if remaining <= 0 or remaining < needed:
+            raise DeadlineExceeded(self.breakdown(action, remaining, needed))
+        return remaining
+
+    def breakdown(self, action, remaining, needed=0.0):
+        """ Текст ошибки: что не успело выполниться и на что ушел бюджет (самые долгие статьи первыми) """
+
+        with self._lock:
+            spent = sorted(self._spent.items(), key=lambda item: item[1][0], reverse=True)
+        elapsed = time.monotonic() - self.started
+        accounted = sum(total for total, _ in self._spent.values())
+        wait = f", нужно {needed:.2f} с" if needed else ""
+        lines = [f"Дедлайн теста {self.name} ({self.budget:.1f} с) исчерпан: {action} не выполнен, "
+                 f"осталось {max(remaining, 0.0):.2f} с{wait}. Куда ушло время ({elapsed:.2f} с):"]
+        for label, (total, count) in spent[:15]:
+            lines.append(f"  {label}: {total:.2f} с ({count})")
+        if len(spent) > 15:
+            rest = spent[15:]
+            lines.append(f"  еще {len(rest)} статей: {sum(total for _, (total, _) in rest):.2f} с")
+        lines.append(f"  {OTHER}: {max(elapsed - accounted, 0.0):.2f} с")
+        return "\n".join(lines)
+
+
+_current = None
+
+
+def current_deadline():
+    """ Дедлайн текущего теста или None. Один на процесс: воркеры xdist выполняют тесты по одному """
+
+    return _current
+
+
+def start_deadline(budget, name=""):
+    global _current
+    _current = Deadline(budget, name) if budget and budget > 0 else None
+    return _current
+
+
+def clear_deadline():
+    global _current
+    _current = None
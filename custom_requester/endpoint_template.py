@@ -0,0 +1,17 @@
+""" Приведение конкретных эндпоинтов к шаблонам: /movies/123/reviews -> /movies/{id}/reviews """
+
+import re
+from functools import lru_cache
+
+# Сегменты пути, которые являются идентификаторами: числа, UUID, email (get_user принимает email как локатор)
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[^/@]+@[^/@]+)$"
+)
+
+
+@lru_cache(maxsize=4096)
+def template_endpoint(endpoint):
+    """ Шаблон эндпоинта без query-параметров, в котором идентификаторы заменены на {id} """
+
+    path = endpoint.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
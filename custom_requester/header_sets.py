@@ -0,0 +1,71 @@
+""" Заранее собранные неизменяемые наборы заголовков запросов.
+Заголовки сессии ведут счетчик изменений, набор реквестера пересобирается только после изменения (например, токена) """
+
+from types import MappingProxyType
+
+from requests.structures import CaseInsensitiveDict
+
+from constants import HEADERS
+from custom_requester.compression import accept_encoding
+
+
+class VersionedHeaders(CaseInsensitiveDict):
+    """ Заголовки сессии requests со счетчиком изменений version """
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+
+def prepare_session_headers(session):
+    """ Стандартные заголовки (HEADERS и Accept-Encoding) ставятся в сессию один раз - при создании первого реквестера.
+    Следующие API-классы на той же сессии не перезаписывают уже выставленные заголовки (например, токен) """
+
+    if not isinstance(session.headers, VersionedHeaders):
+        session.headers = VersionedHeaders({**HEADERS, "Accept-Encoding": accept_encoding()})
+
+
+def prepare_client_headers(client):
+    """ Аналог prepare_session_headers для httpx.AsyncClient: HEADERS ставятся в клиент один раз """
+
+    if not getattr(client, "cinescope_headers", False):
+        client.headers.update({**HEADERS, "Accept-Encoding": accept_encoding()})
+        client.cinescope_headers = True
+
+
+class HeaderSet:
+    """ Заголовки запросов реквестера: заголовки сессии + default_headers реквестера.
+    current() возвращает неизменяемый набор, общий для всех запросов до следующего изменения заголовков сессии """
+
+    def __init__(self, session, default_headers=None):
+        self.session = session
+        self.default_headers = dict(default_headers or {})
+        self._source = None
+        self._version = None
+        self._frozen = None
+
+    def current(self):
+        headers = self.session.headers
+        version = getattr(headers, "version", None)
+        # Заголовки без счетчика (сессию подменили обычным словарем) собираются заново на каждый запрос
+        if headers is not self._source or version is None or version != self._version:
+            merged = CaseInsensitiveDict(headers)
+            merged.update(self.default_headers)
+            self._frozen = MappingProxyType(merged)
+            self._source, self._version = headers, version
+        return self._frozen
+
+    def with_overrides(self, overrides):
+        """ Набор с заголовками конкретного запроса. Копия создается, только если они есть """
+
+        if not overrides:
+            return self.current()
+        merged = CaseInsensitiveDict(self.current())
+        merged.update(overrides)
+        return merged
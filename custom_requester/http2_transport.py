@@ -0,0 +1,308 @@
+""" Транспорт HTTP/2 на httpx для выбранных хостов (HTTP2_HOSTS): одновременные запросы к хосту идут
+потоками одного мультиплексированного соединения. Для https протокол выбирается через ALPN (сервер без HTTP/2
+получает HTTP/1.1), для http - HTTP/2 без TLS (h2c) только при HTTP2_CLEARTEXT, с откатом на HTTP/1.1,
+если сервер его не понимает """
+
+import logging
+import threading
+from http.client import HTTPMessage
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import httpx
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.exceptions import ConnectionError as RequestsConnectionError, ConnectTimeout, ReadTimeout
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from custom_requester.connection_timing import ExchangeTiming, host_key
+from resources.http_settings import HttpPoolSettings
+
+logger = logging.getLogger(__name__)
+
+# Ошибки первого h2c-запроса к серверу, который говорит только HTTP/1.1
+_H2C_REJECTED = (httpx.ProtocolError, httpx.ReadError, httpx.WriteError)
+
+# Коды RST_STREAM, с которыми сервер отклоняет поток, не начав обработку: REFUSED_STREAM и STREAM_CLOSED -
+# такой запрос безопасно отправить еще раз
+_UNPROCESSED_RESETS = (5, 7)
+_STREAM_RETRIES = 3
+
+# События трассировки httpcore: заголовки запроса отправлены (или отправка не удалась)
+_HEADERS_SENT = ("send_request_headers.complete", "send_request_headers.failed")
+
+
+def http2_available():
+    """ Установлен ли пакет h2 (нужен httpx для HTTP/2) """
+
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def http2_hosts():
+    """ Хосты из HTTP2_HOSTS: host или host:port через запятую, * - все хосты """
+
+    return {host.strip().lower() for host in HttpPoolSettings.HTTP2_HOSTS.split(",") if host.strip()}
+
+
+def http2_enabled_for(base_url):
+    """ Выбран ли HTTP/2 для хоста base_url. Без пакета h2 - всегда HTTP/1.1 с предупреждением в логе """
+
+    hosts = http2_hosts()
+    parts = urlsplit(base_url)
+    if not ("*" in hosts or parts.netloc.lower() in hosts or (parts.hostname or "").lower() in hosts):
+        return False
+    if not http2_available():
+        logger.warning("HTTP/2 для %s не включен: пакет h2 не установлен, используется HTTP/1.1", parts.netloc)
+        return False
+    return True
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=HttpPoolSettings.POOL_MAXSIZE,
+        max_keepalive_connections=HttpPoolSettings.POOL_MAXSIZE,
+        keepalive_expiry=HttpPoolSettings.KEEPALIVE_IDLE
+    )
+
+
+class _FallbackState:
+    """ Выбор транспорта запроса: https - ALPN, http - h2c до первого отказа сервера, дальше HTTP/1.1 """
+
+    def __init__(self):
+        self.h2c_rejected = False
+        self.h2c_confirmed = False
+
+    def pick(self, request, alpn, h2c, http1):
+        if request.url.scheme == "https":
+            return alpn
+        if HttpPoolSettings.HTTP2_CLEARTEXT and not self.h2c_rejected:
+            return h2c
+        return http1
+
+    def reject(self, request, error):
+        """ True - отказ h2c на первом запросе, запрос нужно повторить по HTTP/1.1 """
+
+        if self.h2c_confirmed:
+            return False
+        # Одновременные первые запросы получают отказ все сразу - предупреждаем один раз
+        if not self.h2c_rejected:
+            logger.warning("%s не поддерживает HTTP/2 без TLS (%s: %s), используется HTTP/1.1",
+                           request.url.netloc.decode("ascii"), type(error).__name__, error)
+        self.h2c_rejected = True
+        return True
+
+
+def _stream_refused(error):
+    """ Сервер сбросил поток запроса, не обработав его (httpcore передает событие h2 StreamReset в args) """
+
+    event = error.args[0] if error.args else None
+    return getattr(event, "error_code", None) in _UNPROCESSED_RESETS
+
+
+class _OrderedStreamOpening:
+    """ Открытие потоков HTTP/2 по порядку номеров. Синхронный httpcore выдает номер потока и отправляет HEADERS
+    без общей блокировки: при параллельных потоках выполнения заголовки потока с большим номером иногда уходят
+    раньше, и сервер закрывает соединение (GOAWAY PROTOCOL_ERROR) вместе со всеми его запросами.
+    Блокировка держится от входа в пул до отправки заголовков; тело и ожидание ответа идут параллельно """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def handle_request(self, transport, request):
+        self._lock.acquire()
+        held = [True]
+
+        def release():
+            if held[0]:
+                held[0] = False
+                self._lock.release()
+
+        trace = request.extensions.get("trace")
+
+        def ordered_trace(event_name, info):
+            if event_name.endswith(_HEADERS_SENT):
+                release()
+            if trace is not None:
+                trace(event_name, info)
+
+        extensions = request.extensions
+        request.extensions = {**extensions, "trace": ordered_trace}
+        try:
+            return transport.handle_request(request)
+        finally:
+            release()
+            request.extensions = extensions
+
+
+class Http2FallbackTransport(httpx.BaseTransport):
+    """ Синхронный транспорт httpx: HTTP/2 с откатом на HTTP/1.1 """
+
+    def __init__(self, limits=None):
+        limits = limits or _limits()
+        self.alpn = httpx.HTTPTransport(http2=True, limits=limits)
+        self.h2c = httpx.HTTPTransport(http1=False, http2=True, limits=limits)
+        self.http1 = httpx.HTTPTransport(limits=limits)
+        self.state = _FallbackState()
+        self.opening = _OrderedStreamOpening()
+
+    def handle_request(self, request):
+        for attempt in range(_STREAM_RETRIES):
+            try:
+                return self._handle_once(request)
+            except httpx.RemoteProtocolError as error:
+                if not _stream_refused(error) or attempt == _STREAM_RETRIES - 1:
+                    raise
+
+    def _handle_once(self, request):
+        transport = self.state.pick(request, self.alpn, self.h2c, self.http1)
+        if transport is self.http1:
+            return transport.handle_request(request)
+        if transport is not self.h2c:
+            return self.opening.handle_request(transport, request)
+        try:
+            response = self.opening.handle_request(self.h2c, request)
+        except _H2C_REJECTED as error:
+            # Сброс потока - ответ сервера HTTP/2, то есть h2c он понимает
+            if _stream_refused(error) or not self.state.reject(request, error):
+                raise
+            return self.http1.handle_request(request)
+        self.state.h2c_confirmed = True
+        return response
+
+    def close(self):
+        for transport in (self.alpn, self.h2c, self.http1):
+            transport.close()
+
+
+class AsyncHttp2FallbackTransport(httpx.AsyncBaseTransport):
+    """ Асинхронный аналог Http2FallbackTransport для httpx.AsyncClient """
+
+    def __init__(self, limits=None):
+        limits = limits or _limits()
+        self.alpn = httpx.AsyncHTTPTransport(http2=True, limits=limits)
+        self.h2c = httpx.AsyncHTTPTransport(http1=False, http2=True, limits=limits)
+        self.http1 = httpx.AsyncHTTPTransport(limits=limits)
+        self.state = _FallbackState()
+
+    async def handle_async_request(self, request):
+        for attempt in range(_STREAM_RETRIES):
+            try:
+                return await self._handle_once(request)
+            except httpx.RemoteProtocolError as error:
+                if not _stream_refused(error) or attempt == _STREAM_RETRIES - 1:
+                    raise
+
+    async def _handle_once(self, request):
+        transport = self.state.pick(request, self.alpn, self.h2c, self.http1)
+        if transport is not self.h2c:
+            return await transport.handle_async_request(request)
+        try:
+            response = await self.h2c.handle_async_request(request)
+        except _H2C_REJECTED as error:
+            # Сброс потока - ответ сервера HTTP/2, то есть h2c он понимает
+            if _stream_refused(error) or not self.state.reject(request, error):
+                raise
+            return await self.http1.handle_async_request(request)
+        self.state.h2c_confirmed = True
+        return response
+
+    async def aclose(self):
+        for transport in (self.alpn, self.h2c, self.http1):
+            await transport.aclose()
+
+
+def async_http2_mounts(limits=None):
+    """ Транспорты httpx.AsyncClient для хостов из HTTP2_HOSTS (аргумент mounts). Пустой словарь - только HTTP/1.1 """
+
+    hosts = http2_hosts()
+    if not hosts or not http2_available():
+        if hosts:
+            logger.warning("HTTP/2 не включен: пакет h2 не установлен, используется HTTP/1.1")
+        return {}
+    if "*" in hosts:
+        return {"all://": AsyncHttp2FallbackTransport(limits)}
+    return {f"all://{host}": AsyncHttp2FallbackTransport(limits) for host in hosts}
+
+
+class _HttpxRaw:
+    """ Минимальная замена urllib3 HTTPResponse поверх ответа httpx: потоковое чтение тела и заголовки
+    Set-Cookie в виде, который requests разбирает в cookie сессии """
+
+    def __init__(self, response):
+        self._response = response
+        msg = HTTPMessage()
+        for name, value in response.headers.multi_items():
+            msg[name] = value
+        self._original_response = SimpleNamespace(msg=msg)
+
+    def stream(self, amt=2 ** 16, decode_content=True):
+        # httpx уже распаковывает gzip / br / zstd
+        yield from self._response.iter_bytes(amt)
+
+    def read(self, amt=None, decode_content=True):
+        return self._response.read()
+
+    def close(self):
+        self._response.close()
+
+    def release_conn(self):
+        self._response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """ Адаптер requests поверх httpx.Client с HTTP/2. Ответ httpx превращается в requests.Response,
+    поэтому CustomRequester, логирование, кэш и кассеты работают без изменений """
+
+    cinescope_transport = True
+
+    def __init__(self):
+        super().__init__()
+        # verify, cert и proxies requests не пробрасываются: используются настройки httpx по умолчанию
+        self.client = httpx.Client(transport=Http2FallbackTransport(), follow_redirects=False)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        timing = ExchangeTiming(host_key(request.url))
+        outgoing = self.client.build_request(request.method, request.url, headers=list(request.headers.items()),
+                                             content=request.body, timeout=timeout,
+                                             extensions={"trace": timing.httpx_trace})
+        try:
+            incoming = self.client.send(outgoing, stream=stream)
+        except httpx.TimeoutException as error:
+            # Для кода выше (повторы, дедлайн теста) ошибки выглядят как у HTTPAdapter
+            raise (ConnectTimeout if isinstance(error, httpx.ConnectTimeout) else ReadTimeout)(
+                error, request=request) from error
+        except httpx.TransportError as error:
+            raise RequestsConnectionError(error, request=request) from error
+        incoming.cinescope_timing = timing
+        return self.build_response(request, incoming, stream)
+
+    def build_response(self, request, incoming, stream):
+        response = Response()
+        response.status_code = incoming.status_code
+        response.reason = incoming.reason_phrase
+        response.headers = CaseInsensitiveDict(incoming.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = _HttpxRaw(incoming)
+        response.http_version = incoming.http_version
+        response.cinescope_timing = getattr(incoming, "cinescope_timing", None)
+        if not stream:
+            response._content = incoming.content
+            # Байты по сети до распаковки - для учета сжатия (compression.wire_size)
+            response.num_bytes_downloaded = incoming.num_bytes_downloaded
+        extract_cookies_to_jar(response.cookies, request, response.raw)
+        return response
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,216 @@
+""" Транспортный слой CustomRequester: отдельный настроенный пул соединений для каждого хоста """
+
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+
+from custom_requester.cassette import CassetteAdapter
+from custom_requester.connection_timing import ExchangeTiming
+from custom_requester.http2_transport import Http2Adapter, http2_enabled_for
+from custom_requester.session_stats import register_collector
+from resources.http_settings import HttpCassetteSettings, HttpPoolSettings
+
+
+class PoolStats:
+    """ Счетчики переиспользования соединений по хостам """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, host, reused):
+        """ Учет выдачи соединения из пула: reused=True - hit, False - новое соединение (miss) """
+
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"hits": 0, "misses": 0})
+            counters["hits" if reused else "misses"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(counters) for host, counters in self._hosts.items()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for host, counters in snapshot.items():
+                own = self._hosts.setdefault(host, {"hits": 0, "misses": 0})
+                own["hits"] += counters.get("hits", 0)
+                own["misses"] += counters.get("misses", 0)
+
+    def report_lines(self):
+        lines = []
+        for host, counters in sorted(self.snapshot().items()):
+            total = counters["hits"] + counters["misses"]
+            reuse = counters["hits"] / total * 100 if total else 0.0
+            lines.append(f"{host}: hits={counters['hits']} misses={counters['misses']} reuse={reuse:.1f}%")
+        return lines
+
+
+pool_stats = register_collector("connection_pools", PoolStats())
+
+
+class _TimedConnectionMixin:
+    """ Замер фаз обмена (connection_timing): DNS и TCP connect раздельно, TLS, TTFB. Загрузку тела
+    завершает пул, когда urllib3 возвращает дочитавшее ответ соединение. Пул выдает соединение
+    одному потоку за раз, поэтому запись фаз хранится на самом соединении """
+
+    cinescope_timing = None
+    _uses_tls = False
+
+    def _new_conn(self):
+        timing = self.cinescope_timing
+        if timing is None:
+            return super()._new_conn()
+
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # Ошибку разрешения имени в виде NameResolutionError сформирует сам urllib3
+            timing.dns = time.perf_counter() - started
+            return super()._new_conn()
+        timing.dns = time.perf_counter() - started
+
+        # Подключаемся к уже разрешенным адресам по очереди (как create_connection), не спрашивая DNS повторно.
+        # Имя хоста для SNI и проверки сертификата остается прежним
+        dns_host = self._dns_host
+        ips = list(dict.fromkeys(address[4][0] for address in addresses))
+        started = time.perf_counter()
+        try:
+            for index, ip in enumerate(ips):
+                self._dns_host = ip
+                try:
+                    return super()._new_conn()
+                except OSError:
+                    if index == len(ips) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+            timing.connect = time.perf_counter() - started
+
+    def connect(self):
+        timing = self.cinescope_timing
+        started = time.perf_counter()
+        super().connect()
+        if timing is not None and self._uses_tls and timing.connect is not None:
+            timing.tls = max(time.perf_counter() - started - timing.dns - timing.connect, 0.0)
+
+    def request(self, *args, **kwargs):
+        if self.cinescope_timing is not None:
+            # Новое соединение для http открывается лениво внутри request - открываем заранее, чтобы TTFB его не включал
+            if self.sock is None:
+                self.connect()
+            self.cinescope_timing.request_sent()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self):
+        response = super().getresponse()
+        timing = self.cinescope_timing
+        if timing is not None:
+            timing.headers_received()
+            response.cinescope_timing = timing
+        return response
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    _uses_tls = True
+
+
+class _CountingPoolMixin:
+    """ Учет hit/miss пула, фаз обмена и отбрасывание соединений, простаивавших дольше KEEPALIVE_IDLE """
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+
+        idle_since = getattr(conn, "_cinescope_idle_since", None)
+        if conn.sock is not None and idle_since is not None:
+            if time.monotonic() - idle_since > HttpPoolSettings.KEEPALIVE_IDLE:
+                # Сервер мог уже закрыть соединение - дешевле открыть новое, чем поймать обрыв
+                conn.close()
+
+        host = f"{self.scheme}://{self.host}:{self.port}"
+        pool_stats.record(host, reused=conn.sock is not None)
+        conn.cinescope_timing = ExchangeTiming(host, reused=conn.sock is not None)
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._cinescope_idle_since = time.monotonic()
+            # urllib3 возвращает соединение в пул, когда тело ответа дочитано (или ответ закрыт)
+            if conn.cinescope_timing is not None:
+                conn.cinescope_timing.body_received()
+                conn.cinescope_timing = None
+        super()._put_conn(conn)
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def keepalive_socket_options(idle=None):
+    """ Опции сокета для TCP keep-alive (TCP_KEEPIDLE доступен не на всех платформах) """
+
+    idle = int(idle if idle is not None else HttpPoolSettings.KEEPALIVE_IDLE)
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE") and idle > 0:
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    return options
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """ HTTP-адаптер с настраиваемым пулом соединений и учетом его эффективности """
+
+    cinescope_transport = True
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=None, **kwargs):
+        super().__init__(
+            pool_connections=pool_connections or HttpPoolSettings.POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or HttpPoolSettings.POOL_MAXSIZE,
+            pool_block=HttpPoolSettings.POOL_BLOCK if pool_block is None else pool_block,
+            **kwargs
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", keepalive_socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+def build_transport(base_url=None):
+    """ Сборка транспорта хоста: пул соединений (или HTTP/2 для хостов из HTTP2_HOSTS),
+    при включенных кассетах - адаптер записи/воспроизведения поверх """
+
+    adapter = Http2Adapter() if base_url and http2_enabled_for(base_url) else PooledHTTPAdapter()
+    if HttpCassetteSettings.MODE != "off":
+        adapter = CassetteAdapter(adapter)
+    return adapter
+
+
+def mount_transport(session, base_url):
+    """ Монтирует транспорт для base_url, если для него еще не смонтирован транспорт Cinescope """
+
+    if not hasattr(session, "mount"):
+        return None
+
+    prefix = base_url.rstrip("/") + "/"
+    adapter = session.adapters.get(prefix)
+    if not getattr(adapter, "cinescope_transport", False):
+        adapter = build_transport(base_url)
+        session.mount(prefix, adapter)
+    return adapter
@@ -0,0 +1,90 @@
+""" JSON-кодек HTTP-слоя: сериализация тел запросов сразу в bytes и однократный разбор ответа.
+По умолчанию используется orjson, если он установлен, иначе стандартный json """
+
+import json
+
+from pydantic import BaseModel
+
+from resources.http_settings import HttpCodecSettings
+
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость
+    orjson = None
+
+
+class StdlibJsonCodec:
+    """ Кодек на стандартном модуле json """
+
+    name = "json"
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(raw):
+        return json.loads(raw)
+
+
+class OrjsonCodec:
+    """ Кодек на orjson: сериализует сразу в bytes, разбирает bytes без декодирования в str """
+
+    name = "orjson"
+
+    @staticmethod
+    def dumps(value):
+        # OPT_NON_STR_KEYS - как у json.dumps, ключи-числа допустимы
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def loads(raw):
+        return orjson.loads(raw)
+
+
+_codec = None
+
+
+def get_codec():
+    """ Текущий кодек. Выбирается по HTTP_JSON_CODEC (auto | orjson | json) при первом обращении """
+
+    global _codec
+    if _codec is None:
+        choice = HttpCodecSettings.CODEC
+        if choice == "orjson" and orjson is None:
+            raise ImportError("HTTP_JSON_CODEC=orjson, но пакет orjson не установлен")
+        _codec = OrjsonCodec() if orjson is not None and choice in ("auto", "orjson") else StdlibJsonCodec()
+    return _codec
+
+
+def set_codec(codec):
+    """ Замена кодека (объект с методами dumps(value) -> bytes и loads(bytes)). None - выбор по настройкам """
+
+    global _codec
+    _codec = codec
+
+
+def encode_body(data):
+    """ Тело запроса в bytes. Pydantic модель сериализуется через model_dump_json(exclude_unset=True),
+    готовые bytes передаются как есть, None - без тела. Строка, как и прежде (json= в requests), - JSON-строка """
+
+    if data is None or isinstance(data, (bytes, bytearray)):
+        return data
+    if isinstance(data, BaseModel):
+        return data.model_dump_json(exclude_unset=True).encode("utf-8")
+    return get_codec().dumps(data)
+
+
+def memoize_json(response):
+    """ Подмена response.json на версию, которая разбирает тело один раз текущим кодеком.
+    Логирование и тесты получают один и тот же объект - изменять его на месте не стоит """
+
+    parsed = []
+
+    def json_once(**kwargs):
+        if not parsed:
+            parsed.append(get_codec().loads(response.content))
+        return parsed[0]
+
+    response.json = json_once
+    return response
@@ -0,0 +1,120 @@
+""" Потоковый разбор JSON-ответов: элементы массива верхнего уровня ({"movies": [...], ...})
+извлекаются по мере прихода чанков, в памяти держится только текущий элемент и недочитанный хвост """
+
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class _ArrayLocator:
+    """ Поиск начала массива под ключом key в объекте верхнего уровня. Состояние сохраняется между чанками """
+
+    def __init__(self, key):
+        self.key = key
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string = []
+        self.last_string = None
+        self.after_colon = False
+
+    def feed(self, text, start):
+        """ Позиция сразу после '[' нужного массива или None, если в text его еще нет """
+
+        for index in range(start, len(text)):
+            char = text[index]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self.last_string = "".join(self.string)
+                    self.string = []
+                elif self.depth == 1:
+                    self.string.append(char)
+                continue
+
+            if char in _WHITESPACE:
+                continue
+            if self.after_colon and self.depth == 1:
+                self.after_colon = False
+                if char == "[" and self.last_string == self.key:
+                    return index + 1
+            if char == '"':
+                self.in_string = True
+            elif char == ":" and self.depth == 1:
+                self.after_colon = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+            elif char == ",":
+                self.last_string = None
+        return None
+
+
+def iter_json_array(chunks, key):
+    """ Элементы массива data[key] из потока чанков bytes. Пример: iter_json_array(response.iter_content(), "movies") """
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    locator = _ArrayLocator(key)
+    buffer = ""
+    position = 0
+    in_array = False
+    finished = False
+
+    def parse_items(final):
+        """ Разбор готовых элементов буфера. Возвращает (элементы, массив закончился) """
+
+        nonlocal position
+        items = []
+        while True:
+            while position < len(buffer) and (buffer[position] in _WHITESPACE or buffer[position] == ","):
+                position += 1
+            if position >= len(buffer):
+                return items, False
+            if buffer[position] == "]":
+                return items, True
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                return items, False
+            # Число, обрезанное чанком ("1." из "1.5e3"), разбирается частично - ждем разделитель после него
+            if not final and not isinstance(item, (dict, list, str)) and (
+                    end == len(buffer) or buffer[end] not in _WHITESPACE + ",]"):
+                return items, False
+            items.append(item)
+            position = end
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        if not in_array:
+            start = locator.feed(buffer, position)
+            if start is None:
+                # Все до конца буфера просмотрено, хранить уже разобранную часть не нужно
+                buffer, position = "", 0
+                continue
+            in_array = True
+            position = start
+
+        items, finished = parse_items(final=False)
+        yield from items
+        if finished:
+            return
+        buffer, position = buffer[position:], 0
+
+    # Проверка, что поток не оборвался посреди UTF-8 последовательности
+    text_decoder.decode(b"", final=True)
+    if not in_array:
+        raise ValueError(f"В ответе нет массива '{key}'")
+    items, finished = parse_items(final=True)
+    yield from items
+    if not finished:
+        raise ValueError(f"Массив '{key}' в ответе не закрыт")
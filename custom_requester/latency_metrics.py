@@ -0,0 +1,136 @@
+""" Гистограммы задержек по эндпоинтам (метод + шаблон эндпоинта) с объединением между xdist-воркерами """
+
+import json
+import math
+import threading
+
+from custom_requester.session_stats import register_collector
+from utils.tools import Tools
+
+
+class LatencyHistogram:
+    """ Гистограмма в стиле HDR: значения в микросекундах округляются до significant_digits значащих цифр,
+    поэтому относительная ошибка перцентилей ограничена, а размер не зависит от числа запросов """
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self.counts = {}
+        self.total = 0
+        self.max_us = 0
+
+    def _bucket(self, value_us):
+        if value_us <= 0:
+            return 0
+        scale = 10 ** max(0, int(math.floor(math.log10(value_us))) + 1 - self.significant_digits)
+        return int(math.ceil(value_us / scale) * scale)
+
+    def record(self, seconds):
+        value_us = int(seconds * 1_000_000)
+        bucket = self._bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, percent):
+        """ Значение перцентиля в миллисекундах """
+
+        if not self.total:
+            return 0.0
+        threshold = math.ceil(self.total * percent / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(bucket, self.max_us) / 1000
+        return self.max_us / 1000
+
+    def to_dict(self):
+        return {"counts": {str(bucket): count for bucket, count in self.counts.items()},
+                "total": self.total, "max_us": self.max_us}
+
+    def merge(self, data):
+        for bucket, count in data.get("counts", {}).items():
+            bucket = int(bucket)
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += data.get("total", 0)
+        self.max_us = max(self.max_us, data.get("max_us", 0))
+
+
+class EndpointLatencyMetrics:
+    """ Сборщик задержек по ключу "METHOD host/шаблон/эндпоинта" """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = {}
+        self._retries = {}
+
+    def record(self, key, seconds, error=False):
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_retry(self, key):
+        """ Учет повтора запроса (сама повторная попытка записывается в гистограмму через record) """
+
+        with self._lock:
+            self._retries[key] = self._retries.get(key, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {"histogram": histogram.to_dict(), "errors": self._errors.get(key, 0),
+                          "retries": self._retries.get(key, 0)}
+                    for key, histogram in self._histograms.items()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for key, data in snapshot.items():
+                histogram = self._histograms.setdefault(key, LatencyHistogram())
+                histogram.merge(data["histogram"])
+                self._errors[key] = self._errors.get(key, 0) + data.get("errors", 0)
+                self._retries[key] = self._retries.get(key, 0) + data.get("retries", 0)
+
+    def summary(self):
+        """ Сводка по эндпоинтам: количество запросов, ошибки, повторы, перцентили и максимум в миллисекундах """
+
+        with self._lock:
+            result = {}
+            for key, histogram in self._histograms.items():
+                row = {"count": histogram.total, "errors": self._errors.get(key, 0),
+                       "retries": self._retries.get(key, 0)}
+                for percent in self.PERCENTILES:
+                    row[f"p{percent}_ms"] = histogram.percentile(percent)
+                row["max_ms"] = histogram.max_us / 1000
+                result[key] = row
+            return result
+
+    def report_lines(self):
+        summary = self.summary()
+        lines = []
+        # Самые медленные эндпоинты (по p95) выводим первыми
+        for key, row in sorted(summary.items(), key=lambda item: item[1]["p95_ms"], reverse=True):
+            lines.append(
+                f"{key}: n={row['count']} errors={row['errors']} retries={row['retries']} p50={row['p50_ms']:.1f}ms "
+                f"p95={row['p95_ms']:.1f}ms p99={row['p99_ms']:.1f}ms max={row['max_ms']:.1f}ms"
+            )
+        return lines
+
+    def write_artifact(self):
+        """ Сохранение сводки и гистограмм в files/metrics/http_latency.json """
+
+        summary = self.summary()
+        if not summary:
+            return None
+        path = Tools.files_dir("metrics", "http_latency.json")
+        with open(path, "w", encoding="utf-8") as artifact:
+            json.dump({"summary": summary, "histograms": self.snapshot()}, artifact, ensure_ascii=False, indent=2)
+        return path
+
+
+latency_metrics = register_collector("endpoint_latency", EndpointLatencyMetrics())
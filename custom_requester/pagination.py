@@ -0,0 +1,72 @@
+""" Постраничный обход списков с упреждающей загрузкой: пока вызывающий код обрабатывает страницу N,
+следующие prefetch страниц уже запрашиваются в фоновых потоках """
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, NamedTuple, Optional
+
+from resources.http_settings import HttpPoolSettings
+
+
+class Page(NamedTuple):
+    """ Загруженная страница: элементы и общее число страниц (None, если сервис его не вернул) """
+
+    items: List[Any]
+    page_count: Optional[int] = None
+
+
+def page_count_of(payload, page_size):
+    """ Общее число страниц из ответа: pageCount или count / pageSize. None - обход до короткой страницы """
+
+    if payload.get("pageCount") is not None:
+        return int(payload["pageCount"])
+    if payload.get("count") is not None:
+        return max(1, -(-int(payload["count"]) // page_size))
+    return None
+
+
+def iter_pages(fetch_page, page_size, first_page=1, prefetch=None):
+    """ Элементы всех страниц по порядку. fetch_page(page) -> Page вызывается из потоков пула.
+    Если число страниц неизвестно, обход заканчивается на странице короче page_size;
+    лишние упреждающие запросы за последней страницей в этом случае отбрасываются """
+
+    depth = HttpPoolSettings.PAGE_PREFETCH if prefetch is None else prefetch
+    first = fetch_page(first_page)
+    # pageCount - общее число страниц списка (нумерация с 1), а не число страниц, начиная с first_page
+    last_page = first.page_count
+
+    if depth < 1:
+        yield from first.items
+        page, current = first_page, first
+        while len(current.items) >= page_size and (last_page is None or page < last_page):
+            page += 1
+            current = fetch_page(page)
+            yield from current.items
+        return
+
+    pending = deque()
+    next_page = first_page + 1
+    # Первая страница короче page_size - дальше страниц нет, пул не нужен
+    done = len(first.items) < page_size and last_page is None
+    pool = ThreadPoolExecutor(max_workers=depth, thread_name_prefix="page-prefetch")
+
+    def schedule():
+        nonlocal next_page
+        while not done and len(pending) < depth and (last_page is None or next_page <= last_page):
+            pending.append(pool.submit(fetch_page, next_page))
+            next_page += 1
+
+    try:
+        schedule()
+        yield from first.items
+        while pending and not done:
+            current = pending.popleft().result()
+            if last_page is None and len(current.items) < page_size:
+                done = True
+            schedule()
+            yield from current.items
+    finally:
+        # Обход прерван или закончен: незапущенные запросы отменяются, запущенные дожидаются завершения
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
@@ -0,0 +1,160 @@
+""" Клиентское ограничение частоты запросов: token bucket на каждый хост, общий для потоков и воркеров xdist.
+Состояние корзины (токены и время последнего пополнения) лежит в файле files/rate_limits/<хост>.bucket
+и меняется под блокировкой файла, поэтому все процессы запуска делят один лимит хоста """
+
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from custom_requester.session_stats import register_collector
+from resources.http_settings import HttpRateLimitSettings
+from utils.tools import Tools
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+# Токены (float) и момент последнего пополнения по time.monotonic (float).
+# Часы monotonic общие для всех процессов машины (CLOCK_MONOTONIC / QueryPerformanceCounter)
+_STATE = struct.Struct("<dd")
+
+
+@contextmanager
+def _locked(fd):
+    """ Эксклюзивная блокировка файла между процессами. Без fcntl и msvcrt корзина общая только для потоков """
+
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        yield
+
+
+def parse_host_rates(value):
+    """ Лимиты отдельных хостов из строки "host=rps[:burst],..." -> {host: (rps, burst или None)} """
+
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        host, _, limit = item.partition("=")
+        rate, _, burst = limit.partition(":")
+        rates[host.strip().lower()] = (float(rate), int(burst) if burst else None)
+    return rates
+
+
+class TokenBucket:
+    """ Корзина хоста: rate токенов в секунду, не больше burst. Каждый запрос забирает токен,
+    при пустой корзине токен резервируется в долг и запрос ждет его появления """
+
+    def __init__(self, host, rate, burst, path):
+        if rate <= 0:
+            raise ValueError(f"Лимит запросов хоста {host} должен быть больше 0, получено {rate}")
+        self.host = host
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """ Забирает токен и возвращает, сколько секунд подождать перед запросом (0 - можно сразу) """
+
+        with self._lock, _locked(self._fd):
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            raw = os.read(self._fd, _STATE.size)
+            now = time.monotonic()
+            if len(raw) == _STATE.size:
+                tokens, updated = _STATE.unpack(raw)
+            else:
+                tokens, updated = float(self.burst), now
+            if updated > now:
+                # Файл остался с прошлой загрузки машины - часы monotonic начались заново
+                tokens, updated = float(self.burst), now
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate) - 1
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, _STATE.pack(tokens, now))
+        return -tokens / self.rate if tokens < 0 else 0.0
+
+    def acquire(self):
+        """ Блокирующее ожидание токена. Возвращает время ожидания в секундах """
+
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class RateLimiterRegistry:
+    """ Корзины по хостам и статистика ожидания. API-классы одного хоста делят корзину """
+
+    def __init__(self):
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, base_url):
+        """ Корзина хоста base_url или None, если ограничение выключено (HTTP_RATE_LIMIT) """
+
+        if not HttpRateLimitSettings.ENABLED:
+            return None
+        host = urlsplit(base_url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = parse_host_rates(HttpRateLimitSettings.HOST_RATES).get(
+                    host.split(":")[0], (HttpRateLimitSettings.RATE, None))
+                directory = HttpRateLimitSettings.DIRECTORY or Tools.files_dir("rate_limits")
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, re.sub(r"[^\w.-]", "_", host) + ".bucket")
+                bucket = self._buckets[host] = TokenBucket(host, rate, burst or HttpRateLimitSettings.BURST, path)
+            return bucket
+
+    def record_wait(self, host, delay):
+        with self._lock:
+            stats = self._stats.setdefault(host, {"requests": 0, "throttled": 0, "wait": 0.0, "max_wait": 0.0})
+            stats["requests"] += 1
+            if delay:
+                stats["throttled"] += 1
+                stats["wait"] += delay
+                stats["max_wait"] = max(stats["max_wait"], delay)
+
+    # ==================== СТАТИСТИКА СЕССИИ ====================
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for host, stats in snapshot.items():
+                own = self._stats.setdefault(host, {"requests": 0, "throttled": 0, "wait": 0.0, "max_wait": 0.0})
+                for name in ("requests", "throttled", "wait"):
+                    own[name] += stats.get(name, 0)
+                own["max_wait"] = max(own["max_wait"], stats.get("max_wait", 0.0))
+
+    def report_lines(self):
+        return [f"{host}: requests={stats['requests']} throttled={stats['throttled']} "
+                f"wait_total={stats['wait']:.2f}s max_wait={stats['max_wait']:.3f}s"
+                for host, stats in sorted(self.snapshot().items())]
+
+
+rate_limiters = register_collector("rate_limits", RateLimiterRegistry())
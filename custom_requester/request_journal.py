@@ -0,0 +1,89 @@
+""" Структурированный журнал запросов: одна JSON-строка на обмен запрос/ответ.
+Запись идет через очередь в фоновый поток, поэтому отправка запроса не ждет диска """
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+
+from resources.http_settings import HttpJournalSettings
+from utils.tools import Tools
+
+_STOP = object()
+
+
+class RequestJournal:
+    """ Журнал запросов с фоновым писателем в файл JSONL (опционально gzip) """
+
+    def __init__(self, path, compress=False):
+        self.path = path
+        self._queue = queue.Queue()
+        self._file = gzip.open(path, "at", encoding="utf-8") if compress else open(path, "a", encoding="utf-8")
+        self._writer = threading.Thread(target=self._write_loop, name="request-journal", daemon=True)
+        self._writer.start()
+
+    def record(self, entry):
+        """ Постановка записи в очередь. Не блокирует вызывающий поток """
+
+        self._queue.put_nowait(entry)
+
+    def close(self):
+        """ Дописывает накопленные записи и закрывает файл """
+
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._file.close()
+
+    def _write_loop(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            # Сбрасываем буфер, когда очередь опустела, а не после каждой строки
+            if self._queue.empty():
+                self._file.flush()
+
+
+_lock = threading.Lock()
+_journal = None
+_run_id = None
+
+
+def configure_journal(run_id=None):
+    """ Идентификатор запуска, общий для всех воркеров xdist (входит в имя файла журнала) """
+
+    global _run_id
+    _run_id = run_id
+
+
+def get_journal():
+    """ Журнал текущего процесса. Открывается при первой записи, если журнал включен в настройках """
+
+    global _journal
+    if not HttpJournalSettings.ENABLED:
+        return None
+    if _journal is None:
+        with _lock:
+            if _journal is None:
+                worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+                run_id = _run_id or Tools.get_timestamp()
+                suffix = ".jsonl.gz" if HttpJournalSettings.GZIP else ".jsonl"
+                directory = HttpJournalSettings.DIRECTORY or Tools.files_dir("request_journal")
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f"requests_{run_id}_{worker}{suffix}")
+                _journal = RequestJournal(path, compress=HttpJournalSettings.GZIP)
+    return _journal
+
+
+@atexit.register
+def close_journal():
+    """ Закрытие журнала текущего процесса (конец сессии pytest или выход из интерпретатора) """
+
+    global _journal
+    with _lock:
+        if _journal is not None:
+            _journal.close()
+            _journal = None
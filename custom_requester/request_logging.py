@@ -0,0 +1,180 @@
+""" Форматирование логов запросов и ответов CustomRequester: политика логирования (все обмены, только ошибки
+или выборка успешных) и скрытие секретов - токенов, паролей, cookie и данных карт """
+
+import gzip
+import json
+import re
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from constants import RED, GREEN, PURPLE, RESET
+from custom_requester.endpoint_template import template_endpoint
+from resources.http_settings import HttpLogSettings
+from resources.test_card_data import TestCardData
+
+LOG_POLICIES = ("all", "failures", "sample")
+REDACTED = "***"
+
+# Заголовки и поля JSON-тел, значения которых не попадают в лог
+_SECRET_HEADERS = ("authorization", "proxy-authorization", "cookie", "set-cookie")
+_SECRET_FIELDS = ("password", "passwordRepeat", "accessToken", "refreshToken", *TestCardData.CARD_DATA)
+
+# Счетчики успешных обменов по ключу выборки политики sample
+_sample_counts = Counter()
+_sample_lock = threading.Lock()
+
+
+class LazyMessage:
+    """ Сообщение лога, которое собирается только когда обработчик действительно выводит запись.
+    Передается в logger.info("%s", LazyMessage(...)) - до форматирования дело доходит лишь при выводе """
+
+    __slots__ = ("_build", "_args", "_text")
+
+    def __init__(self, build, *args):
+        self._build = build
+        self._args = args
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            try:
+                self._text = self._build(*self._args)
+            except Exception as e:
+                self._text = f"\nLogging went wrong: {type(e)} - {e}"
+        return self._text
+
+
+def check_log_policy():
+    """ Проверка HTTP_LOG_POLICY: выполняется один раз при старте, а не на каждом запросе """
+
+    if HttpLogSettings.POLICY not in LOG_POLICIES:
+        raise ValueError(f"Неизвестная политика логирования HTTP_LOG_POLICY={HttpLogSettings.POLICY}. "
+                         f"Ожидается: {', '.join(LOG_POLICIES)}")
+
+
+def should_log(test_name, method, url, failed):
+    """ Решение по политике HTTP_LOG_POLICY. Ошибки логируются всегда, кроме того all - все обмены,
+    sample - 1 из SAMPLE_RATE успешных обменов каждого теста, метода и шаблона эндпоинта. Счетчик обменов ведется
+    по этому ключу и сдвинут на crc32 ключа, поэтому при повторном запуске в лог попадают те же обмены """
+
+    policy = HttpLogSettings.POLICY
+    if failed or policy == "all":
+        return True
+    if policy == "failures":
+        return False
+    key = f"{test_name} {method} {template_endpoint(urlsplit(str(url)).path)}"
+    with _sample_lock:
+        count = _sample_counts[key]
+        _sample_counts[key] = count + 1
+    return (zlib.crc32(key.encode("utf-8")) + count) % max(HttpLogSettings.SAMPLE_RATE, 1) == 0
+
+
+def _extra_secrets():
+    return tuple(name.strip() for name in HttpLogSettings.REDACT_KEYS.split(",") if name.strip())
+
+
+@lru_cache(maxsize=8)
+def _field_pattern(fields):
+    # "поле": "строка" или "поле": число/литерал. Строка, оборванная обрезкой тела, скрывается до конца текста
+    names = "|".join(re.escape(field) for field in fields)
+    return re.compile(rf'("(?:{names})"\s*:\s*)("(?:[^"\\]|\\.)*(?:"|\\?\Z)|[^,}}\]\s]+)')
+
+
+def redact_text(text):
+    """ Замена значений секретных полей в JSON-тексте (в том числе с отступами и обрезанном) на *** """
+
+    if not HttpLogSettings.REDACT or not text:
+        return text
+    return _field_pattern(_SECRET_FIELDS + _extra_secrets()).sub(rf'\1"{REDACTED}"', text)
+
+
+def redact_header(name, value):
+    if HttpLogSettings.REDACT and name.lower() in _SECRET_HEADERS + tuple(key.lower() for key in _extra_secrets()):
+        return REDACTED
+    return value
+
+
+def body_to_text(body, limit=None):
+    """ Тело запроса/ответа в текст с ограничением размера. Возвращает (text, truncated_bytes).
+    Буфер тела не копируется: обрезка идет через memoryview, декодируется только выводимая часть """
+
+    if body is None:
+        return "", 0
+
+    limit = HttpLogSettings.BODY_MAX_BYTES if limit is None else limit
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if limit and len(body) > limit:
+        # Обрезанный JSON все равно не распарсить - показываем как есть
+        return str(memoryview(body)[:limit], "utf-8", "ignore"), len(body) - limit
+
+    return str(body, "utf-8", "replace"), 0
+
+
+def _truncation_note(truncated):
+    return f" ...<обрезано {truncated} байт>" if truncated else ""
+
+
+def format_request(request, test_name, failed):
+    """ Текст запроса в виде curl-команды """
+
+    headers = " \\ ".join([f"-H '{header}: {redact_header(header, value)}'"
+                          for header, value in request.headers.items()])
+
+    # У requests тело запроса хранится в body, у httpx - в content
+    request_body = getattr(request, "body", None)
+    if request_body is None:
+        request_body = getattr(request, "content", None) or None
+    if request_body and request.headers.get("Content-Encoding") == "gzip":
+        # В сеть ушло сжатое тело - в лог выводим исходное, распаковка нужна только при выводе
+        request_body = gzip.decompress(request_body)
+
+    body = ""
+    if request_body is not None:
+        # Тело - тот же буфер, что ушел в сеть (json_codec.encode_body пишет кириллицу как есть, без \uXXXX),
+        # поэтому повторно разбирать и кодировать JSON не нужно
+        body_text, truncated = body_to_text(request_body)
+        body_text = redact_text(body_text)
+        body = f"-d '{body_text}{_truncation_note(truncated)}' \n" if body_text != '{}' else ''
+
+    # Если запрос завершился ошибкой или неожиданным статусом, используем красный цвет
+    test_color = RED if failed else GREEN
+
+    return (
+        f"\n{'=' * 35} {PURPLE}REQUEST{RESET} {'=' * 35}\n"
+        f"{test_color}pytest {test_name}{RESET}\n"
+        f"curl -X {PURPLE}{request.method} {request.url}{RESET}  \\\n"
+        f"{headers} \\\n"
+        f"{body}"
+    )
+
+
+def format_response(response):
+    """ Текст ответа: статус и тело (JSON с отступами, если помещается в лимит) """
+
+    response_status = response.status_code
+    response_data, truncated = body_to_text(response.content)
+
+    if response_data and not truncated:
+        # Форматируем данные для лучшей читаемости. response.json() разбирает тело один раз (json_codec.memoize_json)
+        try:
+            # Используем ensure_ascii=False для корректного отображения Unicode символов
+            response_data = json.dumps(response.json(), indent=4, ensure_ascii=False)
+        except (ValueError, TypeError):
+            pass
+    response_data = redact_text(response_data) + _truncation_note(truncated)
+
+    header = f"\n{'=' * 34} {PURPLE}RESPONSE{RESET} {'=' * 35}\n"
+    if response_status < 400:
+        return f"{header}\tSTATUS_CODE: {GREEN}{response_status}{RESET}\nDATA: {response_data}{RESET}"
+    return f"{header}\tSTATUS_CODE: {RED}{response_status}{RESET}\nDATA: {RED}{response_data}{RESET}"
+
+
+def format_stream_response(response):
+    """ Текст потокового ответа: только статус, тело читается вызывающим кодом по частям и в лог не попадает """
+
+    return (f"\n{'=' * 34} {PURPLE}RESPONSE{RESET} {'=' * 35}\n"
+            f"\tSTATUS_CODE: {GREEN}{response.status_code}{RESET}\nDATA: <потоковый ответ, тело не логируется>")
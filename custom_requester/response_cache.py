@@ -0,0 +1,110 @@
+""" Кэш ответов идемпотентных GET-запросов с TTL и ограничением размера (LRU).
+Успешная запись (POST, PUT, PATCH, DELETE) сбрасывает закэшированные ответы по тому же пути, его предкам и потомкам """
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlsplit
+
+from custom_requester.session_stats import register_collector
+from resources.http_settings import HttpCacheSettings
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def auth_identity(headers, cookies):
+    """ Отпечаток пользователя запроса: заголовок authorization и cookie. Токены в ключе не хранятся """
+
+    authorization = headers.get("authorization") or headers.get("Authorization") or ""
+    # И у requests, и у httpx cookie лежат в http.cookiejar.CookieJar
+    jar = getattr(cookies, "jar", cookies)
+    cookie_values = sorted(f"{cookie.domain}:{cookie.name}={cookie.value}" for cookie in jar) if jar else []
+    if not authorization and not cookie_values:
+        return "anonymous"
+    return hashlib.sha256("\n".join([authorization, *cookie_values]).encode()).hexdigest()[:16]
+
+
+def _path_related(cached_path, written_path):
+    """ Путь cached_path совпадает с written_path, является его предком или потомком """
+
+    return (cached_path == written_path or cached_path.startswith(written_path + "/")
+            or written_path.startswith(cached_path + "/"))
+
+
+class ResponseCache:
+    """ Потокобезопасный кэш ответов: ключ - метод, URL, query-параметры и пользователь """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = HttpCacheSettings.TTL if ttl is None else ttl
+        self.max_entries = max_entries or HttpCacheSettings.MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def key(method, url, params, headers, cookies):
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return method.upper(), url, query, auth_identity(headers, cookies)
+
+    def get(self, key):
+        """ Закэшированный ответ или None (нет записи или истек TTL) """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url):
+        """ Сброс записей, связанных с url записи: тот же сервис и путь-предок или путь-потомок """
+
+        written = urlsplit(url)
+        written_path = written.path.rstrip("/")
+        with self._lock:
+            stale = []
+            for key in self._entries:
+                cached = urlsplit(key[1])
+                if cached.netloc == written.netloc and _path_related(cached.path.rstrip("/"), written_path):
+                    stale.append(key)
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ==================== СТАТИСТИКА СЕССИИ ====================
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, value in snapshot.items():
+                self._stats[name] = self._stats.get(name, 0) + value
+
+    def report_lines(self):
+        stats = self.snapshot()
+        lookups = stats["hits"] + stats["misses"]
+        if not lookups:
+            return []
+        return [f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hits'] / lookups:.0%} "
+                f"invalidated={stats['invalidations']}"]
+
+
+response_cache = register_collector("response_cache", ResponseCache())
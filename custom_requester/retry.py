@@ -0,0 +1,108 @@
+""" Повторы запросов при временных сбоях: экспоненциальная задержка с полным джиттером, Retry-After
+и общий бюджет повторов процесса, чтобы повторы не добивали перегруженный сервис """
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+import requests
+
+from resources.http_settings import HttpRetrySettings
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Сетевые ошибки, после которых запрос можно повторить
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+
+
+class RetryBudget:
+    """ Бюджет повторов: каждый исходный запрос пополняет его на ratio, каждый повтор тратит единицу.
+    Запас min_retries позволяет повторять при малом трафике; в длинном прогоне повторы не превышают ratio трафика """
+
+    def __init__(self, ratio, min_retries):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._balance = float(min_retries)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self._balance + self.ratio, float(self.min_retries))
+
+    def withdraw(self):
+        """ Списание одного повтора. False - бюджет исчерпан, повторять нельзя """
+
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+retry_budget = RetryBudget(HttpRetrySettings.BUDGET_RATIO, HttpRetrySettings.BUDGET_MIN_RETRIES)
+
+
+class RetryPolicy:
+    """ Политика повторов. POST и PATCH не идемпотентны и повторяются только при allow_non_idempotent=True """
+
+    def __init__(self, max_attempts=None, statuses=None, backoff_base=None, backoff_max=None,
+                 allow_non_idempotent=False, budget=None):
+        self.max_attempts = max_attempts or HttpRetrySettings.MAX_ATTEMPTS
+        self.statuses = frozenset(statuses or HttpRetrySettings.STATUSES)
+        self.backoff_base = HttpRetrySettings.BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = HttpRetrySettings.BACKOFF_MAX if backoff_max is None else backoff_max
+        self.allow_non_idempotent = allow_non_idempotent
+        self.budget = budget or retry_budget
+
+    @classmethod
+    def resolve(cls, retry):
+        """ Политика для аргумента retry у send_request: None - по настройкам (HTTP_RETRY),
+        True - политика по умолчанию, False - без повторов, RetryPolicy - как есть """
+
+        if isinstance(retry, RetryPolicy):
+            return retry
+        if retry is None:
+            retry = HttpRetrySettings.ENABLED
+        return cls(allow_non_idempotent=HttpRetrySettings.RETRY_POST) if retry else None
+
+    def is_retryable(self, method, response=None, error=None):
+        """ Можно ли повторить запрос после такого результата (без учета попыток и бюджета) """
+
+        if method.upper() not in IDEMPOTENT_METHODS and not self.allow_non_idempotent:
+            return False
+        if error is not None:
+            return isinstance(error, TRANSIENT_ERRORS)
+        return response is not None and response.status_code in self.statuses
+
+    def should_retry(self, method, attempt, response=None, error=None):
+        """ Решение о повторе после попытки attempt (нумерация с 1). Повтор списывается из бюджета """
+
+        if attempt >= self.max_attempts or not self.is_retryable(method, response, error):
+            return False
+        return self.budget.withdraw()
+
+    def delay(self, attempt, response=None):
+        """ Пауза перед следующей попыткой: полный джиттер, но не меньше Retry-After (не дольше RETRY_AFTER_MAX) """
+
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            return min(max(backoff, retry_after), HttpRetrySettings.RETRY_AFTER_MAX)
+        return backoff
+
+
+def parse_retry_after(value):
+    """ Значение заголовка Retry-After в секундах: число секунд или HTTP-дата """
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,35 @@
+""" Реестр сборщиков статистики HTTP-слоя, которые выводятся в конце тестовой сессии """
+
+# Сборщик должен реализовывать методы:
+#   snapshot() -> dict          - JSON-сериализуемый срез статистики (передается от xdist воркеров)
+#   merge(snapshot: dict)       - объединение среза, полученного от другого процесса
+#   report_lines() -> list[str] - строки для итогового отчета pytest
+_collectors = {}
+
+
+def register_collector(name, collector):
+    """ Регистрация сборщика статистики под уникальным именем """
+
+    _collectors[name] = collector
+    return collector
+
+
+def get_collectors():
+    """ Все зарегистрированные сборщики в порядке регистрации """
+
+    return dict(_collectors)
+
+
+def snapshot_all():
+    """ Срез статистики всех сборщиков для передачи на контроллер xdist """
+
+    return {name: collector.snapshot() for name, collector in _collectors.items()}
+
+
+def merge_all(snapshots):
+    """ Объединение срезов, полученных от воркера xdist """
+
+    for name, snapshot in (snapshots or {}).items():
+        collector = _collectors.get(name)
+        if collector is not None and snapshot:
+            collector.merge(snapshot)
@@ -0,0 +1,97 @@
+""" Объединение одинаковых одновременных GET-запросов (single flight): пока запрос с ключом выполняется,
+остальные потоки и задачи с тем же ключом не идут в сеть, а ждут его и получают тот же ответ или ту же ошибку """
+
+import asyncio
+import threading
+
+from custom_requester.session_stats import register_collector
+
+
+class _Flight:
+    """ Выполняющийся запрос: событие завершения и его результат """
+
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class SingleFlight:
+    """ Реестр выполняющихся запросов. Ключ тот же, что у кэша ответов: метод, URL, параметры, пользователь """
+
+    def __init__(self):
+        self._flights = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, call):
+        """ Результат call() для первого вызывающего; остальные с тем же ключом ждут его результат """
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = call()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            # Запросы, пришедшие после завершения, уже идут в сеть сами - ответ мог устареть
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.response
+
+    async def do_async(self, key, call):
+        """ Асинхронный вариант do: call - функция без аргументов, возвращающая корутину.
+        Отмена одного из ожидающих не отменяет общий запрос """
+
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            if task is None:
+                task = self._tasks[loop_key] = asyncio.ensure_future(call())
+                task.add_done_callback(lambda _: self._forget_task(loop_key))
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget_task(self, loop_key):
+        with self._lock:
+            self._tasks.pop(loop_key, None)
+
+    # ==================== СТАТИСТИКА СЕССИИ ====================
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, value in snapshot.items():
+                self._stats[name] = self._stats.get(name, 0) + value
+
+    def report_lines(self):
+        stats = self.snapshot()
+        if not stats["coalesced"]:
+            return []
+        return [f"requests={stats['calls']} coalesced={stats['coalesced']}"]
+
+
+single_flight = register_collector("single_flight", SingleFlight())
@@ -40,6 +40,9 @@ def registered_user(api_manager, test_user: TestUserData):
 
     yield created_user
 
+    # Сессия api_manager общая для всех тестов: токен удаляемого пользователя в ней не оставляем,
+    # иначе роль следующих тестов зависела бы от порядка запуска (и не совпадала бы с кассетами)
+    authorization = api_manager.session.headers.get("authorization")
     try:
         # Авторизуемся под созданным пользователем для удаления
         api_manager.auth_api.authenticate((test_user.email, test_user.password))
@@ -47,6 +50,11 @@ def registered_user(api_manager, test_user: TestUserData):
         api_manager.user_api.clean_up_user(user_id=created_user["id"])
     except Exception as e:
         print(f"Failed to clean up user {created_user.get('id')}: {e}")
+    finally:
+        if authorization is None:
+            api_manager.session.headers.pop("authorization", None)
+        else:
+            api_manager.session.headers["authorization"] = authorization
 
 
 @pytest.fixture
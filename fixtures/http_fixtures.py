@@ -0,0 +1,213 @@
+import argparse
+
+import pytest
+
+# Импорт модулей транспорта регистрирует их сборщики статистики и на контроллере xdist
+import custom_requester.http_transport  # noqa: F401
+import custom_requester.latency_metrics  # noqa: F401
+import custom_requester.conditional_get  # noqa: F401
+import custom_requester.connection_timing  # noqa: F401
+import custom_requester.rate_limiter  # noqa: F401
+import custom_requester.response_cache  # noqa: F401
+import custom_requester.single_flight  # noqa: F401
+from custom_requester.cassette import cassettes
+from custom_requester.deadline import clear_deadline, start_deadline
+from custom_requester.request_journal import close_journal, configure_journal
+from custom_requester.request_logging import LOG_POLICIES, check_log_policy
+from custom_requester.session_stats import get_collectors, merge_all, snapshot_all
+from resources.http_settings import (HttpCacheSettings, HttpCassetteSettings, HttpJournalSettings, HttpLogSettings,
+                                     HttpPoolSettings, HttpRateLimitSettings, HttpTimeoutSettings)
+from utils.data_generator import DataGenerator
+from utils.tools import Tools
+
+# Ключ, под которым xdist-воркеры передают статистику HTTP-слоя на контроллер
+WORKER_STATS_KEY = "cinescope_http_stats"
+
+
+def pytest_addoption(parser):
+    """ Опции HTTP-транспорта. Если опция не указана, используется значение из окружения """
+
+    group = parser.getgroup("cinescope-http", "Настройки HTTP-транспорта Cinescope")
+    group.addoption("--http-pool-connections", type=int, default=None,
+                    help="Количество пулов, кэшируемых адаптером хоста (HTTP_POOL_CONNECTIONS)")
+    group.addoption("--http-pool-maxsize", type=int, default=None,
+                    help="Максимум соединений в пуле хоста (HTTP_POOL_MAXSIZE)")
+    group.addoption("--http-pool-block", action=argparse.BooleanOptionalAction, default=None,
+                    help="Ждать свободное соединение при исчерпании пула (HTTP_POOL_BLOCK)")
+    group.addoption("--http-keepalive-idle", type=float, default=None,
+                    help="Секунд простоя, после которых соединение не переиспользуется (HTTP_KEEPALIVE_IDLE)")
+    group.addoption("--http-log-body-max-bytes", type=int, default=None,
+                    help="Лимит логируемого тела запроса/ответа в байтах, 0 - без лимита (HTTP_LOG_BODY_MAX_BYTES)")
+    group.addoption("--http-log-policy", choices=LOG_POLICIES, default=None,
+                    help="Какие обмены логировать: all, failures или sample - ошибки и 1 из N успешных обменов каждого эндпоинта теста (HTTP_LOG_POLICY)")
+    group.addoption("--http-log-sample-rate", type=int, default=None,
+                    help="Политика sample: логировать 1 из N успешных обменов (HTTP_LOG_SAMPLE_RATE)")
+    group.addoption("--http-log-only-failures", action="store_const", const="failures", dest="http_log_policy",
+                    help="То же, что --http-log-policy=failures")
+    group.addoption("--http-journal", action=argparse.BooleanOptionalAction, default=None,
+                    help="Писать структурированный JSONL-журнал запросов (HTTP_JOURNAL)")
+    group.addoption("--http-journal-gzip", action=argparse.BooleanOptionalAction, default=None,
+                    help="Сжимать журнал запросов gzip (HTTP_JOURNAL_GZIP)")
+    group.addoption("--http-cassette-mode", choices=("off", "record", "replay", "once"), default=None,
+                    help="Запись/воспроизведение HTTP-обменов в files/cassettes (HTTP_CASSETTE_MODE)")
+    group.addoption("--http-cache", action=argparse.BooleanOptionalAction, default=None,
+                    help="Кэшировать ответы публичных GET-запросов в пределах процесса (HTTP_CACHE)")
+    group.addoption("--http-rate-limit", action=argparse.BooleanOptionalAction, default=None,
+                    help="Ограничивать частоту запросов к каждому хосту для всех воркеров (HTTP_RATE_LIMIT)")
+    group.addoption("--http-rate-limit-rps", type=float, default=None,
+                    help="Запросов в секунду на хост для всего запуска (HTTP_RATE_LIMIT_RPS)")
+    group.addoption("--http-connect-timeout", type=float, default=None,
+                    help="Таймаут установки соединения в секундах (HTTP_CONNECT_TIMEOUT)")
+    group.addoption("--http-read-timeout", type=float, default=None,
+                    help="Таймаут ожидания данных от сервера в секундах (HTTP_READ_TIMEOUT)")
+    group.addoption("--http-test-deadline", type=float, default=None,
+                    help="Бюджет времени одного теста в секундах, 0 - без бюджета (HTTP_TEST_DEADLINE)")
+
+
+def pytest_configure(config):
+    """ Перенос опций командной строки в настройки транспорта """
+
+    overrides = {
+        HttpPoolSettings: {
+            "POOL_CONNECTIONS": config.getoption("--http-pool-connections"),
+            "POOL_MAXSIZE": config.getoption("--http-pool-maxsize"),
+            "POOL_BLOCK": config.getoption("--http-pool-block"),
+            "KEEPALIVE_IDLE": config.getoption("--http-keepalive-idle"),
+        },
+        HttpLogSettings: {
+            "BODY_MAX_BYTES": config.getoption("--http-log-body-max-bytes"),
+            "POLICY": config.getoption("--http-log-policy"),
+            "SAMPLE_RATE": config.getoption("--http-log-sample-rate"),
+        },
+        HttpJournalSettings: {
+            "ENABLED": config.getoption("--http-journal"),
+            "GZIP": config.getoption("--http-journal-gzip"),
+        },
+        HttpCassetteSettings: {
+            "MODE": config.getoption("--http-cassette-mode"),
+        },
+        HttpCacheSettings: {
+            "ENABLED": config.getoption("--http-cache"),
+        },
+        HttpTimeoutSettings: {
+            "CONNECT": config.getoption("--http-connect-timeout"),
+            "READ": config.getoption("--http-read-timeout"),
+            "TEST_DEADLINE": config.getoption("--http-test-deadline"),
+        },
+        HttpRateLimitSettings: {
+            "ENABLED": config.getoption("--http-rate-limit"),
+            "RATE": config.getoption("--http-rate-limit-rps"),
+        },
+    }
+    for settings, values in overrides.items():
+        for name, value in values.items():
+            if value is not None:
+                setattr(settings, name, value)
+    try:
+        check_log_policy()
+    except ValueError as e:
+        raise pytest.UsageError(str(e)) from None
+
+    config.addinivalue_line("markers", "http_deadline(seconds): бюджет времени теста вместо HTTP_TEST_DEADLINE")
+
+    # Воркеры xdist получают общий testrunuid - файлы журнала одного запуска легко сгруппировать
+    workerinput = getattr(config, "workerinput", None)
+    configure_journal(run_id=workerinput["testrunuid"] if workerinput else Tools.get_timestamp())
+
+
+@pytest.fixture(autouse=True)
+def http_deadline(request):
+    """ Дедлайн теста: все его запросы тратят общий бюджет (HTTP_TEST_DEADLINE или маркер http_deadline).
+    Запрос, которому не хватает остатка, завершается DeadlineExceeded с разбивкой времени """
+
+    marker = request.node.get_closest_marker("http_deadline")
+    deadline = start_deadline(marker.args[0] if marker else HttpTimeoutSettings.TEST_DEADLINE, request.node.nodeid)
+    yield deadline
+    clear_deadline()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """ В режиме кассет данные теста воспроизводимы: генераторы засеваются от id теста,
+    и при воспроизведении тест отправляет и сравнивает те же значения, что при записи """
+
+    if HttpCassetteSettings.MODE != "off":
+        DataGenerator.seed(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """ В режиме кассет запросы фикстур session/module/class пишутся в кассету фикстуры, а не теста,
+    который запросил ее первым: иначе воспроизведение зависит от порядка тестов и -k.
+    Данные фикстуры засеваются от ее id и не сдвигают генераторы теста """
+
+    if HttpCassetteSettings.MODE == "off" or fixturedef.scope == "function":
+        yield
+        return
+
+    fixture_id = "/".join(filter(None, (fixturedef.baseid, fixturedef.argname)))
+    if hasattr(request, "param"):
+        fixture_id += f"[{request.param_index}]"
+    states = []
+
+    def enter():
+        states.append(DataGenerator.seed(fixture_id))
+        cassettes.enter_fixture(fixture_id)
+
+    def leave():
+        cassettes.leave_fixture()
+        DataGenerator.restore_seed(states.pop())
+
+    # Финализаторы фикстуры выполняются в обратном порядке: enter - перед ее teardown, leave - после
+    fixturedef.addfinalizer(leave)
+    enter()
+    try:
+        yield
+    finally:
+        leave()
+        fixturedef.addfinalizer(enter)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    """ Сохранение кассеты завершившегося теста """
+
+    cassettes.finish()
+
+
+def pytest_sessionfinish(session):
+    """ Закрываем журнал запросов. Воркер xdist отдает статистику контроллеру,
+    контроллер (или единственный процесс) сохраняет итоговые артефакты """
+
+    close_journal()
+
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput[WORKER_STATS_KEY] = snapshot_all()
+        return
+
+    for collector in get_collectors().values():
+        write_artifact = getattr(collector, "write_artifact", None)
+        if write_artifact is not None:
+            write_artifact()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """ На контроллере xdist объединяем статистику завершившегося воркера """
+
+    merge_all(getattr(node, "workeroutput", {}).get(WORKER_STATS_KEY))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """ Итоговый отчет HTTP-слоя в конце сессии """
+
+    if hasattr(config, "workerinput"):
+        return
+
+    for name, collector in get_collectors().items():
+        lines = collector.report_lines()
+        if not lines:
+            continue
+        terminalreporter.write_sep("-", f"HTTP {name}")
+        for line in lines:
+            terminalreporter.write_line(line)
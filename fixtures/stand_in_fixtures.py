@@ -0,0 +1,35 @@
+import pytest
+import requests
+
+from custom_requester.custom_requester import CustomRequester
+from stand_in.app import AUTH_PREFIX, MOVIES_PREFIX, SUPER_ADMIN, CinescopeState
+from stand_in.server import StandInServer
+
+
+@pytest.fixture()
+def stand_in():
+    """ Stand-in сервер со свежим состоянием на время теста: офлайн-проверки HTTP-клиента без стенда """
+
+    with StandInServer(state=CinescopeState(seed_movies=30)) as server:
+        yield server
+
+
+@pytest.fixture()
+def stand_in_requester(stand_in):
+    """ CustomRequester сервиса фильмов stand-in сервера на отдельной сессии """
+
+    session = requests.Session()
+    yield CustomRequester(session=session, base_url=stand_in.base_url + MOVIES_PREFIX)
+    session.close()
+
+
+@pytest.fixture()
+def stand_in_admin(stand_in, stand_in_requester):
+    """ stand_in_requester с токеном суперадмина stand-in сервера (для записей: жанры, фильмы) """
+
+    email, password = "http-client-admin@stand-in.local", "HttpClientAdmin1"
+    stand_in.app.state.add_user(email, "Stand-in Admin", password, roles=[SUPER_ADMIN], verified=True)
+    response = stand_in_requester.session.post(f"{stand_in.base_url}{AUTH_PREFIX}/login",
+                                               json={"email": email, "password": password})
+    stand_in_requester._update_session_headers(authorization=f"Bearer {response.json()['accessToken']}")
+    return stand_in_requester
@@ -0,0 +1,3 @@
+""" Нагрузочный режим на том же клиентском стеке, что и функциональные тесты: виртуальные пользователи проходят
+сценарии через ApiManager (регистрация, вход, просмотр фильмов, отзыв, оплата) с открытой моделью прибытия.
+Запуск: python -m load.runner --flow full --profile constant:10:60 """
@@ -0,0 +1,82 @@
+""" Сценарии виртуальных пользователей. Шаги вызывают те же API-классы, что и тесты, поэтому нагрузка
+идет через общий клиентский стек: пулы соединений, повторы, выключатели, метрики и журнал запросов """
+
+import random
+import time
+
+import requests
+
+from api.api_manager import ApiManager
+from constants import Roles
+from models.auth_model import TestUserData
+from resources.test_card_data import TestCardData
+from utils.data_generator import DataGenerator, faker
+
+# Сценарий - последовательность шагов VirtualUser
+FLOWS = {
+    "browse": ("browse",),
+    "review": ("register", "login", "browse", "review"),
+    "purchase": ("register", "login", "browse", "pay"),
+    "full": ("register", "login", "browse", "review", "pay"),
+}
+
+
+class VirtualUser:
+    """ Виртуальный пользователь. Один на поток нагрузчика: сессия (и ее пул соединений) переживает сценарии,
+    а учетные данные и токен сбрасываются перед каждым новым сценарием """
+
+    def __init__(self, api_manager=None, page_size=10):
+        self.api = api_manager or ApiManager(requests.Session())
+        self.page_size = page_size
+        self.creds = None
+        self.movie_id = None
+
+    def reset(self):
+        self.api.session.headers.pop("authorization", None)
+        self.api.session.cookies.clear()
+        self.creds = None
+        self.movie_id = None
+
+    def run(self, steps, record):
+        """ Выполнение сценария. record(step, seconds, error) вызывается после каждого шага;
+        первая ошибка прерывает сценарий и пробрасывается вызывающему """
+
+        self.reset()
+        for step in steps:
+            started = time.perf_counter()
+            try:
+                getattr(self, step)()
+            except Exception as error:
+                record(step, time.perf_counter() - started, error)
+                raise
+            record(step, time.perf_counter() - started, None)
+
+    # ==================== ШАГИ ====================
+
+    def register(self):
+        password = DataGenerator.generation_random_password()
+        user = TestUserData(email=DataGenerator.generation_random_email(), fullName=DataGenerator.generation_random_name(),
+                            password=password, passwordRepeat=password, roles=[Roles.USER])
+        self.api.auth_api.register_user(user_data=user, expected_status=201)
+        self.creds = (user.email, password)
+
+    def login(self):
+        self.api.auth_api.authenticate(self.creds)
+
+    def browse(self):
+        """ Страница каталога и карточка случайного фильма с нее """
+
+        page = self.api.movies_api.get_movies(params={"pageSize": self.page_size, "page": random.randint(1, 3)}).json()
+        movies = page.get("movies") or self.api.movies_api.get_movies(params={"pageSize": self.page_size}).json()["movies"]
+        if not movies:
+            raise LookupError("Каталог фильмов пуст - сценарию нечего смотреть")
+        self.movie_id = random.choice(movies)["id"]
+        self.api.movies_api.get_movie(self.movie_id)
+
+    def review(self):
+        review_data = {"rating": random.randint(1, 5), "text": f"Нагрузочный отзыв - {faker.text(max_nb_chars=100)}"}
+        self.api.reviews_api.create_review(self.movie_id, review_data, expected_status=201)
+
+    def pay(self):
+        payment_data = {"movieId": self.movie_id, "amount": random.randint(1, 3), "card": TestCardData.CARD_DATA}
+        self.api.payment_api.create_payment(payment_data, expected_status=201)
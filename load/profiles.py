@@ -0,0 +1,76 @@
+""" Профили интенсивности открытой модели: новые виртуальные пользователи прибывают по расписанию независимо
+от того, успели ли завершиться предыдущие. Профиль - этапы через запятую:
+constant:RATE:SECONDS - постоянная интенсивность, ramp:FROM:TO:SECONDS - линейный рост (или спад) интенсивности.
+Пример: ramp:1:20:30,constant:20:120 - разгон до 20 сценариев в секунду за 30 секунд и две минуты на полке """
+
+import math
+from typing import NamedTuple
+
+
+class Stage(NamedTuple):
+    """ Этап профиля: интенсивность (сценариев в секунду) меняется линейно от start_rate до end_rate """
+
+    start_rate: float
+    end_rate: float
+    duration: float
+
+    @property
+    def arrivals(self):
+        """ Ожидаемое число прибытий за этап """
+
+        return (self.start_rate + self.end_rate) / 2 * self.duration
+
+    def offset_of(self, count):
+        """ Момент от начала этапа, к которому прибудет count пользователей: решение rate(t) проинтегрированной = count """
+
+        if count <= 0:
+            return 0.0
+        slope = (self.end_rate - self.start_rate) / self.duration
+        if abs(slope) < 1e-12:
+            return count / self.start_rate
+        # start_rate * t + slope * t^2 / 2 = count
+        discriminant = max(self.start_rate ** 2 + 2 * slope * count, 0.0)
+        return (math.sqrt(discriminant) - self.start_rate) / slope
+
+
+def parse_profile(spec):
+    """ Список этапов из строки профиля. ValueError - профиль записан с ошибкой """
+
+    stages = []
+    for part in filter(None, (chunk.strip() for chunk in spec.split(","))):
+        kind, *values = part.split(":")
+        try:
+            numbers = [float(value) for value in values]
+        except ValueError:
+            raise ValueError(f"Этап профиля {part}: ожидаются числа") from None
+        if kind == "constant" and len(numbers) == 2:
+            stage = Stage(numbers[0], numbers[0], numbers[1])
+        elif kind == "ramp" and len(numbers) == 3:
+            stage = Stage(*numbers)
+        else:
+            raise ValueError(f"Этап профиля {part}: ожидается constant:RATE:SECONDS или ramp:FROM:TO:SECONDS")
+        if stage.duration <= 0 or stage.start_rate < 0 or stage.end_rate < 0:
+            raise ValueError(f"Этап профиля {part}: длительность должна быть больше 0, интенсивность - не меньше 0")
+        stages.append(stage)
+    if not stages:
+        raise ValueError("Профиль нагрузки пуст")
+    return stages
+
+
+def total_duration(stages):
+    return sum(stage.duration for stage in stages)
+
+
+def arrival_times(stages):
+    """ Моменты прибытия (секунды от старта) для всего профиля. Расписание детерминировано: процессы
+    нагрузчика берут из него каждый N-й момент, и суммарная интенсивность совпадает с профилем """
+
+    started = 0.0
+    carried = 0.0  # Дробная часть прибытий, перешедшая с прошлых этапов
+    for stage in stages:
+        count = 1
+        while count - carried <= stage.arrivals:
+            yield started + stage.offset_of(count - carried)
+            count += 1
+        carried = carried + stage.arrivals - (count - 1)
+        started += stage.duration
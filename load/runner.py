@@ -0,0 +1,217 @@
+""" Запуск нагрузки: процессы нагрузчика делят между собой расписание прибытий профиля, в каждом процессе
+workers потоков - виртуальных пользователей. Родительский процесс печатает живой отчет (прибытия, завершенные
+сценарии, шаги в секунду, доля ошибок, p50/p95 сценария, очередь) и итог, включая метрики HTTP-клиента.
+Время сценария считается от запланированного момента прибытия, поэтому ожидание в очереди в него входит.
+
+Запуск против стенда из .env:
+    python -m load.runner --flow full --profile ramp:1:20:30,constant:20:120 --workers 32 --processes 4
+Против локального stand-in сервера:
+    python -m load.runner --stand-in --flow browse --profile constant:50:30 """
+
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from load.profiles import arrival_times, parse_profile, total_duration
+from load.stats import ITERATION, LoadReport, LoadStats
+
+
+def _process_main(index, options, stages, messages, go, start_at, stop):
+    """ Процесс нагрузчика index: каждый options.processes-й момент расписания начиная с index """
+
+    # Ctrl+C обрабатывает родитель: он просит процессы остановиться и дожидается их итога
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=options.log_level)
+    # Импорт API-слоя после того, как родитель выставил адреса сервисов в окружение
+    from custom_requester.session_stats import snapshot_all
+    from load.flows import FLOWS, VirtualUser
+
+    steps = FLOWS[options.flow]
+    stats = LoadStats()
+    local = threading.local()
+    lock = threading.Lock()
+    state = {"queued": 0}
+
+    def iteration(scheduled):
+        with lock:
+            state["queued"] -= 1
+        user = getattr(local, "user", None)
+        if user is None:
+            user = local.user = VirtualUser(page_size=options.page_size)
+        try:
+            user.run(steps, stats.record)
+        except Exception as error:
+            stats.record(ITERATION, time.monotonic() - scheduled, error)
+        else:
+            stats.record(ITERATION, time.monotonic() - scheduled)
+
+    def report(finished):
+        # Чаще, чем печатает родитель, чтобы живой отчет не отставал на целый интервал
+        while not finished.wait(options.report_every / 4):
+            messages.put(("stats", index, (stats.take(), state["queued"])))
+
+    messages.put(("ready", index, None))
+    go.wait()
+    # Общий момент старта задан по часам системы, дальше отсчет по монотонным часам процесса
+    start = time.monotonic() + (start_at.value - time.time())
+    finished = threading.Event()
+    reporter = threading.Thread(target=report, args=(finished,), name=f"load-report-{index}", daemon=True)
+    reporter.start()
+
+    with ThreadPoolExecutor(options.workers, thread_name_prefix=f"vu-{index}") as pool:
+        for number, offset in enumerate(arrival_times(stages)):
+            if number % options.processes != index:
+                continue
+            delay = start + offset - time.monotonic()
+            if stop.wait(delay) if delay > 0 else stop.is_set():
+                break
+            if state["queued"] >= options.max_queue:
+                # Открытая модель: прибытие не ждет освобождения потоков, но очередь ограничена
+                stats.record_arrival(dropped=True)
+                continue
+            stats.record_arrival()
+            with lock:
+                state["queued"] += 1
+            pool.submit(iteration, start + offset)
+        if stop.is_set():
+            pool.shutdown(cancel_futures=True)
+
+    finished.set()
+    reporter.join()
+    messages.put(("stats", index, (stats.take(), 0)))
+    messages.put(("done", index, snapshot_all()))
+
+
+def _wait_ready(messages, processes):
+    ready = 0
+    while ready < len(processes):
+        try:
+            kind, _, _ = messages.get(timeout=1)
+        except queue.Empty:
+            dead = [process.name for process in processes if not process.is_alive()]
+            if dead:
+                raise RuntimeError(f"Процессы нагрузчика завершились до старта: {', '.join(dead)}")
+            continue
+        ready += kind == "ready"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузка на Cinescope через ApiManager (открытая модель)")
+    parser.add_argument("--flow", default="full", help="Сценарий: browse, review, purchase или full")
+    parser.add_argument("--profile", default="constant:5:30",
+                        help="Этапы через запятую: constant:RATE:SECONDS, ramp:FROM:TO:SECONDS (сценариев в секунду)")
+    parser.add_argument("--workers", type=int, default=16, help="Потоков (виртуальных пользователей) в процессе")
+    parser.add_argument("--processes", type=int, default=1, help="Процессов нагрузчика")
+    parser.add_argument("--max-queue", type=int, default=1000,
+                        help="Прибытий, ждущих свободного потока в процессе; сверх - отбрасываются")
+    parser.add_argument("--report-every", type=float, default=5, help="Интервал живого отчета, секунды")
+    parser.add_argument("--page-size", type=int, default=10, help="Фильмов на странице шага browse")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Код выхода 1, если доля сценариев с ошибкой больше (например, 0.01)")
+    parser.add_argument("--stand-in", action="store_true", help="Поднять локальный stand-in сервер и нагружать его")
+    parser.add_argument("--seed-movies", type=int, default=200, help="Фильмов в stand-in сервере")
+    parser.add_argument("--log-level", default="WARNING", help="Уровень логов процессов нагрузчика")
+    parser.add_argument("--log-policy", choices=("all", "failures", "sample"), default="failures",
+                        help="Какие HTTP-обмены логировать (HTTP_LOG_POLICY). Полный лог каждого запроса тормозит нагрузчик")
+    options = parser.parse_args()
+
+    try:
+        stages = parse_profile(options.profile)
+    except ValueError as error:
+        parser.error(str(error))
+    if options.workers < 1 or options.processes < 1:
+        parser.error("--workers и --processes должны быть не меньше 1")
+
+    # Настройки читаются при импорте - дочерние процессы получат их через окружение
+    os.environ["HTTP_LOG_POLICY"] = options.log_policy
+    server = None
+    if options.stand_in:
+        from stand_in.server import StandInServer
+
+        server = StandInServer(seed_movies=options.seed_movies).start()
+        os.environ.update(server.env())
+
+    from custom_requester.session_stats import get_collectors, merge_all
+    from load.flows import FLOWS
+
+    if options.flow not in FLOWS:
+        parser.error(f"Неизвестный сценарий {options.flow}. Доступны: {', '.join(FLOWS)}")
+
+    context = multiprocessing.get_context("spawn")
+    messages = context.Queue()
+    go, stop = context.Event(), context.Event()
+    start_at = context.Value("d", 0.0)
+    processes = [context.Process(target=_process_main, name=f"load-{index}", daemon=True,
+                                 args=(index, options, stages, messages, go, start_at, stop))
+                 for index in range(options.processes)]
+    for process in processes:
+        process.start()
+
+    print(f"Сценарий {options.flow} ({' -> '.join(FLOWS[options.flow])}), профиль {options.profile} "
+          f"({total_duration(stages):.0f} с), "
+          f"{options.processes} x {options.workers} потоков{f', stand-in {server.base_url}' if server else ''}",
+          flush=True)
+    report = LoadReport()
+    queued = {}
+    try:
+        _wait_ready(messages, processes)
+        start_at.value = time.time() + 0.2
+        go.set()
+        started = time.monotonic()
+        next_report = started + options.report_every
+        done = 0
+        while done < len(processes):
+            try:
+                try:
+                    kind, index, payload = messages.get(timeout=max(next_report - time.monotonic(), 0.05))
+                except queue.Empty:
+                    pass
+                else:
+                    if kind == "stats":
+                        snapshot, queued[index] = payload
+                        report.merge(snapshot)
+                    elif kind == "done":
+                        merge_all(payload)
+                        done += 1
+                if time.monotonic() >= next_report:
+                    print(report.live_line(time.monotonic() - started, options.report_every, sum(queued.values())),
+                          flush=True)
+                    next_report += options.report_every
+                if done < len(processes) and not any(process.is_alive() for process in processes):
+                    raise RuntimeError("Процессы нагрузчика завершились, не отправив итог")
+            except KeyboardInterrupt:
+                # Новые прибытия прекращаются, очереди процессов отменяются, выполняемые сценарии дорабатывают
+                print("Остановка: ждем завершения выполняемых сценариев...", flush=True)
+                stop.set()
+        duration = time.monotonic() - started
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=10)
+        if server is not None:
+            server.stop()
+
+    print(f"\n{'=' * 30} ИТОГ {'=' * 30}")
+    for line in report.summary_lines(duration):
+        print(line)
+    for name, collector in get_collectors().items():
+        lines = collector.report_lines()
+        if lines:
+            print(f"{'-' * 10} HTTP {name} {'-' * 10}")
+            print("\n".join(lines))
+
+    if options.max_error_rate is not None and report.error_rate() > options.max_error_rate:
+        print(f"Доля ошибок {report.error_rate():.2%} больше допустимой {options.max_error_rate:.2%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
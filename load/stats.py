@@ -0,0 +1,125 @@
+""" Статистика нагрузочного прогона: шаги и сценарии (количество, ошибки, гистограммы времени), прибытия,
+отброшенные прибытия и очередь. Срезы передаются из процессов нагрузчика в родительский и объединяются """
+
+import threading
+
+from custom_requester.latency_metrics import LatencyHistogram
+
+ITERATION = "сценарий"
+
+
+class LoadStats:
+    """ Счетчики процесса за интервал отчета. take() возвращает срез и обнуляет счетчики """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._timings = {}
+        self._errors = {}
+        self.arrivals = 0
+        self.dropped = 0
+
+    def _entry(self, name):
+        return self._timings.setdefault(name, {"count": 0, "failed": 0, "histogram": LatencyHistogram()})
+
+    def record(self, name, seconds, error=None):
+        """ Учет шага или сценария (name=ITERATION). error - исключение, если шаг завершился ошибкой """
+
+        with self._lock:
+            entry = self._entry(name)
+            entry["count"] += 1
+            entry["histogram"].record(seconds)
+            if error is None:
+                return
+            entry["failed"] += 1
+            # Ошибку сценария уже описал упавший шаг
+            if name != ITERATION:
+                key = f"{name}: {type(error).__name__}: {str(error)[:120]}"
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def record_arrival(self, dropped=False):
+        with self._lock:
+            self.arrivals += 1
+            self.dropped += dropped
+
+    def take(self):
+        with self._lock:
+            snapshot = {
+                "timings": {name: {"count": entry["count"], "failed": entry["failed"],
+                                   "histogram": entry["histogram"].to_dict()}
+                            for name, entry in self._timings.items()},
+                "errors": dict(self._errors),
+                "arrivals": self.arrivals,
+                "dropped": self.dropped,
+            }
+            self._reset()
+            return snapshot
+
+
+class LoadReport:
+    """ Объединение срезов всех процессов: итог за прогон и за текущий интервал живого отчета """
+
+    def __init__(self):
+        self.total = _Totals()
+        self.interval = _Totals()
+
+    def merge(self, snapshot):
+        self.total.merge(snapshot)
+        self.interval.merge(snapshot)
+
+    def live_line(self, elapsed, seconds, queued):
+        """ Строка живого отчета за последние seconds секунд и сброс интервала """
+
+        interval, self.interval = self.interval, _Totals()
+        iteration = interval.timings.get(ITERATION)
+        completed = iteration["count"] if iteration else 0
+        steps = sum(entry["count"] for name, entry in interval.timings.items() if name != ITERATION)
+        failed = iteration["failed"] if iteration else 0
+        latency = (f"p50={iteration['histogram'].percentile(50):.0f}ms p95={iteration['histogram'].percentile(95):.0f}ms"
+                   if completed else "p50=- p95=-")
+        return (f"[{elapsed:6.1f}s] arrivals={interval.arrivals / seconds:6.1f}/s "
+                f"completed={completed / seconds:6.1f}/s steps={steps / seconds:6.1f}/s "
+                f"errors={failed / completed if completed else 0.0:6.1%} {latency} "
+                f"queued={queued} dropped={interval.dropped}")
+
+    def summary_lines(self, duration):
+        """ Итог прогона: сценарии и шаги (пропускная способность, доля ошибок, p50/p95/p99/max) и частые ошибки """
+
+        total = self.total
+        lines = [f"Прибытий: {total.arrivals}, отброшено из-за переполненной очереди: {total.dropped}, "
+                 f"длительность: {duration:.1f} с"]
+        for name, entry in sorted(total.timings.items(), key=lambda item: item[0] != ITERATION):
+            histogram = entry["histogram"]
+            lines.append(
+                f"{name}: n={entry['count']} {entry['count'] / duration:.1f}/s "
+                f"errors={entry['failed'] / entry['count'] if entry['count'] else 0.0:.1%} "
+                f"p50={histogram.percentile(50):.1f}ms p95={histogram.percentile(95):.1f}ms "
+                f"p99={histogram.percentile(99):.1f}ms max={histogram.max_us / 1000:.1f}ms")
+        for error, count in sorted(total.errors.items(), key=lambda item: item[1], reverse=True)[:10]:
+            lines.append(f"  {count} x {error}")
+        return lines
+
+    def error_rate(self):
+        iteration = self.total.timings.get(ITERATION)
+        return iteration["failed"] / iteration["count"] if iteration and iteration["count"] else 0.0
+
+
+class _Totals:
+    def __init__(self):
+        self.timings = {}
+        self.errors = {}
+        self.arrivals = 0
+        self.dropped = 0
+
+    def merge(self, snapshot):
+        for name, data in snapshot["timings"].items():
+            entry = self.timings.setdefault(name, {"count": 0, "failed": 0, "histogram": LatencyHistogram()})
+            entry["count"] += data["count"]
+            entry["failed"] += data["failed"]
+            entry["histogram"].merge(data["histogram"])
+        for error, count in snapshot["errors"].items():
+            self.errors[error] = self.errors.get(error, 0) + count
+        self.arrivals += snapshot["arrivals"]
+        self.dropped += snapshot["dropped"]
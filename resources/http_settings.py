@@ -0,0 +1,136 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """ Чтение булевого флага из переменной окружения (1/true/yes/on) """
+
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class HttpPoolSettings:
+    """ Настройки пулов HTTP-соединений. Значения из окружения переопределяются опциями pytest """
+
+    POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))  # Количество пулов, кэшируемых адаптером хоста
+    POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 32))  # Максимум соединений, хранимых в пуле хоста
+    POOL_BLOCK = env_flag('HTTP_POOL_BLOCK')  # Ждать свободное соединение вместо открытия лишнего
+    KEEPALIVE_IDLE = float(os.getenv('HTTP_KEEPALIVE_IDLE', 30))  # Секунд простоя, после которых соединение не переиспользуется
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('HTTP_ASYNC_MAX_CONNECTIONS', 100))  # Максимум одновременных соединений асинхронного клиента
+    HTTP2_HOSTS = os.getenv('HTTP2_HOSTS', '')  # Хосты с транспортом HTTP/2 (host или host:port через запятую, * - все)
+    HTTP2_CLEARTEXT = env_flag('HTTP2_CLEARTEXT')  # HTTP/2 без TLS (h2c) для http:// хостов, иначе для них HTTP/1.1
+    BATCH_MAX_CONCURRENCY = int(os.getenv('HTTP_BATCH_MAX_CONCURRENCY', 8))  # Потоков send_many по умолчанию (не больше POOL_MAXSIZE)
+    PAGE_SIZE = int(os.getenv('HTTP_PAGE_SIZE', 100))  # Размер страницы итераторов iter_movies / iter_users / iter_payments
+    PAGE_PREFETCH = int(os.getenv('HTTP_PAGE_PREFETCH', 2))  # Страниц, загружаемых заранее, 0 - последовательный обход
+
+
+class HttpTimeoutSettings:
+    """ Таймауты запросов и бюджет времени теста """
+
+    CONNECT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))  # Секунд на установку соединения
+    READ = float(os.getenv('HTTP_READ_TIMEOUT', 30))  # Секунд ожидания данных от сервера (между чтениями сокета)
+    TEST_DEADLINE = float(os.getenv('HTTP_TEST_DEADLINE', 0))  # Бюджет времени теста в секундах, из которого тратят его запросы, 0 - без бюджета
+
+
+class HttpLogSettings:
+    """ Настройки логирования запросов и ответов CustomRequester """
+
+    BODY_MAX_BYTES = int(os.getenv('HTTP_LOG_BODY_MAX_BYTES', 16384))  # Лимит логируемого тела запроса/ответа, 0 - без лимита
+    # all - все обмены, failures - только ответы >= 400 и неожиданные статусы, sample - ошибки и каждый N-й успешный обмен.
+    # HTTP_LOG_ONLY_FAILURES=true - прежний способ включить failures
+    POLICY = os.getenv('HTTP_LOG_POLICY', 'failures' if env_flag('HTTP_LOG_ONLY_FAILURES') else 'all').lower()
+    SAMPLE_RATE = int(os.getenv('HTTP_LOG_SAMPLE_RATE', 10))  # Политика sample: логируется 1 из N успешных обменов
+    REDACT = env_flag('HTTP_LOG_REDACT', True)  # Скрывать в логе токены, пароли, cookie и данные карт
+    REDACT_KEYS = os.getenv('HTTP_LOG_REDACT_KEYS', '')  # Дополнительные скрываемые поля тел и заголовки, через запятую
+
+
+class HttpJournalSettings:
+    """ Настройки структурированного журнала запросов (JSONL, один файл на xdist-воркер) """
+
+    ENABLED = env_flag('HTTP_JOURNAL')  # Писать журнал запросов
+    GZIP = env_flag('HTTP_JOURNAL_GZIP')  # Сжимать файлы журнала gzip
+    DIRECTORY = os.getenv('HTTP_JOURNAL_DIR')  # Каталог журнала, по умолчанию files/request_journal
+
+
+class HttpCassetteSettings:
+    """ Настройки записи/воспроизведения HTTP-обменов (кассет) """
+
+    MODE = os.getenv('HTTP_CASSETTE_MODE', 'off')  # off | record | replay | once (воспроизвести, если кассета есть)
+    DIRECTORY = os.getenv('HTTP_CASSETTE_DIR')  # Каталог кассет, по умолчанию files/cassettes
+    # Поля JSON-тела и query-параметры, значения которых меняются от запуска к запуску:
+    # в сопоставлении запроса с записью их значения не сравниваются
+    VOLATILE_FIELDS = os.getenv('HTTP_CASSETTE_VOLATILE_FIELDS', 'email,password,passwordRepeat,fullName,id')
+
+
+class HttpRetrySettings:
+    """ Настройки повторов запросов при временных сбоях (по умолчанию выключены) """
+
+    ENABLED = env_flag('HTTP_RETRY')  # Повторять идемпотентные запросы (GET, PUT, DELETE) при сбоях
+    RETRY_POST = env_flag('HTTP_RETRY_POST')  # Повторять также POST и PATCH (только если сервис идемпотентен)
+    MAX_ATTEMPTS = int(os.getenv('HTTP_RETRY_MAX_ATTEMPTS', 3))  # Всего попыток, включая первую
+    STATUSES = tuple(int(code) for code in os.getenv('HTTP_RETRY_STATUSES', '502,503,504').split(','))  # Повторяемые статусы
+    BACKOFF_BASE = float(os.getenv('HTTP_RETRY_BACKOFF_BASE', 0.05))  # Базовая задержка в секундах, удваивается с попыткой
+    BACKOFF_MAX = float(os.getenv('HTTP_RETRY_BACKOFF_MAX', 2))  # Верхняя граница задержки в секундах
+    RETRY_AFTER_MAX = float(os.getenv('HTTP_RETRY_AFTER_MAX', 10))  # Максимум ожидания по заголовку Retry-After
+    BUDGET_RATIO = float(os.getenv('HTTP_RETRY_BUDGET_RATIO', 0.1))  # Доля повторов от числа запросов процесса
+    BUDGET_MIN_RETRIES = int(os.getenv('HTTP_RETRY_BUDGET_MIN', 10))  # Запас повторов при малом трафике
+
+
+class HttpBreakerSettings:
+    """ Настройки выключателей (circuit breaker) по сервисам (по умолчанию выключены) """
+
+    ENABLED = env_flag('HTTP_BREAKER')  # Отклонять запросы к сервису с высокой долей сбоев без ожидания таймаутов
+    FAILURE_RATE = float(os.getenv('HTTP_BREAKER_FAILURE_RATE', 0.5))  # Доля сбоев в окне, при которой выключатель размыкается
+    WINDOW = int(os.getenv('HTTP_BREAKER_WINDOW', 20))  # Количество последних запросов в окне
+    MIN_CALLS = int(os.getenv('HTTP_BREAKER_MIN_CALLS', 10))  # Минимум запросов в окне для принятия решения
+    OPEN_SECONDS = float(os.getenv('HTTP_BREAKER_OPEN_SECONDS', 30))  # Время до пробного запроса после размыкания
+
+
+class HttpRateLimitSettings:
+    """ Настройки клиентского ограничения частоты запросов (token bucket на хост, общий для воркеров xdist) """
+
+    ENABLED = env_flag('HTTP_RATE_LIMIT')  # Ограничивать частоту запросов к каждому хосту
+    RATE = float(os.getenv('HTTP_RATE_LIMIT_RPS', 50))  # Запросов в секунду на хост для всех потоков и процессов запуска
+    BURST = int(os.getenv('HTTP_RATE_LIMIT_BURST', 10))  # Запросов, которые можно отправить подряд без ожидания
+    HOST_RATES = os.getenv('HTTP_RATE_LIMIT_HOSTS', '')  # Лимиты отдельных хостов: host=rps[:burst],...
+    DIRECTORY = os.getenv('HTTP_RATE_LIMIT_DIR')  # Каталог файлов корзин, по умолчанию files/rate_limits
+
+
+class HttpCacheSettings:
+    """ Настройки кэша ответов публичных GET-запросов (по умолчанию выключен) """
+
+    ENABLED = env_flag('HTTP_CACHE')  # Кэшировать ответы запросов, помеченных cacheable (жанры, фильм, отзывы)
+    TTL = float(os.getenv('HTTP_CACHE_TTL', 30))  # Время жизни записи в секундах
+    MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', 512))  # Максимум записей, старые вытесняются (LRU)
+
+
+class HttpSingleFlightSettings:
+    """ Настройки объединения одинаковых одновременных GET-запросов """
+
+    ENABLED = env_flag('HTTP_SINGLE_FLIGHT')  # Одновременные cacheable GET (жанры, фильм, отзывы) уходят в сеть один раз
+
+
+class HttpConditionalSettings:
+    """ Настройки условных GET-запросов (ETag / Last-Modified) """
+
+    ENABLED = env_flag('HTTP_CONDITIONAL_GET', True)  # Отправлять If-None-Match / If-Modified-Since на повторные GET
+    MAX_ENTRIES = int(os.getenv('HTTP_CONDITIONAL_MAX_ENTRIES', 256))  # Максимум сохраненных ответов (LRU)
+
+
+class HttpCompressionSettings:
+    """ Настройки сжатия ответов и тел запросов """
+
+    ENABLED = env_flag('HTTP_COMPRESSION', True)  # Запрашивать сжатые ответы (gzip, deflate, br и zstd, если есть декодеры)
+    COMPRESS_REQUESTS = env_flag('HTTP_COMPRESS_REQUESTS')  # Сжимать gzip большие тела запросов (Content-Encoding: gzip)
+    COMPRESS_MIN_BYTES = int(os.getenv('HTTP_COMPRESS_MIN_BYTES', 2048))  # Тела меньше порога отправляются без сжатия
+    COMPRESS_LEVEL = int(os.getenv('HTTP_COMPRESS_LEVEL', 5))  # Уровень gzip: 1 - быстрее, 9 - меньше
+
+
+class HttpCodecSettings:
+    """ Настройки JSON-кодека тел запросов и ответов """
+
+    CODEC = os.getenv('HTTP_JSON_CODEC', 'auto')  # auto (orjson, если установлен) | orjson | json
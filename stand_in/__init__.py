@@ -0,0 +1,2 @@
+""" Локальный stand-in сервисов Cinescope (auth, movies, payment) для офлайн-прогонов и замеров пропускной способности.
+Сервер: stand_in.server.StandInServer """
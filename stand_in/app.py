@@ -0,0 +1,469 @@
+""" Логика stand-in сервисов Cinescope: auth, movies (фильмы, жанры, отзывы) и payment.
+Состояние хранится в памяти процесса. Методы вызываются из одного потока event loop, поэтому блокировки не нужны """
+
+import base64
+import json
+import secrets
+import uuid
+from datetime import datetime, timezone
+
+from resources.test_card_data import TestCardData
+from resources.user_creds import SuperAdminCreds
+
+# Префиксы путей, под которыми сервисы доступны на одном порту stand-in сервера
+AUTH_PREFIX = "/auth"
+MOVIES_PREFIX = "/api"
+PAYMENT_PREFIX = "/payment"
+
+LOCATIONS = ("MSK", "SPB")
+PAYMENT_STATUSES = ("SUCCESS", "INVALID_CARD", "ERROR")
+# Роли задаются строками, а не через constants.Roles: импорт constants фиксирует URL сервисов,
+# а stand-in запускается до того, как переменные окружения с его адресом выставлены
+USER, ADMIN, SUPER_ADMIN = "USER", "ADMIN", "SUPER_ADMIN"
+ROLES = (USER, ADMIN, SUPER_ADMIN)
+DEFAULT_GENRES = ("Драма", "Комедия", "Боевик", "Триллер", "Ужасы", "Фантастика", "Мелодрама", "Детектив",
+                  "Мультфильм", "Документальный")
+
+
+class HttpError(Exception):
+    """ Ошибка обработки запроса, которая превращается в ответ с кодом status """
+
+    def __init__(self, status, message, error=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.error = error or {400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                               409: "Conflict"}.get(status, "Error")
+
+    def payload(self):
+        return {"message": self.message, "error": self.error, "statusCode": self.status}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _issue_token(user):
+    """ Токен в формате JWT без подписи: роль читается из payload (так же, как в кассетах) """
+
+    header = base64.urlsafe_b64encode(b'{"alg":"none","typ":"JWT"}').rstrip(b"=").decode()
+    claims = json.dumps({"id": user["id"], "email": user["email"], "roles": user["roles"]}).encode()
+    payload = base64.urlsafe_b64encode(claims).rstrip(b"=").decode()
+    return f"{header}.{payload}.{secrets.token_urlsafe(16)}"
+
+
+def _page_params(query, size_keys=("pageSize",)):
+    try:
+        page = int(query.get("page", 1))
+        page_size = next((int(query[key]) for key in size_keys if key in query), 10)
+    except ValueError:
+        raise HttpError(400, "page и pageSize должны быть числами")
+    if page < 1 or page_size < 1 or page_size > 100000:
+        raise HttpError(400, "Некорректные параметры пагинации")
+    return page, page_size
+
+
+def _paginate(items, page, page_size):
+    start = (page - 1) * page_size
+    page_count = max(1, -(-len(items) // page_size))
+    return items[start:start + page_size], {"count": len(items), "page": page, "pageSize": page_size,
+                                            "pageCount": page_count}
+
+
+class CinescopeState:
+    """ Состояние всех сервисов stand-in """
+
+    def __init__(self, seed_movies=100):
+        self.users = {}
+        self.users_by_email = {}
+        self.tokens = {}
+        self.genres = {}
+        self.movies = {}
+        self.reviews = {}
+        self.payments = []
+        self._movie_seq = 0
+        self._genre_seq = 0
+        self._payment_seq = 0
+        self._seed(seed_movies)
+
+    def _seed(self, seed_movies):
+        self.add_user(
+            email=SuperAdminCreds.USERNAME or "super-admin@stand-in.local",
+            full_name="Stand-in Super Admin",
+            password=SuperAdminCreds.PASSWORD or "SuperAdmin1",
+            roles=[SUPER_ADMIN],
+            verified=True
+        )
+        for name in DEFAULT_GENRES:
+            self.add_genre(name)
+        for index in range(seed_movies):
+            self.add_movie({
+                "name": f"Stand-in movie {index}",
+                "description": f"Описание фильма {index}",
+                "price": 100 + index % 900,
+                "location": LOCATIONS[index % 2],
+                "published": True,
+                "genreId": 1 + index % len(DEFAULT_GENRES),
+                "imageUrl": f"https://stand-in.local/images/{index}.png",
+            })
+
+    # ==================== ПОЛЬЗОВАТЕЛИ ====================
+
+    def add_user(self, email, full_name, password, roles=None, verified=False, banned=False):
+        if email in self.users_by_email:
+            raise HttpError(409, "Пользователь с таким email уже зарегистрирован")
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "fullName": full_name,
+            "password": password,
+            "roles": list(roles or [USER]),
+            "verified": verified,
+            "banned": banned,
+            "createdAt": _now(),
+        }
+        self.users[user["id"]] = user
+        self.users_by_email[email] = user
+        return user
+
+    def find_user(self, locator):
+        user = self.users.get(locator) or self.users_by_email.get(locator)
+        if user is None:
+            raise HttpError(404, "Пользователь не найден")
+        return user
+
+    def delete_user(self, user):
+        self.users.pop(user["id"], None)
+        self.users_by_email.pop(user["email"], None)
+        for token in [token for token, user_id in self.tokens.items() if user_id == user["id"]]:
+            del self.tokens[token]
+
+    @staticmethod
+    def public_user(user):
+        return {key: value for key, value in user.items() if key != "password"}
+
+    # ==================== ФИЛЬМЫ И ЖАНРЫ ====================
+
+    def add_genre(self, name):
+        if any(genre["name"] == name for genre in self.genres.values()):
+            raise HttpError(409, "Жанр с таким названием уже существует")
+        self._genre_seq += 1
+        genre = {"id": self._genre_seq, "name": name}
+        self.genres[genre["id"]] = genre
+        return genre
+
+    def add_movie(self, data):
+        self._movie_seq += 1
+        movie = {
+            "id": self._movie_seq,
+            "name": data["name"],
+            "description": data["description"],
+            "price": data["price"],
+            "location": data.get("location", "MSK"),
+            "published": data.get("published", True),
+            "genreId": data["genreId"],
+            "imageUrl": data.get("imageUrl"),
+            "rating": 0,
+            "createdAt": _now(),
+        }
+        self.movies[movie["id"]] = movie
+        self.reviews[movie["id"]] = {}
+        return movie
+
+    def find_movie(self, movie_id):
+        try:
+            movie = self.movies.get(int(movie_id))
+        except ValueError:
+            movie = None
+        if movie is None:
+            raise HttpError(404, "Фильм не найден")
+        return movie
+
+
+class StandInApp:
+    """ Маршрутизация запросов stand-in сервера к обработчикам сервисов """
+
+    def __init__(self, state=None):
+        self.state = state or CinescopeState()
+
+    def handle(self, method, path, query, headers, body):
+        """ Обработка запроса. Возвращает (status, payload) """
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return 400, HttpError(400, "Тело запроса должно быть JSON").payload()
+        if not isinstance(data, dict):
+            # Как ValidationPipe сервиса: DTO - только JSON-объект
+            return 400, HttpError(400, "Тело запроса должно быть JSON-объектом").payload()
+
+        try:
+            for prefix, handler in ((AUTH_PREFIX, self._auth), (MOVIES_PREFIX, self._movies),
+                                    (PAYMENT_PREFIX, self._payment)):
+                if path == prefix or path.startswith(prefix + "/"):
+                    segments = [segment for segment in path[len(prefix):].split("/") if segment]
+                    return handler(method, segments, query, headers, data)
+            raise HttpError(404, f"Cannot {method} {path}")
+        except HttpError as error:
+            return error.status, error.payload()
+
+    # ==================== АВТОРИЗАЦИЯ ====================
+
+    def _current_user(self, headers, required=True):
+        authorization = headers.get("authorization", "")
+        user_id = self.state.tokens.get(authorization.split(" ", 1)[-1]) if authorization else None
+        user = self.state.users.get(user_id) if user_id else None
+        if user is None and required:
+            raise HttpError(401, "Unauthorized")
+        return user
+
+    def _require_roles(self, headers, *roles):
+        user = self._current_user(headers)
+        if not set(roles) & set(user["roles"]):
+            raise HttpError(403, "Forbidden resource")
+        return user
+
+    # ==================== AUTH СЕРВИС ====================
+
+    def _auth(self, method, segments, query, headers, data):
+        state = self.state
+        route = (method, segments[0] if segments else "", len(segments))
+
+        if route == ("POST", "register", 1):
+            if not data.get("email") or not data.get("fullName") or not data.get("password"):
+                raise HttpError(400, "email, fullName и password обязательны")
+            if data.get("password") != data.get("passwordRepeat"):
+                raise HttpError(400, "Пароли не совпадают")
+            user = state.add_user(data["email"], data["fullName"], data["password"])
+            return 201, state.public_user(user)
+
+        if route == ("POST", "login", 1):
+            user = state.users_by_email.get(data.get("email"))
+            if user is None or user["password"] != data.get("password"):
+                raise HttpError(401, "Неверный логин или пароль")
+            token = _issue_token(user)
+            state.tokens[token] = user["id"]
+            return 201, {"accessToken": token, "refreshToken": secrets.token_urlsafe(24),
+                         "expiresIn": 3600, "user": state.public_user(user)}
+
+        if route == ("GET", "user", 1):
+            self._require_roles(headers, ADMIN, SUPER_ADMIN)
+            page, page_size = _page_params(query)
+            users = list(state.users.values())
+            roles = query.get("roles")
+            if roles:
+                roles = roles if isinstance(roles, list) else [roles]
+                if not set(roles) <= set(ROLES):
+                    raise HttpError(400, "Некорректная роль")
+                users = [user for user in users if set(roles) & set(user["roles"])]
+            users.sort(key=lambda user: user["createdAt"], reverse=query.get("createdAt") != "asc")
+            items, meta = _paginate(users, page, page_size)
+            return 200, {"users": [state.public_user(user) for user in items], **meta}
+
+        if route == ("POST", "user", 1):
+            self._require_roles(headers, SUPER_ADMIN)
+            if not data.get("email") or not data.get("fullName") or not data.get("password"):
+                raise HttpError(400, "email, fullName и password обязательны")
+            user = state.add_user(data["email"], data["fullName"], data["password"],
+                                  roles=data.get("roles"), verified=bool(data.get("verified")),
+                                  banned=bool(data.get("banned")))
+            return 201, state.public_user(user)
+
+        if segments and segments[0] == "user" and len(segments) == 2:
+            if method == "GET":
+                self._require_roles(headers, ADMIN, SUPER_ADMIN)
+                return 200, state.public_user(state.find_user(segments[1]))
+            if method == "PATCH":
+                self._require_roles(headers, ADMIN, SUPER_ADMIN)
+                user = state.find_user(segments[1])
+                for field in ("roles", "verified", "banned", "fullName"):
+                    if field in data:
+                        user[field] = data[field]
+                return 200, state.public_user(user)
+            if method == "DELETE":
+                current = self._current_user(headers)
+                user = state.find_user(segments[1])
+                if current["id"] != user["id"] and SUPER_ADMIN not in current["roles"]:
+                    raise HttpError(403, "Forbidden resource")
+                state.delete_user(user)
+                return 200, state.public_user(user)
+
+        raise HttpError(404, f"Cannot {method} /{'/'.join(segments)}")
+
+    # ==================== MOVIES СЕРВИС ====================
+
+    def _movies(self, method, segments, query, headers, data):
+        state = self.state
+        if segments and segments[0] == "genres":
+            return self._genres(method, segments, headers, data)
+        if not segments or segments[0] != "movies":
+            raise HttpError(404, f"Cannot {method} /{'/'.join(segments)}")
+
+        if len(segments) == 1:
+            if method == "GET":
+                return 200, self._list_movies(query)
+            if method == "POST":
+                self._require_roles(headers, ADMIN, SUPER_ADMIN)
+                self._validate_movie(data, partial=False)
+                if any(movie["name"] == data["name"] for movie in state.movies.values()):
+                    raise HttpError(409, "Фильм с таким названием уже существует")
+                return 201, state.add_movie(data)
+
+        movie = state.find_movie(segments[1])
+        if len(segments) == 2:
+            if method == "GET":
+                return 200, dict(movie, reviews=list(state.reviews[movie["id"]].values()))
+            if method == "PATCH":
+                self._require_roles(headers, ADMIN, SUPER_ADMIN)
+                self._validate_movie(data, partial=True)
+                movie.update({key: value for key, value in data.items() if key in movie and key != "id"})
+                return 200, movie
+            if method == "DELETE":
+                self._require_roles(headers, SUPER_ADMIN)
+                del state.movies[movie["id"]]
+                state.reviews.pop(movie["id"], None)
+                return 200, movie
+
+        if segments[2] == "reviews":
+            return self._reviews(method, movie, segments[3:], headers, data)
+
+        raise HttpError(404, f"Cannot {method} /{'/'.join(segments)}")
+
+    def _list_movies(self, query):
+        page, page_size = _page_params(query)
+        try:
+            min_price = int(query.get("minPrice", 0))
+            max_price = int(query.get("maxPrice", 10 ** 9))
+            genre_id = int(query["genreId"]) if "genreId" in query else None
+        except ValueError:
+            raise HttpError(400, "Некорректные параметры фильтрации")
+
+        locations = query.get("locations")
+        locations = set(locations if isinstance(locations, list) else [locations]) if locations else None
+        published = query.get("published")
+        movies = [
+            movie for movie in self.state.movies.values()
+            if min_price <= movie["price"] <= max_price
+            and (locations is None or movie["location"] in locations)
+            and (genre_id is None or movie["genreId"] == genre_id)
+            and (published is None or str(movie["published"]).lower() == str(published).lower())
+        ]
+        movies.sort(key=lambda movie: movie["createdAt"], reverse=query.get("createdAt") != "asc")
+        items, meta = _paginate(movies, page, page_size)
+        return {"movies": items, **meta}
+
+    def _validate_movie(self, data, partial):
+        required = ("name", "description", "price", "genreId")
+        missing = [field for field in required if field not in data]
+        if missing and not partial:
+            raise HttpError(400, [f"{field} should not be empty" for field in missing])
+        if "price" in data and (not isinstance(data["price"], int) or data["price"] < 0):
+            raise HttpError(400, "price must be a positive number")
+        if "location" in data and data["location"] not in LOCATIONS:
+            raise HttpError(400, "location must be one of MSK, SPB")
+        if "genreId" in data and data["genreId"] not in self.state.genres:
+            raise HttpError(404, "Жанр не найден")
+
+    def _genres(self, method, segments, headers, data):
+        state = self.state
+        if len(segments) == 1:
+            if method == "GET":
+                return 200, list(state.genres.values())
+            if method == "POST":
+                self._require_roles(headers, SUPER_ADMIN)
+                if not data.get("name"):
+                    raise HttpError(400, "name should not be empty")
+                return 201, state.add_genre(data["name"])
+        elif len(segments) == 2:
+            try:
+                genre = state.genres.get(int(segments[1]))
+            except ValueError:
+                genre = None
+            if genre is None:
+                raise HttpError(404, "Жанр не найден")
+            if method == "GET":
+                return 200, genre
+            if method == "DELETE":
+                self._require_roles(headers, SUPER_ADMIN)
+                del state.genres[genre["id"]]
+                return 200, genre
+        raise HttpError(404, f"Cannot {method} /{'/'.join(segments)}")
+
+    def _reviews(self, method, movie, segments, headers, data):
+        reviews = self.state.reviews[movie["id"]]
+        if not segments:
+            if method == "GET":
+                return 200, [review for review in reviews.values() if not review["hidden"]]
+
+            user = self._current_user(headers)
+            if method == "POST":
+                if user["id"] in reviews:
+                    raise HttpError(409, "Отзыв уже существует")
+                if not data.get("text") or data.get("rating") not in range(1, 6):
+                    raise HttpError(400, "text и rating (1-5) обязательны")
+                reviews[user["id"]] = {
+                    "movieId": movie["id"], "userId": user["id"], "text": data["text"], "rating": data["rating"],
+                    "hidden": False, "createdAt": _now(), "user": {"fullName": user["fullName"]},
+                }
+                return 201, reviews[user["id"]]
+            if method == "PUT":
+                review = reviews.get(user["id"])
+                if review is None:
+                    raise HttpError(404, "Отзыв не найден")
+                review.update({key: data[key] for key in ("text", "rating") if key in data})
+                return 200, review
+
+        if method == "PATCH" and len(segments) == 2 and segments[0] in ("hide", "show"):
+            self._require_roles(headers, ADMIN, SUPER_ADMIN)
+            review = reviews.get(segments[1])
+            if review is None:
+                raise HttpError(404, "Отзыв не найден")
+            review["hidden"] = segments[0] == "hide"
+            return 200, review
+
+        raise HttpError(404, f"Cannot {method} reviews")
+
+    # ==================== PAYMENT СЕРВИС ====================
+
+    def _payment(self, method, segments, query, headers, data):
+        state = self.state
+        route = (method, segments[0] if segments else "", len(segments))
+
+        if route == ("POST", "create", 1):
+            user = self._current_user(headers)
+            card = data.get("card")
+            if not isinstance(data.get("amount"), int) or data["amount"] < 1 or not isinstance(card, dict):
+                raise HttpError(400, "movieId, amount и card обязательны")
+            movie = state.find_movie(data.get("movieId", 0))
+            valid_card = all(card.get(key) == value for key, value in TestCardData.CARD_DATA.items())
+            state._payment_seq += 1
+            payment = {
+                "id": state._payment_seq, "userId": user["id"], "movieId": movie["id"], "amount": data["amount"],
+                "total": data["amount"] * movie["price"], "status": "SUCCESS" if valid_card else "INVALID_CARD",
+                "createdAt": _now(),
+            }
+            state.payments.append(payment)
+            return 201, {"status": payment["status"]}
+
+        if route == ("GET", "user", 1):
+            user = self._current_user(headers)
+            return 200, [payment for payment in state.payments if payment["userId"] == user["id"]]
+
+        if route == ("GET", "user", 2):
+            self._require_roles(headers, ADMIN, SUPER_ADMIN)
+            user = state.find_user(segments[1])
+            return 200, [payment for payment in state.payments if payment["userId"] == user["id"]]
+
+        if route == ("GET", "find-all", 1):
+            self._require_roles(headers, ADMIN, SUPER_ADMIN)
+            page, page_size = _page_params(query, size_keys=("pageSize", "page_size"))
+            status = query.get("status")
+            if status is not None and status not in PAYMENT_STATUSES:
+                raise HttpError(400, "Некорректный статус платежа")
+            payments = [payment for payment in state.payments if status is None or payment["status"] == status]
+            order = query.get("createdAt") or query.get("created_at")
+            payments.sort(key=lambda payment: payment["createdAt"], reverse=order != "asc")
+            items, meta = _paginate(payments, page, page_size)
+            return 200, {"payments": items, **meta}
+
+        raise HttpError(404, f"Cannot {method} /{'/'.join(segments)}")
@@ -0,0 +1,118 @@
+""" HTTP/2 без TLS (h2c, prior knowledge) для stand-in сервера. Нужен пакет h2; без него сервер говорит только HTTP/1.1.
+Запросы одного соединения обрабатываются параллельно, ответы отправляются с учетом окон управления потоком """
+
+import asyncio
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # h2 - необязательная зависимость
+    h2 = None
+
+PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class H2cConnection:
+    """ Одно h2c-соединение. respond(method, target, headers, body) -> (status, [(name, value)], body) """
+
+    def __init__(self, reader, writer, respond):
+        self.reader = reader
+        self.writer = writer
+        self.respond = respond
+        self.conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        self._requests = {}
+        self._window_waiters = {}
+        self._tasks = set()
+
+    async def serve(self, received=PREFACE):
+        """ received - уже прочитанные байты соединения (preface клиента) """
+
+        self.conn.initiate_connection()
+        self._flush()
+        data = received
+        try:
+            while data:
+                try:
+                    events = self.conn.receive_data(data)
+                except h2.exceptions.ProtocolError:
+                    self._flush()
+                    return
+                for event in events:
+                    if not self._handle_event(event):
+                        self._flush()
+                        return
+                self._flush()
+                await self.writer.drain()
+                data = await self.reader.read(65536)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            self._wake_all()
+
+    def _handle_event(self, event):
+        """ Обработка события h2. False - клиент закрыл соединение """
+
+        if isinstance(event, h2.events.RequestReceived):
+            self._requests[event.stream_id] = (event.headers, bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            self._requests[event.stream_id][1].extend(event.data)
+            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            headers, body = self._requests.pop(event.stream_id)
+            task = asyncio.ensure_future(self._send_response(event.stream_id, headers, bytes(body)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif isinstance(event, h2.events.WindowUpdated):
+            if event.stream_id == 0:
+                self._wake_all()
+            else:
+                self._wake(event.stream_id)
+        elif isinstance(event, h2.events.StreamReset):
+            self._requests.pop(event.stream_id, None)
+            self._wake(event.stream_id)
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            return False
+        return True
+
+    async def _send_response(self, stream_id, request_headers, body):
+        pseudo = {name: value for name, value in request_headers if name.startswith(":")}
+        headers = {name: value for name, value in request_headers if not name.startswith(":")}
+        status, response_headers, payload = self.respond(pseudo[":method"], pseudo[":path"], headers, body)
+
+        try:
+            self.conn.send_headers(stream_id, [(":status", str(status))]
+                                   + [(name.lower(), value) for name, value in response_headers],
+                                   end_stream=not payload)
+            self._flush()
+            view = memoryview(payload)
+            while view:
+                window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                if window <= 0:
+                    # Окно клиента исчерпано - ждем WINDOW_UPDATE
+                    waiter = self._window_waiters[stream_id] = asyncio.get_running_loop().create_future()
+                    await waiter
+                    continue
+                chunk, view = view[:window], view[window:]
+                self.conn.send_data(stream_id, chunk.tobytes(), end_stream=not view)
+                self._flush()
+            await self.writer.drain()
+        except (h2.exceptions.StreamClosedError, h2.exceptions.ProtocolError, ConnectionError):
+            # Клиент сбросил поток или закрыл соединение
+            pass
+
+    def _wake(self, stream_id):
+        waiter = self._window_waiters.pop(stream_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def _wake_all(self):
+        for stream_id in list(self._window_waiters):
+            self._wake(stream_id)
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data:
+            self.writer.write(data)
@@ -0,0 +1,103 @@
+""" Сравнение HTTP/1.1 и HTTP/2 (h2c) на stand-in сервере: параллельные GET к сервису фильмов
+из синхронного (потоки) и асинхронного реквестера. Для каждого варианта - запросы в секунду, p50/p95
+и сколько TCP-соединений открыл клиент.
+Запуск: python -m stand_in.http2_benchmark --requests 2000 --concurrency 32 """
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stand_in.server import StandInServer
+
+
+def _percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def _summary(name, latencies, elapsed, connections):
+    return (f"{name:<14} {len(latencies) / elapsed:>9.0f} req/s  p50={statistics.median(latencies) * 1000:6.2f} ms  "
+            f"p95={_percentile(latencies, 0.95) * 1000:6.2f} ms  connections={connections}")
+
+
+def run_sync(requests_count, concurrency, params):
+    import requests
+
+    from api.api_manager import ApiManager
+
+    movies_api = ApiManager(requests.Session()).movies_api
+    movies_api.get_movies(params=params)
+
+    def call(_):
+        started = time.perf_counter()
+        movies_api.get_movies(params=params)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(call, range(requests_count)))
+    return latencies, time.perf_counter() - started
+
+
+async def run_async(requests_count, concurrency, params):
+    from api.async_api_manager import AsyncApiManager
+
+    manager = AsyncApiManager()
+    semaphore = asyncio.Semaphore(concurrency)
+    await manager.movies_api.get_movies(params=params)
+
+    async def call():
+        async with semaphore:
+            started = time.perf_counter()
+            await manager.movies_api.get_movies(params=params)
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(call() for _ in range(requests_count)))
+    elapsed = time.perf_counter() - started
+    await manager.client.aclose()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/1.1 против HTTP/2 на stand-in сервере")
+    parser.add_argument("--requests", type=int, default=2000, help="Запросов на вариант")
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных запросов")
+    parser.add_argument("--page-size", type=int, default=20, help="Фильмов в ответе")
+    args = parser.parse_args()
+
+    server = StandInServer(seed_movies=max(args.page_size, 100)).start()
+    # Адреса сервисов в constants.py читаются при импорте - выставляем их до импорта API-слоя
+    os.environ.update(server.env())
+    os.environ["HTTP_CONDITIONAL_GET"] = "false"
+    logging.getLogger("custom_requester.custom_requester").disabled = True
+
+    from resources.http_settings import HttpConditionalSettings, HttpPoolSettings
+
+    HttpConditionalSettings.ENABLED = False
+    HttpPoolSettings.HTTP2_CLEARTEXT = True
+    HttpPoolSettings.POOL_MAXSIZE = max(HttpPoolSettings.POOL_MAXSIZE, args.concurrency)
+    params = {"pageSize": args.page_size}
+
+    print(f"stand-in {server.base_url}, {args.requests} запросов, {args.concurrency} одновременно, "
+          f"pageSize={args.page_size}")
+    try:
+        for protocol, hosts in (("HTTP/1.1", ""), ("HTTP/2", "*")):
+            HttpPoolSettings.HTTP2_HOSTS = hosts
+            for mode in ("sync", "async"):
+                before = server.connections
+                if mode == "sync":
+                    latencies, elapsed = run_sync(args.requests, args.concurrency, params)
+                else:
+                    latencies, elapsed = asyncio.run(run_async(args.requests, args.concurrency, params))
+                print(_summary(f"{protocol} {mode}", latencies, elapsed, server.connections - before))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+""" Минимальный HTTP/1.1 сервер stand-in на asyncio: keep-alive, gzip, один поток, без внешних зависимостей
+(с пакетом h2 - также HTTP/2 без TLS, см. stand_in.http2).
+Запускается в фоновом потоке текущего процесса (StandInServer) или отдельно: python -m stand_in.server --port 8000 """
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import socket
+import threading
+from collections import Counter
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from stand_in.app import AUTH_PREFIX, MOVIES_PREFIX, PAYMENT_PREFIX, CinescopeState, StandInApp
+from stand_in.http2 import PREFACE, H2cConnection, h2
+
+MAX_HEADER_BYTES = 64 * 1024
+GZIP_MIN_BYTES = 1024  # Ответы меньше порога не сжимаются, даже если клиент принимает gzip
+
+
+def _reason(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return "Unknown"
+
+
+class StandInServer:
+    """ Stand-in сервисов Cinescope на одном порту: /auth, /api (фильмы) и /payment """
+
+    def __init__(self, host="127.0.0.1", port=0, state=None, seed_movies=100, http2=True):
+        self.host = host
+        self.port = port
+        # h2c принимается, только если установлен пакет h2; http2=False - сервер только HTTP/1.1
+        self.http2 = http2 and h2 is not None
+        self.app = StandInApp(state or CinescopeState(seed_movies=seed_movies))
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._writers = set()
+        self.connections = 0  # Принято TCP-соединений за время работы
+        self.hits = Counter()  # Запросов по "METHOD /путь" за время работы
+        self._faults = {}
+        self._faults_lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def env(self):
+        """ Переменные окружения, которые направляют API-слой (constants.py) на stand-in """
+
+        return {
+            "CINESCOPE_AUTH_URL": self.base_url + AUTH_PREFIX,
+            "CINESCOPE_MOVIES_URL": self.base_url + MOVIES_PREFIX,
+            "CINESCOPE_PAYMENT_URL": self.base_url + PAYMENT_PREFIX,
+        }
+
+    def inject_fault(self, method, path, status=503, times=1, headers=None):
+        """ Следующие times запросов method path (без query) получат ответ status с заголовками headers
+        (например, Retry-After) без обращения к сервисам. Для проверки повторов и выключателей """
+
+        with self._faults_lock:
+            self._faults[(method.upper(), path)] = [status, times, list((headers or {}).items())]
+
+    def _take_fault(self, method, path):
+        with self._faults_lock:
+            fault = self._faults.get((method, path))
+            if fault is None:
+                return None
+            fault[1] -= 1
+            if fault[1] <= 0:
+                del self._faults[(method, path)]
+            return fault
+
+    # ==================== ЖИЗНЕННЫЙ ЦИКЛ ====================
+
+    def start(self):
+        """ Запуск в фоновом потоке. Возвращает self после того, как порт открыт """
+
+        self._thread = threading.Thread(target=self._run, name="cinescope-stand-in", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def _shutdown(self):
+        # Keep-alive соединения закрываем сами: иначе обработчики будут отменены посреди ожидания запроса
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await asyncio.sleep(0)
+
+    # ==================== ПРОТОКОЛ ====================
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                if request_line == "PRI * HTTP/2.0":
+                    # Клиент начал HTTP/2 без TLS (prior knowledge): дочитываем preface и переключаемся на h2
+                    if not self.http2:
+                        break
+                    rest = await reader.readexactly(len(PREFACE) - len(head))
+                    await H2cConnection(reader, writer, self._respond).serve(head + rest)
+                    break
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self._write(writer, 400, *self._render(400, {"message": "Bad request line"}), False)
+                    break
+
+                headers = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                status, response_headers, response_body = self._respond(method, target, headers, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                await self._write(writer, status, response_headers, response_body, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _respond(self, method, target, headers, body):
+        """ Обработка запроса независимо от версии протокола: (status, [(заголовок, значение)], тело) """
+
+        path = unquote(urlsplit(target).path)
+        self.hits[f"{method} {path}"] += 1
+        fault = self._take_fault(method, path)
+        if fault is not None:
+            status, _, extra_headers = fault
+            status, response_headers, response_body = self._render(
+                status, {"message": "Injected fault", "error": _reason(status), "statusCode": status})
+            return status, extra_headers + response_headers, response_body
+
+        encoding = headers.get("content-encoding", "identity").lower()
+        if encoding in ("gzip", "identity"):
+            status, payload = self._dispatch(method, target, headers, body, encoding)
+        else:
+            status, payload = 415, {"message": f"Content-Encoding {encoding} не поддерживается",
+                                    "error": "Unsupported Media Type", "statusCode": 415}
+        return self._render(status, payload, with_etag=method == "GET", if_none_match=headers.get("if-none-match"),
+                            gzip_ok="gzip" in headers.get("accept-encoding", ""))
+
+    def _dispatch(self, method, target, headers, body, encoding="identity"):
+        if encoding == "gzip":
+            try:
+                body = gzip.decompress(body)
+            except (OSError, EOFError):
+                return 400, {"message": "Некорректное gzip-тело запроса", "error": "Bad Request", "statusCode": 400}
+        parts = urlsplit(target)
+        query = {key: values if len(values) > 1 else values[0]
+                 for key, values in parse_qs(parts.query, keep_blank_values=True).items()}
+        try:
+            return self.app.handle(method, unquote(parts.path), query, headers, body)
+        except Exception as error:
+            return 500, {"message": f"{type(error).__name__}: {error}", "error": "Internal Server Error",
+                         "statusCode": 500}
+
+    @staticmethod
+    def _render(status, payload, with_etag=False, if_none_match=None, gzip_ok=False):
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        headers = [("Content-Type", "application/json; charset=utf-8")]
+        if with_etag and status == 200:
+            # ETag - хэш тела: совпал с If-None-Match - отдаем 304 без тела
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            if if_none_match == etag:
+                status, body = 304, b""
+            headers.append(("ETag", etag))
+        if gzip_ok and len(body) >= GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=5)
+            headers += [("Content-Encoding", "gzip"), ("Vary", "Accept-Encoding")]
+        headers.append(("Content-Length", str(len(body))))
+        return status, headers, body
+
+    @staticmethod
+    async def _write(writer, status, headers, body, keep_alive):
+        head = "".join([f"HTTP/1.1 {status} {_reason(status)}\r\n",
+                        *(f"{name}: {value}\r\n" for name, value in headers),
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"])
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in сервисов Cinescope для офлайн-прогонов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed-movies", type=int, default=100, help="Количество фильмов при старте")
+    parser.add_argument("--no-http2", action="store_true", help="Не принимать HTTP/2 без TLS (h2c)")
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port, seed_movies=args.seed_movies, http2=not args.no_http2)
+    # Порт известен только после bind, поэтому переменные выводим из фонового запуска
+    server.start()
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
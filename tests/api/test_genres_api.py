@@ -1,7 +1,9 @@
+import asyncio
 import pytest
 import requests
 import random
 from api.api_manager import ApiManager
+from api.async_api_manager import AsyncApiManager
 from models.genre_model import CreateGenreResponse, GetGenreResponse
 
 
@@ -36,6 +38,24 @@ class TestGenresAPI:
 
         assert isinstance(response_data, list), "Ответ должен быть списком"
 
+    def test_get_genres_by_id_async_concurrent(self):
+        """ Конкурентное получение жанров по ID через AsyncApiManager """
+
+        async def fetch_genres():
+            async with AsyncApiManager() as async_api:
+                genres = (await async_api.genres_api.get_genres(expected_status=200)).json()
+                responses = await asyncio.gather(
+                    *(async_api.genres_api.get_genres_by_id(genre["id"], expected_status=200) for genre in genres)
+                )
+                return genres, responses
+
+        genres, responses = asyncio.run(fetch_genres())
+
+        assert len(responses) == len(genres), "Количество ответов не совпадает с количеством запросов"
+        for genre, response in zip(genres, responses):
+            genre_item = GetGenreResponse(**response.json())
+            assert genre_item.id == genre["id"], "ID жанра не совпадает с запрошенным"
+
     # ТЕСТЫ ДЛЯ POST /genres
     def test_create_genre_success(self, genre_data, super_admin):
         """ Успешное создание нового жанра с ролью SUPER_ADMIN """
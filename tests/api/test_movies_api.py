@@ -1,4 +1,6 @@
 import pytest
+from functools import partial
+from custom_requester.batch import RequestSpec
 from models.movie_model import MovieData, CreateMovieResponse, GetMovieResponse, GetMoviesResponse, DeleteMovieResponse, MovieFilterParams, MovieErrorResponse
 
 
@@ -91,6 +93,27 @@ class TestMovieAPI:
         assert create_response.price == movie_input.price, "Цена фильма не совпадает"
         assert create_response.genreId == movie_input.genreId, "ID жанра не совпадает"
 
+    def test_create_movies_batch(self, movie_data, super_admin):
+        """ Параллельное создание нескольких фильмов через send_many """
+
+        batch_movies = [dict(movie_data, name=f"{movie_data['name']} #{index}") for index in range(3)]
+        results = super_admin.api.send_many(
+            [partial(super_admin.api.movies_api.create_movie, movie_data=movie, expected_status=201)
+             for movie in batch_movies],
+            max_concurrency=3
+        )
+
+        created_movies = [CreateMovieResponse(**result.result().json()) for result in results]
+        try:
+            # Результаты возвращаются в порядке запросов
+            for created_movie, movie in zip(created_movies, batch_movies):
+                assert created_movie.name == movie["name"], "Порядок результатов не совпадает с порядком запросов"
+        finally:
+            delete_results = super_admin.api.send_many(
+                [RequestSpec("DELETE", f"/movies/{movie.id}", api="movies_api") for movie in created_movies]
+            )
+            assert all(result.ok for result in delete_results), "Не все фильмы из пачки удалены"
+
     # Тест для DELETE movies/{id}
     def test_delete_movie_success(self, create_movie, super_admin):
         """ Успешное удаление фильма с валидным ID """
@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from stand_in.app import SUPER_ADMIN, CinescopeState
+from stand_in.server import StandInServer
+from utils.tools import Tools
+
+ADMIN_EMAIL = "cassette-admin@stand-in.local"
+ADMIN_PASSWORD = "CassetteAdmin1"
+
+# Вложенный прогон: фикстуры проекта, сессионная фикстура с запросами и тесты со сгенерированными данными
+CONFTEST = textwrap.dedent('''
+    import pytest
+    import requests
+
+    from api.api_manager import ApiManager
+    from fixtures.auth_fixtures import *
+    from fixtures.base_fixtures import *
+    from fixtures.genres_fixtures import *
+    from fixtures.http_fixtures import *
+    from resources.user_creds import SuperAdminCreds
+    from utils.data_generator import faker
+
+
+    @pytest.fixture(scope="session")
+    def session_genre():
+        admin = ApiManager(requests.Session())
+        admin.auth_api.authenticate((SuperAdminCreds.USERNAME, SuperAdminCreds.PASSWORD))
+        genre = admin.genres_api.create_genre({"name": f"Жанр сессии - {faker.word()}{faker.random_number(digits=6)}"}).json()
+        yield genre
+        admin.genres_api.delete_genre_by_id(genre["id"])
+''')
+
+TESTS = textwrap.dedent('''
+    import os
+
+    from utils.data_generator import faker
+
+
+    def test_register_user(api_manager, test_user):
+        response = api_manager.auth_api.register_user(test_user).json()
+        assert response["email"] == test_user.email, "Email не совпадает"
+
+
+    def test_create_genre(super_admin, genre_data):
+        response = super_admin.api.genres_api.create_genre(genre_data).json()
+        assert response["name"] == genre_data["name"], "Название жанра не совпадает"
+
+
+    def test_create_named_genre(super_admin):
+        name = f"Жанр {os.environ.get('GENRE_PREFIX', '')}{faker.word()}{faker.random_number(digits=6)}"
+        response = super_admin.api.genres_api.create_genre({"name": name}).json()
+        assert response["name"] == name, "Название жанра не совпадает"
+
+
+    def test_session_genre(api_manager, session_genre):
+        response = api_manager.genres_api.get_genres_by_id(session_genre["id"]).json()
+        assert response["name"] == session_genre["name"], "Название жанра не совпадает"
+
+
+    def test_session_genre_again(api_manager, session_genre, test_user):
+        api_manager.auth_api.register_user(test_user)
+        response = api_manager.genres_api.get_genres_by_id(session_genre["id"]).json()
+        assert response["name"] == session_genre["name"], "Название жанра не совпадает"
+''')
+
+
+class TestCassetteRoundTrip:
+    """ Запись кассет против stand-in сервера и воспроизведение без сети """
+
+    @staticmethod
+    def run_pytest(tests_dir, env, mode, *args, passed=True):
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-o", "log_cli=false",
+             f"--http-cassette-mode={mode}", str(tests_dir), *args],
+            cwd=tests_dir, env=env, capture_output=True, text=True, timeout=120
+        )
+        assert (result.returncode == 0) == passed, \
+            f"Прогон в режиме {mode} {' '.join(args)} завершился с кодом {result.returncode}:\n{result.stdout[-4000:]}"
+        return result.stdout
+
+    def test_record_then_replay(self, tmp_path):
+        """ Воспроизведение проходит без сервера, для части тестов (-k) и не зависит от того,
+        какой тест первым запросил сессионную фикстуру """
+
+        tests_dir = tmp_path / "suite"
+        tests_dir.mkdir()
+        (tests_dir / "conftest.py").write_text(CONFTEST, encoding="utf-8")
+        (tests_dir / "test_roundtrip.py").write_text(TESTS, encoding="utf-8")
+        cassettes_dir = tmp_path / "cassettes"
+
+        state = CinescopeState(seed_movies=0)
+        state.add_user(ADMIN_EMAIL, "Cassette Admin", ADMIN_PASSWORD, roles=[SUPER_ADMIN], verified=True)
+        server = StandInServer(state=state).start()
+        env = {
+            **os.environ, **server.env(),
+            "PYTHONPATH": os.pathsep.join(filter(None, (str(Tools.project_dir()), os.environ.get("PYTHONPATH")))),
+            "SUPER_ADMIN_USERNAME": ADMIN_EMAIL,
+            "SUPER_ADMIN_PASSWORD": ADMIN_PASSWORD,
+            "HTTP_CASSETTE_DIR": str(cassettes_dir),
+        }
+        try:
+            self.run_pytest(tests_dir, env, "record")
+        finally:
+            server.stop()
+
+        assert list(cassettes_dir.glob("_fixtures/*.json.gz")), "Запросы сессионной фикстуры не попали в ее кассету"
+
+        # Сервер остановлен: любой запрос мимо кассеты завершится ошибкой соединения
+        assert "5 passed" in self.run_pytest(tests_dir, env, "replay")
+        assert "2 passed" in self.run_pytest(tests_dir, env, "replay", "-k", "session_genre_again or create_genre")
+        assert "1 passed" in self.run_pytest(tests_dir, env, "replay", "-k", "session_genre_again")
+
+        # Тело запроса разошлось с записью - ошибка кассеты, а не чужой записанный ответ
+        output = self.run_pytest(tests_dir, {**env, "GENRE_PREFIX": "другой "}, "replay", "-k", "create_named_genre",
+                                 passed=False)
+        assert "CassetteError" in output and "записан тот же запрос" in output
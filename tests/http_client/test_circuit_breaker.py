@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from custom_requester.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from custom_requester.deadline import DeadlineExceeded, clear_deadline
+
+GENRES = "/genres"
+OPEN_SECONDS = 0.1
+
+
+@pytest.fixture()
+def breaker(stand_in_requester):
+    """ Выключатель с маленьким окном: размыкается после двух сбоев, пробный запрос - через OPEN_SECONDS """
+
+    stand_in_requester.breaker = CircuitBreaker(stand_in_requester.base_url, failure_rate=0.5, window=4, min_calls=2,
+                                                open_seconds=OPEN_SECONDS)
+    return stand_in_requester.breaker
+
+
+def fail_request(requester):
+    """ Запрос, получивший неожиданный тестом 503 """
+
+    with pytest.raises(ValueError, match="503"):
+        requester.send_request("GET", GENRES, retry=False)
+
+
+def open_breaker(stand_in, requester):
+    stand_in.inject_fault("GET", "/api/genres", status=503, times=2)
+    for _ in range(2):
+        fail_request(requester)
+
+
+class TestCircuitBreaker:
+    """ Переходы выключателя closed -> open -> half-open -> closed на stand-in сервере """
+
+    def test_open_then_close_after_probe(self, stand_in, stand_in_requester, breaker):
+        open_breaker(stand_in, stand_in_requester)
+        assert breaker.state == OPEN, "Выключатель должен разомкнуться после двух сбоев из двух"
+
+        with pytest.raises(CircuitOpenError, match="503"):
+            stand_in_requester.send_request("GET", GENRES, retry=False)
+        assert stand_in.hits["GET /api/genres"] == 2, "Разомкнутый выключатель пропустил запрос в сеть"
+
+        time.sleep(OPEN_SECONDS)
+        stand_in_requester.send_request("GET", GENRES, retry=False)
+        assert breaker.state == CLOSED, "Успешный пробный запрос должен замкнуть выключатель"
+
+    def test_failed_probe_reopens(self, stand_in, stand_in_requester, breaker):
+        open_breaker(stand_in, stand_in_requester)
+        time.sleep(OPEN_SECONDS)
+        stand_in.inject_fault("GET", "/api/genres", status=503)
+
+        fail_request(stand_in_requester)
+
+        assert breaker.state == OPEN, "Неудачный пробный запрос должен снова разомкнуть выключатель"
+        with pytest.raises(CircuitOpenError):
+            stand_in_requester.send_request("GET", GENRES, retry=False)
+
+    def test_expected_server_error_not_counted(self, stand_in, stand_in_requester, breaker):
+        """ 5xx, который тест ожидает (негативная проверка), не размыкает выключатель и не занимает пробный запрос """
+
+        stand_in.inject_fault("GET", "/api/genres", status=500, times=4)
+        for expected_status in (500, [400, 500], 500, [500]):
+            stand_in_requester.send_request("GET", GENRES, expected_status=expected_status, retry=False)
+        assert breaker.state == CLOSED, "Ожидаемые тестом 5xx разомкнули выключатель"
+
+        open_breaker(stand_in, stand_in_requester)
+        time.sleep(OPEN_SECONDS)
+        stand_in.inject_fault("GET", "/api/genres", status=500)
+        stand_in_requester.send_request("GET", GENRES, expected_status=500, retry=False)
+        stand_in_requester.send_request("GET", GENRES, retry=False)
+        assert breaker.state == CLOSED, "Ожидаемый 5xx пробного запроса должен освободить место пробы"
+
+    @pytest.mark.http_deadline(0.5)
+    def test_exhausted_deadline_keeps_probe(self, stand_in, stand_in_requester, breaker, http_deadline):
+        """ Запрос, не отправленный из-за исчерпанного дедлайна, не занимает место пробного запроса half-open """
+
+        open_breaker(stand_in, stand_in_requester)
+        time.sleep(max(http_deadline.remaining(), OPEN_SECONDS) + 0.01)
+
+        with pytest.raises(DeadlineExceeded):
+            stand_in_requester.send_request("GET", GENRES, retry=False)
+        assert breaker.state in (OPEN, HALF_OPEN)
+
+        clear_deadline()
+        stand_in_requester.send_request("GET", GENRES, retry=False)
+        assert breaker.state == CLOSED, "Пробный запрос заблокирован запросом, прерванным дедлайном"
@@ -0,0 +1,108 @@
+import asyncio
+import gzip
+
+import pytest
+
+from custom_requester.async_custom_requester import AsyncCustomRequester, create_async_client
+from custom_requester.compression import compression_stats, request_compression
+from resources.http_settings import HttpCompressionSettings
+from stand_in.app import MOVIES_PREFIX
+
+GENRES = "/genres"
+MOVIES = "/movies"
+# Тело больше COMPRESS_MIN_BYTES, хорошо сжимается
+LONG_NAME = "Длинное название жанра " * 200
+
+
+@pytest.fixture(autouse=True)
+def compress_requests(monkeypatch):
+    monkeypatch.setattr(HttpCompressionSettings, "COMPRESS_REQUESTS", True)
+    monkeypatch.setattr(HttpCompressionSettings, "COMPRESS_MIN_BYTES", 2048)
+    monkeypatch.setattr(request_compression, "_rejected", set())
+
+
+def endpoint_stats(requester, method, endpoint):
+    return dict(compression_stats.snapshot().get(requester._metrics_key(method, endpoint), {}))
+
+
+def delta(before, after):
+    return {name: after.get(name, 0) - before.get(name, 0) for name in after}
+
+
+class TestRequestCompression:
+    """ gzip больших тел запросов и возврат к несжатым телам после 415 """
+
+    def test_large_body_sent_gzip(self, stand_in, stand_in_admin):
+        before = endpoint_stats(stand_in_admin, "POST", GENRES)
+
+        response = stand_in_admin.send_request("POST", GENRES, data={"name": LONG_NAME}, expected_status=201)
+
+        assert response.request.headers["Content-Encoding"] == "gzip"
+        assert response.json()["name"] == LONG_NAME, "Stand-in должен распаковать тело"
+        sent = delta(before, endpoint_stats(stand_in_admin, "POST", GENRES))
+        assert sent["request_wire"] == len(response.request.body)
+        assert sent["request_body"] == len(gzip.decompress(response.request.body))
+        assert sent["request_wire"] < sent["request_body"] / 10
+
+    def test_small_body_not_compressed(self, stand_in_admin):
+        response = stand_in_admin.send_request("POST", GENRES, data={"name": "Короткий жанр"}, expected_status=201)
+
+        assert "Content-Encoding" not in response.request.headers
+
+    def test_unsupported_media_type_falls_back(self, stand_in, stand_in_admin):
+        stand_in.inject_fault("POST", MOVIES_PREFIX + GENRES, status=415)
+
+        response = stand_in_admin.send_request("POST", GENRES, data={"name": LONG_NAME}, expected_status=201)
+
+        assert stand_in.hits[f"POST {MOVIES_PREFIX}{GENRES}"] == 2, "После 415 тело отправляется повторно"
+        assert "Content-Encoding" not in response.request.headers, "Повтор после 415 должен уйти без сжатия"
+        assert response.json()["name"] == LONG_NAME
+
+    def test_rejecting_host_remembered(self, stand_in, stand_in_admin):
+        stand_in.inject_fault("POST", MOVIES_PREFIX + GENRES, status=415)
+        stand_in_admin.send_request("POST", GENRES, data={"name": LONG_NAME}, expected_status=201)
+
+        response = stand_in_admin.send_request("POST", GENRES, data={"name": LONG_NAME + "!"}, expected_status=201)
+
+        assert stand_in.hits[f"POST {MOVIES_PREFIX}{GENRES}"] == 3, "Хост, ответивший 415, не должен получать gzip"
+        assert "Content-Encoding" not in response.request.headers
+
+    def test_unsupported_media_type_falls_back_async(self, stand_in, stand_in_admin):
+        stand_in.inject_fault("POST", MOVIES_PREFIX + GENRES, status=415)
+
+        async def scenario():
+            async with create_async_client() as client:
+                requester = AsyncCustomRequester(client, base_url=stand_in.base_url + MOVIES_PREFIX)
+                requester._update_session_headers(Authorization=stand_in_admin.session.headers["Authorization"])
+                return await requester.send_request("POST", GENRES, data={"name": LONG_NAME}, expected_status=201)
+
+        response = asyncio.run(scenario())
+
+        assert stand_in.hits[f"POST {MOVIES_PREFIX}{GENRES}"] == 2
+        assert "Content-Encoding" not in response.request.headers
+        assert response.json()["name"] == LONG_NAME
+
+
+class TestWireSize:
+    """ Учет байтов ответа: полученные по сети против размера тела после распаковки """
+
+    def test_gzip_response_counted_compressed(self, stand_in_requester):
+        before = endpoint_stats(stand_in_requester, "GET", MOVIES)
+
+        response = stand_in_requester.send_request("GET", MOVIES, params={"pageSize": 20})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        received = delta(before, endpoint_stats(stand_in_requester, "GET", MOVIES))
+        assert received["responses"] == 1
+        assert received["response_body"] == len(response.content)
+        assert 0 < received["response_wire"] < received["response_body"], "По сети должно прийти сжатое тело"
+
+    def test_identity_response_wire_equals_body(self, stand_in_requester):
+        before = endpoint_stats(stand_in_requester, "GET", MOVIES)
+
+        response = stand_in_requester.send_request("GET", MOVIES, params={"pageSize": 20},
+                                                   headers={"Accept-Encoding": "identity"})
+
+        assert "Content-Encoding" not in response.headers
+        received = delta(before, endpoint_stats(stand_in_requester, "GET", MOVIES))
+        assert received["response_wire"] == received["response_body"] == len(response.content)
@@ -0,0 +1,87 @@
+import asyncio
+
+from custom_requester.async_custom_requester import AsyncCustomRequester, create_async_client
+from custom_requester.conditional_get import ValidatorStore
+from stand_in.app import MOVIES_PREFIX
+
+GENRES = "/genres"
+
+
+class TestConditionalGet:
+    """ Повторные GET с If-None-Match: 304 от сервиса заменяется сохраненным ответом """
+
+    def test_not_modified_replaced_with_stored(self, stand_in, stand_in_requester):
+        first = stand_in_requester.send_request("GET", GENRES)
+        second = stand_in_requester.send_request("GET", GENRES)
+
+        assert second.request.headers["If-None-Match"] == first.headers["ETag"], "Повторный GET не стал условным"
+        assert second.status_code == 200, "304 не заменен сохраненным ответом"
+        assert second.json() == first.json()
+        assert second.request is not first.request, "У подставленного ответа должен быть request нового запроса"
+
+    def test_revalidated_payload_not_shared(self, stand_in_requester):
+        first = stand_in_requester.send_request("GET", GENRES)
+        original = [dict(genre) for genre in first.json()]
+        first.json()[0]["name"] = "Изменено первым"
+        revalidated = stand_in_requester.send_request("GET", GENRES)
+        revalidated.json()[0]["name"] = "Изменено вторым"
+
+        assert stand_in_requester.send_request("GET", GENRES).json() == original, \
+            "Изменение тела одного ответа видно в следующих ответах на 304"
+
+    def test_revalidated_payload_not_shared_async(self, stand_in):
+        """ httpx.Response копируется вместе с разобранным телом - каждая подстановка разбирает тело заново """
+
+        async def scenario():
+            async with create_async_client() as client:
+                requester = AsyncCustomRequester(client, base_url=stand_in.base_url + MOVIES_PREFIX)
+                first = await requester.send_request("GET", GENRES)
+                original = [dict(genre) for genre in first.json()]
+                first.json()[0]["name"] = "Изменено первым"
+                revalidated = await requester.send_request("GET", GENRES)
+                assert revalidated.status_code == 200 and revalidated is not first
+                revalidated.json()[0]["name"] = "Изменено вторым"
+                return original, (await requester.send_request("GET", GENRES)).json()
+
+        original, latest = asyncio.run(scenario())
+        assert latest == original, "Изменение тела одного ответа видно в следующих ответах на 304"
+
+    def test_expected_not_modified_returned_as_is(self, stand_in_requester):
+        stand_in_requester.send_request("GET", GENRES)
+
+        response = stand_in_requester.send_request("GET", GENRES, expected_status=304)
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_changed_resource_stored_again(self, stand_in_admin):
+        stand_in_admin.send_request("GET", GENRES)
+        genre = stand_in_admin.send_request("POST", GENRES, data={"name": "Новый жанр"}, expected_status=201).json()
+
+        changed = stand_in_admin.send_request("GET", GENRES)
+        revalidated = stand_in_admin.send_request("GET", GENRES)
+
+        assert genre in changed.json(), "Измененный ресурс должен прийти с новым телом"
+        assert revalidated.json() == changed.json(), "После изменения сохраняется новый ответ"
+
+    def test_stored_response_evicted_during_request(self, monkeypatch, stand_in, stand_in_requester):
+        """ Запись вытеснена другим запросом, пока условный запрос был в сети: подставляется ответ,
+        по которому строились заголовки, а не пустой 304 """
+
+        store = ValidatorStore(max_entries=1)
+        monkeypatch.setattr("custom_requester.custom_requester.validator_store", store)
+        first = stand_in_requester.send_request("GET", GENRES)
+        lookup = store.lookup
+
+        def lookup_then_evict(key):
+            pinned = lookup(key)
+            monkeypatch.setattr(store, "lookup", lookup)
+            stand_in_requester.send_request("GET", f"{GENRES}/1")
+            return pinned
+
+        monkeypatch.setattr(store, "lookup", lookup_then_evict)
+        response = stand_in_requester.send_request("GET", GENRES)
+
+        assert stand_in.hits["GET /api/genres"] == 2
+        assert response.status_code == 200, "Вытесненная запись превратилась в пустой 304"
+        assert response.json() == first.json()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import requests
+
+from custom_requester.async_custom_requester import AsyncCustomRequester, create_async_client
+from custom_requester.connection_timing import PHASES, connection_timing, host_key, response_timing
+from custom_requester.custom_requester import CustomRequester
+from stand_in.app import MOVIES_PREFIX
+
+GENRES = "/genres"
+MOVIES = "/movies"
+
+
+def host_counters(host):
+    counters = connection_timing.snapshot().get(host, {"requests": 0, "reused": 0, "phases": {}})
+    return counters["requests"], counters["reused"]
+
+
+class TestConnectionTiming:
+    """ Фазы обмена: новое соединение, keep-alive и сводка по хостам """
+
+    def test_keep_alive_request_reused(self, stand_in_requester):
+        first = response_timing(stand_in_requester.send_request("GET", GENRES)).as_dict()
+        second = response_timing(stand_in_requester.send_request("GET", GENRES)).as_dict()
+
+        assert not first["reused"]
+        assert first["dns"] is not None and first["connect"] is not None, "У нового соединения нет DNS / connect"
+        assert second["reused"], "Второй запрос должен пойти по keep-alive соединению"
+        assert second["dns"] is None and second["connect"] is None, "Соединение из пула не устанавливается заново"
+        assert second["tls"] is None, "У http нет TLS"
+        assert second["ttfb"] > 0 and second["download"] is not None
+
+    def test_phases_add_up_to_total(self, stand_in_requester):
+        started = time.perf_counter()
+        response = stand_in_requester.send_request("GET", MOVIES, params={"pageSize": 30})
+        total = time.perf_counter() - started
+        timing = response_timing(response)
+
+        phases = [getattr(timing, phase) or 0.0 for phase in PHASES]
+        assert all(value >= 0 for value in phases)
+        assert 0 < sum(phases) <= total, "Фазы обмена не укладываются в его длительность"
+        # response.elapsed requests - от отправки до заголовков ответа: это DNS + connect + TTFB
+        until_headers = timing.dns + timing.connect + timing.ttfb
+        assert abs(until_headers - response.elapsed.total_seconds()) < 0.005 + 0.2 * until_headers
+
+    def test_phases_aggregated_per_host(self, stand_in, stand_in_requester):
+        host = host_key(stand_in.base_url)
+        requests_before, reused_before = host_counters(host)
+
+        for _ in range(3):
+            stand_in_requester.send_request("GET", GENRES)
+
+        requests_after, reused_after = host_counters(host)
+        assert requests_after - requests_before == 3
+        assert reused_after - reused_before == 2
+        summary = connection_timing.summary()[host]
+        assert summary["phases"]["ttfb"]["count"] >= 3
+        assert summary["phases"]["connect"]["count"] == summary["requests"] - summary["reused"], \
+            "connect учитывается только для новых соединений"
+        assert any(line.startswith(f"{host}: requests=") for line in connection_timing.report_lines())
+
+    def test_async_keep_alive_request_reused(self, stand_in):
+        async def scenario():
+            async with create_async_client() as client:
+                requester = AsyncCustomRequester(client, base_url=stand_in.base_url + MOVIES_PREFIX)
+                first = await requester.send_request("GET", GENRES)
+                second = await requester.send_request("GET", GENRES)
+                return response_timing(first).as_dict(), response_timing(second).as_dict()
+
+        first, second = asyncio.run(scenario())
+
+        assert not first["reused"] and first["connect"] is not None
+        assert second["reused"] and second["connect"] is None
+        assert second["ttfb"] > 0
+
+    def test_proxied_exchange_not_timed(self, stand_in):
+        """ Через прокси requests идет пулом ProxyManager - фазы такого обмена не замеряются """
+
+        session = requests.Session()
+        # Stand-in принимает запрос в absolute-form и сам выступает HTTP-прокси для самого себя
+        session.proxies = {"http": stand_in.base_url}
+        requester = CustomRequester(session, base_url=stand_in.base_url + MOVIES_PREFIX)
+
+        response = requester.send_request("GET", GENRES)
+
+        assert response_timing(response) is None
+        assert requester._phases(response) is None
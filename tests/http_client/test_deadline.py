@@ -0,0 +1,75 @@
+import time
+
+import pytest
+import requests
+
+from custom_requester.deadline import OTHER, Deadline, DeadlineExceeded
+from custom_requester.retry import RetryBudget, RetryPolicy
+
+
+class TestDeadline:
+    """ Дедлайн теста: запросы тратят общий бюджет, а его нехватка завершается ошибкой с разбивкой времени """
+
+    @pytest.mark.http_deadline(2)
+    def test_retry_pause_longer_than_budget(self, stand_in, stand_in_requester):
+        """ Пауза Retry-After длиннее остатка бюджета не выжидается """
+
+        stand_in.inject_fault("GET", "/api/genres", status=503, headers={"Retry-After": "5"})
+        retry = RetryPolicy(max_attempts=3, backoff_base=0, budget=RetryBudget(0.1, 10))
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded) as error:
+            stand_in_requester.send_request("GET", "/genres", retry=retry)
+
+        assert time.monotonic() - started < 1, "Пауза выжидалась, хотя бюджета на нее не хватает"
+        message = str(error.value)
+        assert "/api/genres не выполнен" in message and "нужно 5.00 с" in message
+        assert "/api/genres 503: " in message, "В разбивке нет потраченного на попытку времени"
+        assert stand_in.hits["GET /api/genres"] == 1
+
+    @pytest.mark.http_deadline(0.2)
+    def test_exhausted_budget_not_sent(self, stand_in, stand_in_requester):
+        stand_in_requester.send_request("GET", "/genres")
+        time.sleep(0.2)
+
+        with pytest.raises(DeadlineExceeded, match="осталось 0.00 с"):
+            stand_in_requester.send_request("GET", "/genres")
+
+        assert stand_in.hits["GET /api/genres"] == 1, "Запрос отправлен после исчерпания бюджета"
+
+    @pytest.mark.http_deadline(0.3)
+    def test_timeout_truncated_by_budget(self, stand_in_requester, monkeypatch, http_deadline):
+        """ Таймаут запроса не больше остатка бюджета; таймаут, урезанный дедлайном, - DeadlineExceeded """
+
+        timeouts = []
+
+        def hanging_request(*args, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            time.sleep(timeout[1])
+            raise requests.ReadTimeout("read timeout")
+
+        monkeypatch.setattr(stand_in_requester.session, "request", hanging_request)
+
+        with pytest.raises(DeadlineExceeded) as error:
+            stand_in_requester.send_request("GET", "/genres", retry=False)
+
+        assert max(timeouts[0]) <= 0.3
+        assert isinstance(error.value.__cause__, requests.ReadTimeout)
+        assert "/api/genres ReadTimeout: " in str(error.value)
+
+    def test_breakdown(self):
+        deadline = Deadline(1, "test_name")
+        deadline.charge("GET host/api/movies 200", 0.25)
+        deadline.charge("GET host/api/movies 200", 0.25)
+        deadline.charge("паузы перед повторами", 0.1)
+        for index in range(20):
+            deadline.charge(f"GET host/api/genres/{index} 200", 0.001)
+
+        lines = deadline.breakdown("POST host/api/movies", 0.0, needed=0.5).splitlines()
+
+        assert lines[0].startswith("Дедлайн теста test_name (1.0 с) исчерпан: POST host/api/movies не выполнен, "
+                                   "осталось 0.00 с, нужно 0.50 с")
+        assert lines[1] == "  GET host/api/movies 200: 0.50 с (2)", "Самая долгая статья должна идти первой"
+        assert lines[2] == "  паузы перед повторами: 0.10 с (1)"
+        assert lines[-2] == "  еще 7 статей: 0.01 с"
+        assert lines[-1].startswith(f"  {OTHER}: ")
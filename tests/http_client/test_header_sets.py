@@ -0,0 +1,104 @@
+import requests
+
+from custom_requester.header_sets import HeaderSet, VersionedHeaders, prepare_session_headers
+
+GENRES = "/genres"
+
+
+def versioned_session():
+    session = requests.Session()
+    prepare_session_headers(session)
+    return session
+
+
+class TestVersionedHeaders:
+    """ Счетчик изменений заголовков сессии """
+
+    def test_every_change_bumps_version(self):
+        headers = VersionedHeaders({"Accept": "application/json"})
+        version = headers.version
+
+        headers["Authorization"] = "Bearer first"
+        assert headers.version == version + 1, "Установка заголовка не изменила version"
+        headers.update({"Authorization": "Bearer second", "X-Trace": "1"})
+        assert headers.version == version + 3, "update не изменил version"
+        del headers["X-Trace"]
+        assert headers.version == version + 4, "Удаление заголовка не изменило version"
+        headers.pop("authorization")
+        assert headers.version == version + 5, "pop не изменил version"
+
+    def test_prepare_keeps_existing_headers(self):
+        session = versioned_session()
+        session.headers["Authorization"] = "Bearer token"
+
+        prepare_session_headers(session)
+
+        assert session.headers["Authorization"] == "Bearer token", "Повторная подготовка затерла токен"
+
+
+class TestHeaderSet:
+    """ Набор заголовков реквестера: сессия + default_headers + заголовки запроса """
+
+    def test_current_reused_until_change(self):
+        session = versioned_session()
+        header_set = HeaderSet(session)
+
+        first = header_set.current()
+        assert header_set.current() is first, "Без изменений набор должен переиспользоваться"
+
+        session.headers["Authorization"] = "Bearer new"
+        changed = header_set.current()
+        assert changed is not first, "После смены токена набор не пересобран"
+        assert changed["authorization"] == "Bearer new"
+        assert header_set.current() is changed
+
+    def test_replaced_session_headers_rebuilt(self):
+        session = versioned_session()
+        header_set = HeaderSet(session)
+        first = header_set.current()
+
+        session.headers = VersionedHeaders({"Accept": "text/plain"})
+
+        assert header_set.current() is not first
+        assert header_set.current()["Accept"] == "text/plain"
+
+    def test_plain_dict_headers_rebuilt_every_time(self):
+        session = requests.Session()
+        session.headers = {"Accept": "application/json"}
+        header_set = HeaderSet(session)
+
+        first = header_set.current()
+        session.headers["Authorization"] = "Bearer token"
+
+        assert header_set.current()["Authorization"] == "Bearer token", "Изменение обычного словаря потеряно"
+        assert header_set.current() is not first
+
+    def test_default_headers_over_session(self):
+        session = versioned_session()
+        session.headers["X-Client"] = "session"
+        header_set = HeaderSet(session, default_headers={"X-Client": "requester"})
+
+        assert header_set.current()["x-client"] == "requester"
+        assert session.headers["X-Client"] == "session", "default_headers реквестера не должны попадать в общую сессию"
+
+    def test_overrides_merged_over_current(self):
+        session = versioned_session()
+        session.headers["Authorization"] = "Bearer session"
+        header_set = HeaderSet(session, default_headers={"X-Client": "requester"})
+        current = header_set.current()
+
+        merged = header_set.with_overrides({"authorization": "Bearer request", "X-Request": "1"})
+
+        assert merged["Authorization"] == "Bearer request", "Заголовок запроса должен перекрывать заголовок сессии"
+        assert merged["X-Client"] == "requester" and merged["X-Request"] == "1"
+        assert current["Authorization"] == "Bearer session", "Переопределение изменило общий набор"
+        assert header_set.with_overrides(None) is current and header_set.with_overrides({}) is current
+
+    def test_token_change_reaches_wire(self, stand_in_requester):
+        stand_in_requester.send_request("GET", GENRES)
+        stand_in_requester.session.headers["Authorization"] = "Bearer changed"
+
+        response = stand_in_requester.send_request("GET", GENRES, headers={"X-Request": "1"})
+
+        assert response.request.headers["Authorization"] == "Bearer changed"
+        assert response.request.headers["X-Request"] == "1"
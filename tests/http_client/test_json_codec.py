@@ -0,0 +1,132 @@
+import json
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from custom_requester import json_codec
+from custom_requester.json_codec import (OrjsonCodec, StdlibJsonCodec, encode_body, get_codec, memoize_json,
+                                         set_codec)
+from resources.http_settings import HttpCodecSettings
+
+GENRES = "/genres"
+
+
+class GenreBody(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+
+@pytest.fixture(autouse=True)
+def reset_codec():
+    set_codec(None)
+    yield
+    set_codec(None)
+
+
+class CountingCodec(StdlibJsonCodec):
+    """ Кодек, который считает разборы тел """
+
+    def __init__(self):
+        self.loads_calls = 0
+
+    def loads(self, raw):
+        self.loads_calls += 1
+        return super().loads(raw)
+
+
+class TestCodecSelection:
+    """ Выбор кодека по HTTP_JSON_CODEC и его замена """
+
+    def test_auto_prefers_orjson(self, monkeypatch):
+        pytest.importorskip("orjson")
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", "auto")
+
+        assert isinstance(get_codec(), OrjsonCodec)
+
+    def test_auto_without_orjson_falls_back(self, monkeypatch):
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", "auto")
+        monkeypatch.setattr(json_codec, "orjson", None)
+
+        assert isinstance(get_codec(), StdlibJsonCodec)
+
+    def test_json_forced(self, monkeypatch):
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", "json")
+
+        assert isinstance(get_codec(), StdlibJsonCodec)
+
+    def test_orjson_required_but_missing(self, monkeypatch):
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", "orjson")
+        monkeypatch.setattr(json_codec, "orjson", None)
+
+        with pytest.raises(ImportError, match="HTTP_JSON_CODEC=orjson"):
+            get_codec()
+
+    def test_choice_cached_until_reset(self, monkeypatch):
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", "json")
+        codec = get_codec()
+
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", "auto")
+        assert get_codec() is codec, "Кодек выбирается один раз"
+
+        set_codec(None)
+        monkeypatch.setattr(json_codec, "orjson", None)
+        assert get_codec() is not codec, "set_codec(None) должен вернуть выбор по настройкам"
+
+    def test_custom_codec(self):
+        codec = CountingCodec()
+        set_codec(codec)
+
+        assert get_codec() is codec
+
+
+class TestEncodeBody:
+    """ Сериализация тел запросов """
+
+    @pytest.mark.parametrize("codec", ["json", "orjson"])
+    def test_dict_same_bytes_for_both_codecs(self, monkeypatch, codec):
+        if codec == "orjson":
+            pytest.importorskip("orjson")
+        monkeypatch.setattr(HttpCodecSettings, "CODEC", codec)
+
+        body = encode_body({"name": "Жанр", "ids": [1, 2]})
+
+        assert body == '{"name":"Жанр","ids":[1,2]}'.encode("utf-8"), "Кириллица должна уходить как есть"
+
+    def test_string_sent_as_json_string(self):
+        assert json.loads(encode_body("текст")) == "текст", "Строка должна сериализоваться в JSON, как json= в requests"
+
+    def test_bytes_and_none_passed_through(self):
+        raw = b'{"prepared": true}'
+
+        assert encode_body(raw) is raw
+        assert encode_body(None) is None
+
+    def test_pydantic_excludes_unset(self):
+        assert json.loads(encode_body(GenreBody(name="Жанр"))) == {"name": "Жанр"}
+
+
+class TestMemoizeJson:
+    """ Однократный разбор тела ответа """
+
+    def test_parsed_once(self, stand_in_requester):
+        response = stand_in_requester.send_request("GET", GENRES)
+        codec = CountingCodec()
+        set_codec(codec)
+
+        memoize_json(response)
+        first = response.json()
+
+        assert response.json() is first
+        assert response.json() is first
+        assert codec.loads_calls == 1, "Тело ответа разобрано больше одного раза"
+
+    def test_requester_response_parsed_once(self, stand_in_requester):
+        codec = CountingCodec()
+        set_codec(codec)
+
+        response = stand_in_requester.send_request("GET", GENRES)
+        response.json()
+        response.json()
+
+        assert codec.loads_calls == 1, "Логирование и тест должны разделять один разбор тела"
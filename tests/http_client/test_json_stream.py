@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from custom_requester.json_stream import iter_json_array
+from models.movie_model import GetMovieResponse
+
+PAYLOAD = json.dumps({
+    "meta": {"movies": ["вложенный ключ с тем же именем"], "note": "строка с \"movies\": [ и ]"},
+    "movies": [
+        {"id": 1, "name": "Фильм «1»", "price": 1.5e3, "tags": [[], {}, [1, [2]]]},
+        {"id": 2, "name": "Escape \\ \" \n ☃", "rating": -0.25, "published": True},
+        "строка", 42, -7, 3.14, True, False, None, [],
+    ],
+    "count": 12,
+}, ensure_ascii=False).encode("utf-8")
+
+
+def chunked(data, size):
+    return (data[index:index + size] for index in range(0, len(data), size))
+
+
+class TestJsonStream:
+    """ Инкрементальный разбор массива из ответа, порезанного на произвольные чанки """
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64, len(PAYLOAD)])
+    def test_any_chunk_boundaries(self, size):
+        """ Границы чанков внутри UTF-8 символов, escape-последовательностей, чисел и литералов """
+
+        assert list(iter_json_array(chunked(PAYLOAD, size), "movies")) == json.loads(PAYLOAD)["movies"]
+
+    def test_empty_array(self):
+        assert list(iter_json_array(chunked(b'{"movies": [ ], "count": 0}', 3), "movies")) == []
+
+    def test_missing_key(self):
+        with pytest.raises(ValueError, match="нет массива 'users'"):
+            list(iter_json_array(chunked(PAYLOAD, 16), "users"))
+
+    def test_truncated_stream(self):
+        truncated = PAYLOAD[:PAYLOAD.index("строка".encode("utf-8")) + 3]  # Обрыв посреди UTF-8 символа
+
+        with pytest.raises(ValueError):
+            list(iter_json_array(chunked(truncated, 16), "movies"))
+        with pytest.raises(ValueError, match="не закрыт"):
+            list(iter_json_array(chunked(PAYLOAD[:PAYLOAD.index(b"42")], 16), "movies"))
+
+    def test_stops_reading_after_array(self):
+        """ Чанки после закрывающей скобки массива не читаются """
+
+        consumed = []
+
+        def chunks():
+            for chunk in chunked(b'{"movies": [1, 2], "tail": "' + b"x" * 1000 + b'"}', 8):
+                consumed.append(chunk)
+                yield chunk
+
+        assert list(iter_json_array(chunks(), "movies")) == [1, 2]
+        assert len(consumed) == 3, "Разбор читает поток дальше конца массива"
+
+    def test_stream_items_matches_json(self, stand_in_requester):
+        params = {"pageSize": 30}
+        expected = stand_in_requester.send_request("GET", "/movies", params=params).json()["movies"]
+
+        streamed = list(stand_in_requester.stream_items("/movies", "movies", GetMovieResponse, params=params,
+                                                        chunk_size=256))
+
+        assert [movie.model_dump(mode="json", exclude_unset=True) for movie in streamed] == expected
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from custom_requester.pagination import Page, iter_pages
+from models.movie_model import GetMovieResponse
+
+MOVIES = 30  # Фильмов в stand-in сервере фикстуры stand_in
+PAGE_SIZE = 7  # 5 страниц, последняя короткая
+
+
+def movie_ids(requester, **kwargs):
+    return [movie.id for movie in requester.iter_items("/movies", "movies", GetMovieResponse, page_size=PAGE_SIZE,
+                                                       **kwargs)]
+
+
+class TestPagination:
+    """ Постраничный обход с упреждающей загрузкой на stand-in сервере """
+
+    @pytest.mark.parametrize("prefetch", [0, 1, 2, 8])
+    def test_all_pages_in_order(self, stand_in, stand_in_requester, prefetch):
+        expected = [movie["id"] for movie in
+                    stand_in_requester.send_request("GET", "/movies", params={"pageSize": MOVIES}).json()["movies"]]
+
+        assert movie_ids(stand_in_requester, prefetch=prefetch) == expected
+        assert stand_in.hits["GET /api/movies"] == 1 + 5, "Каждая страница должна запрашиваться ровно один раз"
+
+    @pytest.mark.parametrize("prefetch", [0, 2])
+    def test_first_page_bounded_by_page_count(self, stand_in, stand_in_requester, prefetch):
+        """ pageCount - абсолютный номер последней страницы: обход с 3-й страницы не запрашивает 6-ю и 7-ю """
+
+        ids = movie_ids(stand_in_requester, params={"page": 3}, prefetch=prefetch)
+
+        assert len(ids) == MOVIES - 2 * PAGE_SIZE
+        assert stand_in.hits["GET /api/movies"] == 3, "Запрошены страницы за pageCount"
+
+    def test_early_break_stops_prefetch(self, stand_in, stand_in_requester):
+        movies = stand_in_requester.iter_items("/movies", "movies", GetMovieResponse, page_size=PAGE_SIZE, prefetch=2)
+
+        next(movies)
+        movies.close()
+        hits = stand_in.hits["GET /api/movies"]
+        time.sleep(0.05)
+
+        assert hits <= 3, "Запрошено больше страниц, чем первая и prefetch"
+        assert stand_in.hits["GET /api/movies"] == hits, "Запросы страниц продолжились после выхода из обхода"
+
+
+class TestIterPages:
+    """ iter_pages без сервера: неизвестное число страниц, ошибки и отмена упреждающих запросов """
+
+    @staticmethod
+    def pages(count, page_size=3, known=False):
+        """ fetch_page для списка из count элементов и журнал запрошенных страниц """
+
+        requested = []
+
+        def fetch_page(page):
+            requested.append(page)
+            items = list(range((page - 1) * page_size, min(page * page_size, count)))
+            return Page(items, -(-count // page_size) if known else None)
+
+        return fetch_page, requested
+
+    @pytest.mark.parametrize("prefetch", [0, 3])
+    def test_unknown_page_count_ends_on_short_page(self, prefetch):
+        fetch_page, _ = self.pages(10)
+
+        assert list(iter_pages(fetch_page, 3, prefetch=prefetch)) == list(range(10))
+
+    def test_full_last_page_ends_on_empty_page(self):
+        fetch_page, requested = self.pages(9)
+
+        assert list(iter_pages(fetch_page, 3, prefetch=0)) == list(range(9))
+        assert requested == [1, 2, 3, 4]
+
+    def test_error_propagates(self):
+        def fetch_page(page):
+            if page == 3:
+                raise ConnectionError("страница 3")
+            return Page([page] * 3, 5)
+
+        with pytest.raises(ConnectionError, match="страница 3"):
+            list(iter_pages(fetch_page, 3, prefetch=2))
+
+    def test_close_waits_for_running_pages(self):
+        """ Выход из обхода дожидается уже запущенных запросов страниц и не запускает новые """
+
+        release = threading.Event()
+        requested, finished = [], []
+
+        def fetch_page(page):
+            requested.append(page)
+            if page > 1:
+                release.wait(1)
+            finished.append(page)
+            return Page([page] * 3, 10)
+
+        pages = iter_pages(fetch_page, 3, prefetch=2)
+        next(pages)
+        threading.Timer(0.05, release.set).start()
+        pages.close()
+
+        assert sorted(finished) == [1, 2, 3], "Выход из обхода не дождался запущенных запросов"
+        time.sleep(0.05)
+        assert sorted(requested) == [1, 2, 3], "После выхода из обхода запрошены новые страницы"
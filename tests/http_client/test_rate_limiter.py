@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from custom_requester.async_custom_requester import AsyncCustomRequester, create_async_client
+from custom_requester.rate_limiter import TokenBucket
+from stand_in.app import MOVIES_PREFIX
+
+RATE = 50.0
+PROCESSES = 4
+RESERVATIONS = 25
+_start = None
+
+
+def init_process(barrier):
+    global _start
+    _start = barrier
+
+
+def reserve_slots(path, count):
+    """ Интервалы (по общим часам monotonic), в которые процесс получил токены корзины path:
+    момент выдачи лежит между часами до и после reserve плюс выданная задержка """
+
+    bucket = TokenBucket("stand-in", RATE, 1, path)
+    _start.wait()
+    slots = []
+    for _ in range(count):
+        before = time.monotonic()
+        delay = bucket.reserve()
+        slots.append((before + delay, time.monotonic() + delay))
+    return slots
+
+
+class TestTokenBucket:
+    """ Корзина токенов хоста: пачка burst, затем rate запросов в секунду на все потоки и процессы """
+
+    def test_burst_then_rate(self, tmp_path):
+        bucket = TokenBucket("stand-in", 10, 3, str(tmp_path / "host.bucket"))
+
+        delays = [bucket.reserve() for _ in range(5)]
+
+        assert delays[:3] == [0.0, 0.0, 0.0], "Первые burst запросов не должны ждать"
+        assert delays[3] == pytest.approx(0.1, abs=0.02)
+        assert delays[4] == pytest.approx(0.2, abs=0.02)
+
+    def test_invalid_rate(self, tmp_path):
+        with pytest.raises(ValueError, match="больше 0"):
+            TokenBucket("stand-in", 0, 1, str(tmp_path / "host.bucket"))
+
+    def test_shared_between_processes(self, tmp_path):
+        """ Процессы делят одну корзину: все выданные токены укладываются в лимит rate на всех """
+
+        path = str(tmp_path / "host.bucket")
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(PROCESSES, initializer=init_process, initargs=(context.Barrier(PROCESSES),)) as pool:
+            slots = [slot for process_slots in pool.starmap(reserve_slots, [(path, RESERVATIONS)] * PROCESSES)
+                     for slot in process_slots]
+
+        # Без общей корзины процессы выдали бы токены за RESERVATIONS / RATE, а не за все выдачи / RATE
+        span = max(latest for _, latest in slots) - min(earliest for earliest, _ in slots)
+        assert span >= (len(slots) - 1) / RATE, "Процессы получили токены чаще лимита корзины"
+
+    def test_requester_waits_for_token(self, tmp_path, stand_in, stand_in_requester):
+        stand_in_requester.rate_limiter = TokenBucket("stand-in", 20, 1, str(tmp_path / "host.bucket"))
+
+        started = time.monotonic()
+        for _ in range(6):
+            stand_in_requester.send_request("GET", "/genres")
+
+        assert time.monotonic() - started >= 5 / 20, "Реквестер отправил запросы чаще лимита"
+        assert stand_in.hits["GET /api/genres"] == 6
+
+    def test_async_requester_waits_for_token(self, tmp_path, stand_in):
+        async def scenario():
+            async with create_async_client() as client:
+                requester = AsyncCustomRequester(client, base_url=stand_in.base_url + MOVIES_PREFIX)
+                requester.rate_limiter = TokenBucket("stand-in", 20, 1, str(tmp_path / "host.bucket"))
+                started = time.monotonic()
+                await asyncio.gather(*(requester.send_request("GET", "/genres", coalesce=False) for _ in range(6)))
+                return time.monotonic() - started
+
+        assert asyncio.run(scenario()) >= 5 / 20, "Асинхронный реквестер отправил запросы чаще лимита"
+        assert stand_in.hits["GET /api/genres"] == 6
+
+    def test_async_token_wait_does_not_block_loop(self, tmp_path, stand_in):
+        """ Пока файл корзины заблокирован другим процессом, цикл событий обслуживает остальные задачи """
+
+        fcntl = pytest.importorskip("fcntl")
+        path = str(tmp_path / "host.bucket")
+        holder = os.open(path, os.O_RDWR | os.O_CREAT)
+        fcntl.flock(holder, fcntl.LOCK_EX)
+        threading.Timer(0.3, fcntl.flock, (holder, fcntl.LOCK_UN)).start()
+
+        async def scenario():
+            async with create_async_client() as client:
+                requester = AsyncCustomRequester(client, base_url=stand_in.base_url + MOVIES_PREFIX)
+                requester.rate_limiter = TokenBucket("stand-in", 20, 1, path)
+                request = asyncio.create_task(requester.send_request("GET", "/genres"))
+                ticks = 0
+                while not request.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+                await request
+                return ticks
+
+        try:
+            ticks = asyncio.run(scenario())
+        finally:
+            os.close(holder)
+        assert ticks >= 10, f"Цикл событий простаивал, пока запрос ждал корзину: {ticks} тиков за 0.3 с"
@@ -0,0 +1,131 @@
+import json
+import logging
+
+import pytest
+
+from custom_requester.request_logging import (REDACTED, body_to_text, check_log_policy, redact_header, redact_text,
+                                              should_log)
+from resources.http_settings import HttpLogSettings
+from resources.test_card_data import TestCardData
+
+GENRES = "/genres"
+URL = "http://stand-in.local/api/movies/42"
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    def set_policy(name, sample_rate=10):
+        monkeypatch.setattr(HttpLogSettings, "POLICY", name)
+        monkeypatch.setattr(HttpLogSettings, "SAMPLE_RATE", sample_rate)
+    return set_policy
+
+
+class TestLogPolicy:
+    """ Политики HTTP_LOG_POLICY: all, failures и выборка sample """
+
+    def test_all_logs_everything(self, policy):
+        policy("all")
+
+        assert should_log("test_all", "GET", URL, failed=False)
+        assert should_log("test_all", "GET", URL, failed=True)
+
+    def test_failures_logs_only_failed(self, policy):
+        policy("failures")
+
+        assert not should_log("test_failures", "GET", URL, failed=False)
+        assert should_log("test_failures", "GET", URL, failed=True)
+
+    def test_sample_rate_per_exchange(self, policy):
+        policy("sample", sample_rate=5)
+
+        logged = [should_log("test_sample_rate", "GET", f"http://stand-in.local/api/movies/{movie_id}", failed=False)
+                  for movie_id in range(20)]
+
+        # Все обмены - один эндпоинт /movies/{id}: в лог попадает ровно каждый пятый
+        assert sum(logged) == 4, f"Ожидался 1 из 5 обменов, залогировано {sum(logged)} из 20"
+        assert [index % 5 for index, value in enumerate(logged) if value] == [logged.index(True)] * 4
+
+    def test_sample_always_logs_failures(self, policy):
+        policy("sample", sample_rate=1000)
+
+        assert all(should_log("test_sample_failures", "GET", URL, failed=True) for _ in range(10))
+
+    def test_unknown_policy_rejected_once(self, policy):
+        policy("verbose")
+
+        with pytest.raises(ValueError, match="HTTP_LOG_POLICY=verbose"):
+            check_log_policy()
+
+    def test_sample_through_requester(self, policy, stand_in_admin, caplog):
+        policy("sample", sample_rate=3)
+        caplog.set_level(logging.INFO, logger="custom_requester.custom_requester")
+
+        for _ in range(6):
+            stand_in_admin.send_request("GET", GENRES)
+        stand_in_admin.send_request("GET", f"{GENRES}/999999", expected_status=404)
+
+        responses = [record for record in caplog.records if "RESPONSE" in record.getMessage()]
+        assert len(responses) == 3, "Ожидались 2 из 6 успешных обменов и ответ 404"
+        assert "404" in responses[-1].getMessage()
+
+
+class TestRedaction:
+    """ Скрытие секретов в заголовках и телах лога """
+
+    def test_nested_secrets(self):
+        body = json.dumps({"user": {"email": "a@b.c", "password": "Secret123",
+                                    "tokens": [{"accessToken": "abc.def", "refreshToken": "xyz"}]},
+                           "payment": {"card": TestCardData.CARD_DATA}}, indent=4)
+
+        text = redact_text(body)
+
+        for secret in ("Secret123", "abc.def", "xyz", "4242424242424242", "12/25", "123"):
+            assert secret not in text, f"Значение {secret} попало в лог"
+        assert json.loads(text)["user"]["password"] == REDACTED
+        assert "a@b.c" in text, "Несекретные поля скрываться не должны"
+
+    def test_truncated_body(self):
+        body = json.dumps({"email": "a@b.c", "password": "very secret password"})
+
+        text, truncated = body_to_text(body, limit=body.index("secret") + 6)
+
+        assert truncated > 0
+        assert "secret" not in redact_text(text), "Секрет в обрезанном теле попал в лог"
+
+    def test_truncated_number(self):
+        body = '{"cardNumber": 4242424242424242}'
+
+        text, _ = body_to_text(body, limit=len(body) - 4)
+
+        assert "4242" not in redact_text(text), "Номер карты в обрезанном теле попал в лог"
+
+    def test_header_secrets(self):
+        assert redact_header("Authorization", "Bearer abc") == REDACTED
+        assert redact_header("Cookie", "session=1") == REDACTED
+        assert redact_header("Set-Cookie", "session=1") == REDACTED
+        assert redact_header("Content-Type", "application/json") == "application/json"
+
+    def test_extra_redact_keys(self, monkeypatch):
+        monkeypatch.setattr(HttpLogSettings, "REDACT_KEYS", "X-Api-Key, apiSecret")
+
+        assert redact_header("x-api-key", "k") == REDACTED
+        assert redact_text('{"apiSecret": "s", "name": "n"}') == f'{{"apiSecret": "{REDACTED}", "name": "n"}}'
+
+    def test_redaction_off(self, monkeypatch):
+        monkeypatch.setattr(HttpLogSettings, "REDACT", False)
+
+        assert redact_header("Authorization", "Bearer abc") == "Bearer abc"
+        assert redact_text('{"password": "p"}') == '{"password": "p"}'
+
+    def test_requester_log_masks_token_and_password(self, policy, stand_in_admin, caplog):
+        policy("all")
+        caplog.set_level(logging.INFO, logger="custom_requester.custom_requester")
+        token = stand_in_admin.session.headers["Authorization"].split()[-1]
+
+        stand_in_admin.send_request("POST", GENRES, data={"name": "Жанр лога", "password": "Secret123"},
+                                    expected_status=201)
+
+        log = "\n".join(record.getMessage() for record in caplog.records)
+        assert "Жанр лога" in log
+        assert token not in log, "Токен из Authorization попал в лог"
+        assert "Secret123" not in log, "Пароль из тела запроса попал в лог"
@@ -0,0 +1,50 @@
+import pytest
+
+from resources.http_settings import HttpCacheSettings
+
+GENRES = "/genres"
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(monkeypatch):
+    monkeypatch.setattr(HttpCacheSettings, "ENABLED", True)
+
+
+class TestResponseCache:
+    """ Кэш cacheable GET-ответов и его сброс после успешных записей """
+
+    def test_repeated_get_from_cache(self, stand_in, stand_in_admin):
+        first = stand_in_admin.send_request("GET", GENRES, cacheable=True)
+        second = stand_in_admin.send_request("GET", GENRES, cacheable=True)
+
+        assert second is first, "Повторный GET должен вернуть закэшированный ответ"
+        assert stand_in.hits["GET /api/genres"] == 1
+
+    def test_write_invalidates_list(self, stand_in, stand_in_admin):
+        stand_in_admin.send_request("GET", GENRES, cacheable=True)
+        genre = stand_in_admin.send_request("POST", GENRES, data={"name": "Жанр кэша"}, expected_status=201).json()
+
+        genres = stand_in_admin.send_request("GET", GENRES, cacheable=True).json()
+
+        assert stand_in.hits["GET /api/genres"] == 2, "POST не сбросил закэшированный список"
+        assert genre in genres, "Список жанров из кэша устарел"
+
+    def test_write_to_item_invalidates_item_and_parent(self, stand_in, stand_in_admin):
+        genre_id = stand_in_admin.send_request("GET", GENRES, cacheable=True).json()[0]["id"]
+        stand_in_admin.send_request("GET", f"{GENRES}/{genre_id}", cacheable=True)
+
+        stand_in_admin.send_request("DELETE", f"{GENRES}/{genre_id}")
+
+        stand_in_admin.send_request("GET", f"{GENRES}/{genre_id}", cacheable=True, expected_status=404)
+        genres = stand_in_admin.send_request("GET", GENRES, cacheable=True).json()
+        assert genre_id not in [genre["id"] for genre in genres], "DELETE не сбросил список-родитель"
+        assert stand_in.hits[f"GET /api/genres/{genre_id}"] == 2
+
+    def test_failed_write_keeps_cache(self, stand_in, stand_in_admin):
+        stand_in_admin.send_request("GET", GENRES, cacheable=True)
+        stand_in.inject_fault("POST", "/api/genres", status=503)
+
+        stand_in_admin.send_request("POST", GENRES, data={"name": "Жанр"}, expected_status=503, retry=False)
+        stand_in_admin.send_request("GET", GENRES, cacheable=True)
+
+        assert stand_in.hits["GET /api/genres"] == 1, "Неуспешная запись не должна сбрасывать кэш"
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from custom_requester.retry import RetryBudget, RetryPolicy
+
+GENRES = "/genres"
+
+
+def policy(max_attempts=3, budget=None, **kwargs):
+    """ Политика без пауз по умолчанию и со своим бюджетом, чтобы тесты не зависели от общего бюджета процесса """
+
+    return RetryPolicy(max_attempts=max_attempts, backoff_base=0, budget=budget or RetryBudget(0.1, 10), **kwargs)
+
+
+class TestRetry:
+    """ Повторы запросов при 5xx на stand-in сервере """
+
+    def test_retry_until_success(self, stand_in, stand_in_requester):
+        stand_in.inject_fault("GET", "/api/genres", status=503, times=2)
+
+        response = stand_in_requester.send_request("GET", GENRES, retry=policy())
+
+        assert response.status_code == 200, "Третья попытка должна получить ответ сервиса"
+        assert stand_in.hits["GET /api/genres"] == 3, "Ожидалось две повторные попытки"
+
+    def test_attempts_limit(self, stand_in, stand_in_requester):
+        stand_in.inject_fault("GET", "/api/genres", status=503, times=10)
+
+        with pytest.raises(ValueError, match="503"):
+            stand_in_requester.send_request("GET", GENRES, retry=policy(max_attempts=3))
+
+        assert stand_in.hits["GET /api/genres"] == 3, "Попыток больше, чем max_attempts"
+
+    def test_retry_budget(self, stand_in, stand_in_requester):
+        """ Бюджет без пополнения и с запасом в один повтор: второй запрос уже не повторяется """
+
+        stand_in.inject_fault("GET", "/api/genres", status=503, times=10)
+        retry = policy(max_attempts=5, budget=RetryBudget(ratio=0, min_retries=1))
+
+        for expected_hits in (2, 3):
+            with pytest.raises(ValueError, match="503"):
+                stand_in_requester.send_request("GET", GENRES, retry=retry)
+            assert stand_in.hits["GET /api/genres"] == expected_hits, "Повторы вышли за бюджет"
+
+    def test_retry_after(self, stand_in, stand_in_requester):
+        stand_in.inject_fault("GET", "/api/genres", status=503, headers={"Retry-After": "0.3"})
+
+        started = time.monotonic()
+        response = stand_in_requester.send_request("GET", GENRES, retry=policy())
+
+        assert response.status_code == 200
+        assert time.monotonic() - started >= 0.3, "Пауза перед повтором короче Retry-After"
+
+    def test_no_retry_for_non_idempotent_or_expected_status(self, stand_in, stand_in_requester):
+        stand_in.inject_fault("POST", "/api/genres", status=503, times=10)
+        stand_in.inject_fault("GET", "/api/genres", status=503, times=10)
+
+        with pytest.raises(ValueError, match="503"):
+            stand_in_requester.send_request("POST", GENRES, data={"name": "Жанр"}, retry=policy())
+        response = stand_in_requester.send_request("GET", GENRES, expected_status=503, retry=policy())
+
+        assert response.status_code == 503
+        assert stand_in.hits["POST /api/genres"] == 1, "POST повторен без allow_non_idempotent"
+        assert stand_in.hits["GET /api/genres"] == 1, "Ожидаемый тестом статус не должен повторяться"
@@ -0,0 +1,67 @@
+import requests
+
+from api.api_manager import ApiManager
+from custom_requester.batch import RequestSpec
+from stand_in.app import AUTH_PREFIX, MOVIES_PREFIX, PAYMENT_PREFIX
+
+
+def stand_in_manager(stand_in):
+    """ ApiManager, API-классы которого направлены на stand-in сервер """
+
+    manager = ApiManager(requests.Session())
+    prefixes = {"auth_api": AUTH_PREFIX, "user_api": AUTH_PREFIX, "payment_api": PAYMENT_PREFIX}
+    for name in ("auth_api", "user_api", "movies_api", "genres_api", "reviews_api", "payment_api"):
+        getattr(manager, name).base_url = stand_in.base_url + prefixes.get(name, MOVIES_PREFIX)
+    return manager
+
+
+class TestSendMany:
+    """ Пачки запросов: результаты по порядку, ошибка элемента не прерывает остальные """
+
+    def test_requester_tuples(self, stand_in_requester):
+        results = stand_in_requester.send_many([
+            ("GET", "/genres"),
+            ("GET", "/genres/1", None, None, 200),
+            ("GET", "/genres/100500", None, None, 200),
+            ("GET", "/movies", None, {"pageSize": 2}, [200]),
+        ])
+
+        assert [result.ok for result in results] == [True, True, False, True]
+        assert results[1].result().json()["id"] == 1, "Порядок результатов не совпадает с порядком запросов"
+        assert "404" in str(results[2].exception)
+        assert len(results[3].response.json()["movies"]) == 2
+
+    def test_requester_invalid_item(self, stand_in, stand_in_requester):
+        results = stand_in_requester.send_many([("GET",), ("GET", "/genres"), {"method": "GET", "path": "/genres"}])
+
+        assert [result.ok for result in results] == [False, True, False]
+        assert isinstance(results[0].exception, TypeError) and results[0].request == ("GET",)
+        assert stand_in.hits["GET /api/genres"] == 1
+
+    def test_manager_plain_tuples(self, stand_in):
+        manager = stand_in_manager(stand_in)
+
+        results = manager.send_many([
+            ("GET", "/movies", None, {"pageSize": 1}, 200),
+            RequestSpec("GET", "/genres", api="genres_api"),
+            ("GET", "/user", None, None, 401, "user_api"),
+        ])
+
+        assert all(result.ok for result in results), [result.exception for result in results]
+        assert stand_in.hits["GET /api/movies"] == 1, "Кортеж без api должен уйти через movies_api"
+        assert stand_in.hits["GET /auth/user"] == 1
+
+    def test_manager_default_api_and_errors(self, stand_in):
+        manager = stand_in_manager(stand_in)
+
+        results = manager.send_many([
+            ("GET", "/login", None, None, 404),
+            RequestSpec("GET", "/genres", api="no_such_api"),
+            RequestSpec("GET", "/genres", api="session"),
+            ("GET", "/genres", None, None, 404),
+        ], api="auth_api")
+
+        assert [result.ok for result in results] == [True, False, False, True]
+        assert "no_such_api" in str(results[1].exception)
+        assert isinstance(results[2].exception, ValueError), "Не API-класс менеджера не должен вызываться"
+        assert stand_in.hits["GET /auth/login"] == 1 and stand_in.hits["GET /auth/genres"] == 1
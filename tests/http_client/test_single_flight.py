@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from custom_requester.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+@pytest.fixture()
+def slow_network(stand_in_requester, monkeypatch):
+    """ Каждый запрос сессии задерживается, чтобы одновременные вызовы гарантированно пересеклись """
+
+    request = stand_in_requester.session.request
+
+    def slow_request(*args, **kwargs):
+        time.sleep(0.1)
+        return request(*args, **kwargs)
+
+    monkeypatch.setattr(stand_in_requester.session, "request", slow_request)
+
+
+def send_together(requester, calls):
+    """ Одновременный запуск calls(requester, номер) из CALLERS потоков. Возвращает результаты или исключения """
+
+    barrier = threading.Barrier(CALLERS)
+
+    def call(index):
+        barrier.wait()
+        try:
+            return calls(requester, index)
+        except Exception as error:
+            return error
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        return list(pool.map(call, range(CALLERS)))
+
+
+class TestSingleFlight:
+    """ Одинаковые одновременные GET уходят в сеть один раз """
+
+    def test_concurrent_gets_coalesced(self, stand_in, stand_in_requester, slow_network):
+        responses = send_together(stand_in_requester,
+                                  lambda requester, _: requester.send_request("GET", "/genres", coalesce=True))
+
+        assert stand_in.hits["GET /api/genres"] == 1, "Одинаковые одновременные GET не объединены"
+        assert all(response is responses[0] for response in responses)
+
+    def test_failed_response_shared(self, stand_in, stand_in_requester, slow_network):
+        stand_in.inject_fault("GET", "/api/genres", status=503)
+
+        errors = send_together(stand_in_requester, lambda requester, _: requester.send_request(
+            "GET", "/genres", coalesce=True, retry=False))
+
+        assert stand_in.hits["GET /api/genres"] == 1
+        assert all(isinstance(error, ValueError) and "503" in str(error) for error in errors), \
+            "Каждый вызывающий должен получить ошибку статуса общего ответа"
+
+    def test_different_requests_not_coalesced(self, stand_in, stand_in_requester, slow_network):
+        send_together(stand_in_requester, lambda requester, index: requester.send_request(
+            "GET", "/movies", params={"pageSize": 1, "page": index + 1}, coalesce=True))
+
+        assert stand_in.hits["GET /api/movies"] == CALLERS, "Запросы с разными параметрами объединены"
+
+    def test_sequential_gets_not_coalesced(self, stand_in, stand_in_requester):
+        for _ in range(2):
+            stand_in_requester.send_request("GET", "/genres", coalesce=True)
+
+        assert stand_in.hits["GET /api/genres"] == 2, "Завершенный запрос не должен отдаваться следующим вызовам"
+
+    def test_async_waiter_cancel_keeps_shared_request(self):
+        """ Отмена одного из ожидающих не отменяет общий запрос для остальных """
+
+        flights = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ответ"
+
+        async def scenario():
+            first = asyncio.ensure_future(flights.do_async("key", fetch))
+            second = asyncio.ensure_future(flights.do_async("key", fetch))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "ответ"
+        assert len(calls) == 1
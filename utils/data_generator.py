@@ -1,6 +1,6 @@
 import random
 import string
-import uuid
+import zlib
 from datetime import datetime
 from faker import Faker
 
@@ -10,6 +10,24 @@ faker = Faker()
 class DataGenerator:
     """ Класс для генерации случайных тестовых данных """
 
+    @staticmethod
+    def seed(scope):
+        """ Воспроизводимые данные: random и Faker засеваются от строки scope (id теста или фикстуры).
+        Возвращает прежнее состояние генераторов для restore_seed """
+
+        state = (random.getstate(), faker.random.getstate())
+        seed = zlib.crc32(scope.encode("utf-8"))
+        random.seed(seed)
+        Faker.seed(seed)
+        return state
+
+    @staticmethod
+    def restore_seed(state):
+        """ Возврат генераторов к состоянию, сохраненному seed """
+
+        random.setstate(state[0])
+        faker.random.setstate(state[1])
+
     @staticmethod
     def generation_random_email():
         """ Генерация случайного email адреса для тестирования """
@@ -49,14 +67,14 @@ class DataGenerator:
     def generation_random_uuid():
         """ Генерация случайного UUID для идентификации объектов """
 
-        return str(uuid.uuid4())
+        return faker.uuid4()
 
     @staticmethod
     def generate_user_data() -> dict:
         """ Генерирует полный набор данных для создания тестового пользователя через БД """
         
         return {
-            'id': f'{uuid.uuid4()}',  # генерируем UUID как строку
+            'id': faker.uuid4(),  # UUID строкой; faker засевается в режиме кассет
             'email': DataGenerator.generation_random_email(),
             'full_name': DataGenerator.generation_random_name(),
             'password': DataGenerator.generation_random_password(),